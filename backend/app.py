@@ -1,11 +1,13 @@
 """
 FraudSense — Flask Application Entry Point (v2)
-Registers all blueprints, initialises Firebase, sets up CORS + rate limiting.
+Registers all blueprints, initialises Firebase, sets up CORS + rate limiting
+and serves Prometheus metrics on /metrics.
 """
 
 import os
+import time
 import logging
-from flask import Flask, jsonify
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -30,14 +32,15 @@ def create_app() -> Flask:
     app.url_map.strict_slashes = False
 
     # ── CORS ───────────────────────────────────────────────────────────────────
-    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True, allow_headers=["Content-Type", "Authorization"], methods=["GET", "POST", "PATCH", "PUT", "DELETE", "OPTIONS"])
+    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True, allow_headers=["Content-Type", "Authorization", "Idempotency-Key", "X-FraudSense-Profile"], methods=["GET", "POST", "PATCH", "PUT", "DELETE", "OPTIONS"])
 
     # ── Rate limiting ──────────────────────────────────────────────────────────
-    Limiter(
+    limiter = Limiter(
         get_remote_address,
         app=app,
         default_limits=["200 per day", "60 per minute"],
         storage_uri=os.getenv("REDIS_URL", "memory://"),
+        enabled=os.getenv("RATELIMIT_ENABLED", "1") == "1",
     )
 
     # ── Firebase Admin ─────────────────────────────────────────────────────────
@@ -49,6 +52,9 @@ def create_app() -> Flask:
     else:
         logger.warning("Firebase credentials not found — auth middleware will error.")
 
+    from firebase_middleware import init_token_verifier
+    init_token_verifier()
+
     # ── Database ───────────────────────────────────────────────────────────────
     try:
         init_db()
@@ -59,16 +65,69 @@ def create_app() -> Flask:
     from routes.business     import business_bp
     from routes.transactions import transactions_bp
     from routes.fraud        import fraud_bp
+    from routes.uploads      import uploads_bp, get_upload, put_chunk, finalize_upload
 
     app.register_blueprint(business_bp)
     app.register_blueprint(transactions_bp)
     app.register_blueprint(fraud_bp)
+    app.register_blueprint(uploads_bp)
+
+    # One chunked upload is ~one request per MB; opening the session is what
+    # the default limits count, chunks are bounded by UPLOAD_MAX_CHUNKS
+    for view in (get_upload, put_chunk, finalize_upload):
+        limiter.exempt(view)
 
     # ── Health check ───────────────────────────────────────────────────────────
+    from metrics import HTTP_SECONDS, render_metrics, authorized
+
     @app.route("/health", methods=["GET"])
     def health():
         return jsonify({"status": "ok", "service": "FraudSense API v2"}), 200
 
+    @app.route("/health/details", methods=["GET"])
+    @limiter.exempt
+    def health_details():
+        if not authorized(request.headers.get("Authorization"), request.remote_addr):
+            return jsonify({"error": "Unauthorized"}), 401
+        from fraud_engine.network import get_vendor_graph
+        from fraud_engine.rules import get_rule_config_store
+        from fraud_engine.vendor_lists import get_vendor_lists
+        from fraud_engine.vendors import cache_stats
+        from geoip import geoip_stats
+        return jsonify({
+            "status":       "ok",
+            "service":      "FraudSense API v2",
+            "vendor_graph": get_vendor_graph().stats(),
+            "rule_config":  get_rule_config_store().stats(),
+            "vendor_lists": get_vendor_lists().stats(),
+            "vendor_canon": cache_stats(),
+            "geoip":        geoip_stats(),
+        }), 200
+
+    # ── Metrics ────────────────────────────────────────────────────────────────
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            HTTP_SECONDS.observe(time.perf_counter() - started,
+                                 request.endpoint or "unmatched", request.method,
+                                 str(response.status_code))
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    @limiter.exempt
+    def metrics():
+        if not authorized(request.headers.get("Authorization"), request.remote_addr):
+            return jsonify({"error": "Unauthorized"}), 401
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+    from profiling import init_profiling
+    init_profiling(app)
+
     # ── Global error handlers ──────────────────────────────────────────────────
     @app.errorhandler(404)
     def not_found(e):
@@ -0,0 +1,130 @@
+"""
+FraudSense — Write-Behind Audit Log
+Routes hand audit events to AuditWriter.record(), which only enqueues them.
+A background thread batches the queue into audit_logs with one multi-row
+INSERT per flush (every AUDIT_BATCH_SIZE events or AUDIT_FLUSH_SECONDS,
+whichever comes first), and whatever is still queued is flushed on shutdown.
+
+The queue is bounded: if the database falls behind, new events are dropped
+and counted rather than slowing down ingest.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import insert
+
+from database import SessionLocal, AuditLog
+
+logger = logging.getLogger("fraudsense.audit")
+
+AUDIT_QUEUE_SIZE    = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE    = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "2.0"))
+
+_STOP = object()
+
+
+class AuditWriter:
+    def __init__(self, session_factory=SessionLocal, maxsize: int = AUDIT_QUEUE_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE, interval: float = AUDIT_FLUSH_SECONDS):
+        self.session_factory = session_factory
+        self.batch_size      = batch_size
+        self.interval        = interval
+        self.written         = 0
+        self.dropped         = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def record(self, event_type: str, business_id: Optional[int] = None,
+               transaction_id: Optional[int] = None, actor_uid: Optional[str] = None,
+               **details) -> bool:
+        """Enqueue one event; never blocks. Returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait({
+                "event_type":     event_type,
+                "business_id":    business_id,
+                "transaction_id": transaction_id,
+                "actor_uid":      actor_uid,
+                "details":        json.dumps(details, default=str),
+                "created_at":     datetime.now(timezone.utc),
+            })
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Audit queue full — {self.dropped} events dropped so far")
+            return False
+
+    def close(self, timeout: float = 10.0):
+        """Flush everything queued and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Audit queue still full at shutdown — remaining events lost")
+            return
+        thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        batch    = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._write(batch)
+                    batch = []
+                deadline = time.monotonic() + self.interval
+        if batch:
+            self._write(batch)
+
+    def _write(self, rows: list[dict]):
+        session = self.session_factory()
+        try:
+            session.execute(insert(AuditLog), rows)
+            session.commit()
+            self.written += len(rows)
+        except Exception as e:
+            session.rollback()
+            self.dropped += len(rows)
+            logger.error(f"Audit flush of {len(rows)} events failed: {e}")
+        finally:
+            session.close()
+
+
+# ── Singleton ─────────────────────────────────────────────────────────────────
+_audit_writer = AuditWriter()
+
+
+def get_audit_writer() -> AuditWriter:
+    return _audit_writer
@@ -0,0 +1,86 @@
+"""
+FraudSense — Cascade Mode Offline Report
+Scores the same synthetic workload twice — full 4-layer engine vs cascade
+mode — and reports the speedup and how far cascade verdicts differ.
+
+Usage:
+    cd backend
+    python -m bench.cascade_report --rows 2000 [--out cascade_report.json]
+"""
+
+import argparse
+import json
+import time
+import warnings
+
+from bench.workload import synthetic_workload
+
+
+def _run(items: list, cascade: bool) -> tuple[list, float]:
+    from fraud_engine import network
+    from fraud_engine.engine import analyze
+
+    network._vendor_graph = None          # fresh graph per run
+    verdicts = []
+    t0 = time.perf_counter()
+    for item in items:
+        verdicts.append(analyze(dict(item["tx"]), item["business_id"],
+                                item["business_avg_amount"], cascade=cascade))
+    return verdicts, time.perf_counter() - t0
+
+
+def build_report(rows: int, seed: int) -> dict:
+    from fraud_engine.engine import CASCADE_TOLERANCE, REVIEW_THRESHOLD
+
+    items = synthetic_workload(rows, seed=seed)
+    _run(items[:20], cascade=False)       # warm model + explainer singletons
+
+    full,    t_full    = _run(items, cascade=False)
+    cascade, t_cascade = _run(items, cascade=True)
+
+    skipped      = [i for i, v in enumerate(cascade) if v.cascade_skipped]
+    score_diffs  = [abs(full[i].final_score - cascade[i].final_score) for i in range(len(items))]
+    flips = {
+        key: sum(getattr(f, key) != getattr(c, key) for f, c in zip(full, cascade))
+        for key in ("is_fraud", "risk_level", "review_required")
+    }
+
+    return {
+        "rows":                 len(items),
+        "review_threshold":     REVIEW_THRESHOLD,
+        "cascade_tolerance":    CASCADE_TOLERANCE,
+        "full_seconds":         round(t_full, 3),
+        "cascade_seconds":      round(t_cascade, 3),
+        "speedup":              round(t_full / t_cascade, 2) if t_cascade else None,
+        "full_ms_per_row":      round(t_full / len(items) * 1000, 3),
+        "cascade_ms_per_row":   round(t_cascade / len(items) * 1000, 3),
+        "skipped_rows":         len(skipped),
+        "skipped_fraction":     round(len(skipped) / len(items), 4),
+        "verdict_flips":        flips,
+        "max_final_score_diff": round(max(score_diffs), 4),
+        "skipped_max_full_score": round(max((full[i].final_score for i in skipped), default=0.0), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out",  default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    report = build_report(args.rows, args.seed)
+
+    print("\nCascade mode report")
+    for key, value in report.items():
+        print(f"  {key:<24} {value}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+FraudSense — Fraud Engine Benchmark Suite
+Regression benchmark for fraud_engine.engine on the ml/generate_data.py
+workload. Measures:
+
+  layers:   per-layer latency (rules, ML, SHAP, network) p50 / p99 / mean
+  single:   end-to-end analyze() latency per row, p50 / p99
+  batch:    analyze_batch() throughput at several batch sizes
+  network:  network-layer latency as the vendor graph grows
+  instrumentation: metrics.py overhead, analyze() with metrics on vs off
+
+Results are JSON, stamped with the git commit and model version, so runs can
+be diffed across commits:
+
+Usage:
+    cd backend
+    python -m bench.engine_bench [--rows 500] --out bench_HEAD.json
+    python -m bench.engine_bench --compare bench_main.json bench_HEAD.json [--threshold 0.10]
+
+--compare exits 1 when any latency grows (or throughput drops) by more than
+--threshold, so it can gate CI.
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import warnings
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from bench.workload import synthetic_workload, BACKEND_DIR
+
+BATCH_SIZES = [1, 10, 100, 1000]
+GRAPH_SIZES = [100, 1000, 5000, 20000]
+NETWORK_PROBES = 200
+
+
+# ── Timing helpers ─────────────────────────────────────────────────────────────
+
+def _summary(samples: list[float]) -> dict:
+    """Latency samples (seconds) → milliseconds p50 / p99 / mean."""
+    ms = np.asarray(samples, dtype=float) * 1000
+    return {
+        "n":       len(ms),
+        "p50_ms":  round(float(np.percentile(ms, 50)), 4),
+        "p99_ms":  round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+    }
+
+
+def _timed(fn, *args, **kwargs) -> tuple[object, float]:
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def _fresh_graph():
+    from fraud_engine import network
+    network._vendor_graph = None
+
+
+# ── Sections ───────────────────────────────────────────────────────────────────
+
+def bench_layers(items: list) -> dict:
+    """Each layer called on its own, in engine order, on the same rows."""
+    from fraud_engine.rules import evaluate_rules
+    from fraud_engine.explainer import explain_transaction
+    from fraud_engine.network import analyze_transaction_network
+    from model import predict_fraud, _build_feature_vector
+
+    _fresh_graph()
+    samples = {"rules": [], "ml": [], "shap": [], "network": []}
+    for item in items:
+        tx = dict(item["tx"], business_avg_amount=item["business_avg_amount"])
+        _, t = _timed(evaluate_rules, tx)
+        samples["rules"].append(t)
+
+        t0 = time.perf_counter()
+        predict_fraud(tx)
+        features = _build_feature_vector(tx)
+        samples["ml"].append(time.perf_counter() - t0)
+
+        _, t = _timed(explain_transaction, features, top_n=4)
+        samples["shap"].append(t)
+
+        _, t = _timed(analyze_transaction_network, tx, item["business_id"])
+        samples["network"].append(t)
+    return {layer: _summary(s) for layer, s in samples.items()}
+
+
+def bench_single(items: list) -> dict:
+    """End-to-end analyze(), one row at a time."""
+    from fraud_engine.engine import analyze
+
+    _fresh_graph()
+    samples = []
+    for item in items:
+        _, t = _timed(analyze, dict(item["tx"]), item["business_id"],
+                      item["business_avg_amount"], cascade=False)
+        samples.append(t)
+    summary = _summary(samples)
+    summary["rows_per_sec"] = round(len(samples) / sum(samples), 1)
+    return summary
+
+
+def bench_batch(items: list, sizes: list[int]) -> dict:
+    """analyze_batch() throughput; one business per batch, as an upload would be."""
+    from fraud_engine.engine import analyze_batch
+
+    out = {}
+    for size in sizes:
+        if size > len(items):
+            continue
+        _fresh_graph()
+        n_batches = max(1, min(len(items) // size, 20))
+        elapsed = 0.0
+        for b in range(n_batches):
+            chunk = items[b * size:(b + 1) * size]
+            txs   = [dict(item["tx"]) for item in chunk]
+            avg   = float(np.mean([item["business_avg_amount"] for item in chunk]))
+            _, t  = _timed(analyze_batch, txs, chunk[0]["business_id"], avg, cascade=False)
+            elapsed += t
+        rows = n_batches * size
+        out[str(size)] = {
+            "batches":     n_batches,
+            "rows":        rows,
+            "rows_per_sec": round(rows / elapsed, 1),
+            "ms_per_row":  round(elapsed / rows * 1000, 4),
+        }
+    return out
+
+
+def bench_network(sizes: list[int], seed: int) -> dict:
+    """
+    Network layer latency after pre-loading the graph with N transactions.
+    The workload's vendor mix is Zipf-skewed and would barely grow the graph,
+    so pre-load rows are spread over N / 4 distinct vendors.
+    """
+    from fraud_engine.network import get_vendor_graph, analyze_transaction_network
+
+    prefill = synthetic_workload(max(sizes), seed=seed + 1)
+    probes  = synthetic_workload(NETWORK_PROBES, seed=seed + 2)
+    rng     = np.random.default_rng(seed)
+
+    out = {}
+    for size in sizes:
+        _fresh_graph()
+        graph   = get_vendor_graph()
+        vendors = rng.integers(0, max(1, size // 4), size)
+        for item, v in zip(prefill[:size], vendors):
+            tx = item["tx"]
+            graph.add_transaction(item["business_id"], f"Bench Vendor {v}", tx["amount"], tx["timestamp"])
+        nodes, edges = graph.G.number_of_nodes(), graph.G.number_of_edges()
+
+        samples = []
+        for item in probes:
+            _, t = _timed(analyze_transaction_network, dict(item["tx"]), item["business_id"])
+            samples.append(t)
+        out[str(size)] = {"nodes": nodes, "edges": edges, **_summary(samples)}
+    return out
+
+
+def bench_instrumentation(items: list, rounds: int = 5) -> dict:
+    """
+    analyze() with metrics recording on vs off, interleaved, best of `rounds`.
+    Also times the per-row metric calls alone, which is the stable number
+    when the end-to-end difference is inside run-to-run noise.
+    """
+    import metrics
+    from fraud_engine.engine import analyze
+    from fraud_engine.rules import evaluate_rules
+
+    best = {True: float("inf"), False: float("inf")}
+    try:
+        for _ in range(rounds):
+            for enabled in (False, True):
+                metrics.set_enabled(enabled)
+                _fresh_graph()
+                t0 = time.perf_counter()
+                for item in items:
+                    analyze(dict(item["tx"]), item["business_id"],
+                            item["business_avg_amount"], cascade=False)
+                best[enabled] = min(best[enabled], time.perf_counter() - t0)
+
+        # the calls engine.analyze makes per row: 4 stage observations + verdict
+        metrics.set_enabled(True)
+        flags = [evaluate_rules(dict(item["tx"]))["flags"] for item in items]
+        t0 = time.perf_counter()
+        for f in flags:
+            for stage in ("rules", "ml", "shap", "network"):
+                metrics.STAGE_SECONDS.observe(0.001, stage)
+            metrics.record_verdict("low", f)
+        per_row = (time.perf_counter() - t0) / len(items)
+    finally:
+        metrics.set_enabled(metrics.METRICS_ENABLED)
+
+    off, on = best[False], best[True]
+    return {
+        "rows":              len(items),
+        "off_seconds":       round(off, 4),
+        "on_seconds":        round(on, 4),
+        "measured_pct":      round((on - off) / off * 100, 3),
+        "metric_us_per_row": round(per_row * 1e6, 3),
+        "estimated_pct":     round(per_row / (off / len(items)) * 100, 4),
+    }
+
+
+# ── Report ─────────────────────────────────────────────────────────────────────
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(rows: int, seed: int, batch_sizes: list[int], graph_sizes: list[int]) -> dict:
+    from fraud_engine.engine import analyze
+    from model import get_model_metadata
+
+    items = synthetic_workload(max(rows, max(batch_sizes)), seed=seed)
+    _fresh_graph()
+    for item in items[:20]:               # warm model + explainer singletons
+        analyze(dict(item["tx"]), item["business_id"], item["business_avg_amount"], cascade=False)
+
+    return {
+        "meta": {
+            "commit":        _git_commit(),
+            "model_version": get_model_metadata().get("trained_at"),
+            "created_at":    datetime.now(timezone.utc).isoformat(),
+            "python":        platform.python_version(),
+            "machine":       platform.machine(),
+            "rows":          rows,
+            "seed":          seed,
+        },
+        "layers":  bench_layers(items[:rows]),
+        "single":  bench_single(items[:rows]),
+        "batch":   bench_batch(items, batch_sizes),
+        "network": bench_network(graph_sizes, seed),
+        "instrumentation": bench_instrumentation(items[:rows]),
+    }
+
+
+# ── Compare ────────────────────────────────────────────────────────────────────
+
+# metric leaf name → True when higher is better
+COMPARED_METRICS = {"p50_ms": False, "p99_ms": False, "mean_ms": False,
+                    "ms_per_row": False, "rows_per_sec": True}
+
+
+def _flatten(report: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in report.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif key in COMPARED_METRICS:
+            flat[path] = value
+    return flat
+
+
+def compare(base: dict, head: dict, threshold: float) -> tuple[list[dict], list[dict]]:
+    """Per-metric change head vs base; second list holds the regressions."""
+    base_flat, head_flat = _flatten(base), _flatten(head)
+    rows, regressions = [], []
+    for path, old in base_flat.items():
+        new = head_flat.get(path)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        worse  = -change if COMPARED_METRICS[path.rsplit(".", 1)[1]] else change
+        row = {"metric": path, "base": old, "head": new, "change": round(change, 4)}
+        rows.append(row)
+        if worse > threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def _print_compare(base: dict, head: dict, threshold: float) -> int:
+    rows, regressions = compare(base, head, threshold)
+    print(f"\nEngine benchmark: {base['meta'].get('commit')} → {head['meta'].get('commit')}"
+          f" (threshold {threshold:.0%})")
+    flagged = {r["metric"] for r in regressions}
+    for r in rows:
+        mark = "  REGRESSION" if r["metric"] in flagged else ""
+        print(f"  {r['metric']:<32} {r['base']:>12} → {r['head']:>12}  {r['change']:+.1%}{mark}")
+    print(f"  {len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows",        type=int, default=500)
+    parser.add_argument("--seed",        type=int, default=7)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--graph-sizes", type=int, nargs="+", default=GRAPH_SIZES)
+    parser.add_argument("--out",         default=None, help="Write the report as JSON")
+    parser.add_argument("--compare",     nargs=2, metavar=("BASE", "HEAD"),
+                        help="Diff two saved reports instead of running")
+    parser.add_argument("--threshold",   type=float, default=0.10,
+                        help="Relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            head = json.load(f)
+        sys.exit(_print_compare(base, head, args.threshold))
+
+    warnings.filterwarnings("ignore")
+    report = build_report(args.rows, args.seed, args.batch_sizes, args.graph_sizes)
+
+    print("\nFraud engine benchmark")
+    print(json.dumps(report, indent=2))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+FraudSense — Geo-IP Lookup Benchmark
+Writes a synthetic IPv4 range CSV (DB-IP style start,end,country) of
+--ranges rows, then times:
+
+  build:   CSV → sorted arrays + .npy cache (first start)
+  load:    memory-mapping the cache (every later start)
+  single:  GeoIPTable.lookup() per IP
+  batch:   lookup_many() over IP strings and over uint32 addresses
+
+and checks lookup_many() against lookup() on a sample.
+
+Usage:
+    cd backend
+    python -m bench.geoip_bench [--ranges 3000000] [--lookups 1000000] [--out geoip_bench.json]
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+import bench.workload  # noqa: F401  (puts backend/ on sys.path)
+
+COUNTRIES = ["US", "GB", "DE", "FR", "IN", "CN", "BR", "NG", "RU", "AU", "JP", "CA"]
+
+
+def write_ranges(path: str, n: int, seed: int):
+    """n non-overlapping ranges with gaps, covering most of the IPv4 space."""
+    rng    = np.random.default_rng(seed)
+    starts = np.sort(rng.choice(2**32 - 1, size=n, replace=False)).astype(np.int64)
+    gaps   = np.diff(np.append(starts, 2**32))
+    ends   = starts + np.maximum(0, (gaps * rng.uniform(0.5, 1.0, n)).astype(np.int64) - 1)
+    cc     = np.asarray(COUNTRIES)[rng.integers(len(COUNTRIES), size=n)]
+
+    def dotted(values):
+        return [f"{v >> 24}.{(v >> 16) & 255}.{(v >> 8) & 255}.{v & 255}" for v in values.tolist()]
+
+    with open(path, "w") as f:
+        f.write("ip_start,ip_end,country\n")
+        for chunk in range(0, n, 500_000):
+            part = slice(chunk, chunk + 500_000)
+            f.writelines(f"{a},{b},{c}\n" for a, b, c in
+                         zip(dotted(starts[part]), dotted(ends[part]), cc[part].tolist()))
+
+
+def build_report(ranges: int, lookups: int, seed: int) -> dict:
+    from geoip import GeoIPTable
+
+    workdir = tempfile.mkdtemp(prefix="geoip_bench_")
+    try:
+        path = os.path.join(workdir, "ranges.csv")
+        write_ranges(path, ranges, seed)
+
+        t0 = time.perf_counter()
+        GeoIPTable.load(path)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        table = GeoIPTable.load(path)
+        t_load = time.perf_counter() - t0
+
+        rng   = np.random.default_rng(seed + 1)
+        addrs = rng.integers(0, 2**32, size=lookups, dtype=np.uint64).astype(np.uint32)
+        ips   = [f"{v >> 24}.{(v >> 16) & 255}.{(v >> 8) & 255}.{v & 255}" for v in addrs.tolist()]
+
+        sample = ips[:min(100_000, lookups)]
+        t0 = time.perf_counter()
+        single = [table.lookup(ip) for ip in sample]
+        t_single = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = table.lookup_many(ips)
+        t_batch = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        table.lookup_many(addrs)
+        t_batch_int = time.perf_counter() - t0
+
+        return {
+            "ranges":                 len(table),
+            "csv_mb":                 round(os.path.getsize(path) / 1e6, 1),
+            "build_seconds":          round(t_build, 3),
+            "mmap_load_seconds":      round(t_load, 5),
+            "mapped":                 table.stats()["mapped"],
+            "hit_rate":               round(float(np.mean(batch != "")), 4),
+            "single_per_sec":         round(len(sample) / t_single),
+            "batch_str_per_sec":      round(lookups / t_batch),
+            "batch_uint32_per_sec":   round(lookups / t_batch_int),
+            "batch_single_mismatches": int(sum(a != b for a, b in zip(single, batch.tolist()))),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--ranges",  type=int, default=3_000_000)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--seed",    type=int, default=7)
+    parser.add_argument("--out",     default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = build_report(args.ranges, args.lookups, args.seed)
+
+    print("\nGeo-IP lookup")
+    for key, value in report.items():
+        print(f"  {key:<24} {value}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+FraudSense — HTTP Load Test
+Boots the real Flask app offline and drives mixed API traffic at it:
+
+  - DATABASE_URL defaults to a throwaway SQLite file (WAL mode, busy timeout)
+    instead of Postgres; pass --database-url to aim at a real database
+  - AUTH_VERIFIER=local swaps Firebase for the HMAC stand-in verifier, and
+    each simulated tenant gets its own locally issued token
+  - RATELIMIT_ENABLED=0 so the per-IP limits don't throttle the harness
+
+The app is served by werkzeug's threaded server on a free local port and
+--concurrency worker threads issue requests over http.client, each picking
+an endpoint from --mix:
+
+  upload   POST  /transactions/upload        JSON batch of --batch new rows
+  list     GET   /transactions/?page=N
+  stats    GET   /fraud/stats
+  alerts   GET   /fraud/alerts
+  explain  GET   /transactions/<id>/explain
+  review   PATCH /transactions/<id>/review
+
+Reports throughput and p50 / p95 / p99 latency per endpoint.
+
+Usage:
+    cd backend
+    python -m bench.load_test --concurrency 8 --duration 30 [--out load_test.json]
+    python -m bench.load_test --mix upload=1,list=4,stats=3,alerts=2,explain=1,review=1
+"""
+
+import os
+import json
+import time
+import random
+import secrets
+import tempfile
+import logging
+import argparse
+import threading
+import warnings
+import http.client
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+
+DEFAULT_MIX = "upload=1,list=4,stats=3,alerts=2,explain=1,review=1"
+REVIEW_CHOICES = ["confirmed_fraud", "false_positive", "pending_review"]
+
+
+def _configure_env(database_url: str):
+    """Must run before the app (and database.py) is imported."""
+    os.environ["DATABASE_URL"]      = database_url
+    os.environ["AUTH_VERIFIER"]     = "local"
+    os.environ.setdefault("LOCAL_AUTH_SECRET", secrets.token_urlsafe(32))
+    os.environ["RATELIMIT_ENABLED"] = "0"
+
+
+def _tune_sqlite():
+    """WAL + busy timeout so concurrent writers queue instead of failing."""
+    from sqlalchemy import event
+    from database import engine
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA busy_timeout=30000")
+        cur.close()
+
+
+class Server:
+    """create_app() on werkzeug's threaded server, in a daemon thread."""
+
+    def __init__(self):
+        from werkzeug.serving import make_server
+        import app as app_module
+
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self.httpd  = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+        self.port   = self.httpd.server_port
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+
+
+class Client:
+    def __init__(self, port: int, token: str):
+        self.conn    = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        self.headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    def call(self, method: str, path: str, body=None) -> tuple[int, bytes]:
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, body=payload, headers=self.headers)
+            resp = self.conn.getresponse()
+            return resp.status, resp.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            return 0, b""
+
+
+class RowPool:
+    """Hands out fresh workload rows, each with a unique client transaction id."""
+
+    def __init__(self, seed: int, size: int = 5000):
+        from bench.workload import synthetic_workload
+        self.rows  = [item["tx"] for item in synthetic_workload(size, seed=seed)]
+        self.next  = 0
+        self._lock = threading.Lock()
+
+    def take(self, n: int) -> list[dict]:
+        with self._lock:
+            start, self.next = self.next, self.next + n
+        return [dict(self.rows[(start + i) % len(self.rows)], transaction_id=f"lt-{start + i}")
+                for i in range(n)]
+
+
+class Tenant:
+    """A simulated business: its token and the transaction ids it can explain / review."""
+
+    def __init__(self, uid: str, token: str):
+        self.uid, self.token = uid, token
+        self.txn_ids: list[int] = []
+        self._lock = threading.Lock()
+
+    def add_ids(self, ids: list[int]):
+        with self._lock:
+            self.txn_ids.extend(ids)
+
+    def random_id(self, rng: random.Random):
+        with self._lock:
+            return rng.choice(self.txn_ids) if self.txn_ids else None
+
+
+# ── Traffic ────────────────────────────────────────────────────────────────────
+
+def _request_for(kind: str, tenant: Tenant, pool: RowPool, batch: int, rng: random.Random):
+    """(method, path, body) for one request of the given kind, or None if not possible yet."""
+    if kind == "upload":
+        return "POST", "/transactions/upload", pool.take(batch)
+    if kind == "list":
+        return "GET", f"/transactions/?page={rng.randint(1, 3)}&limit=50", None
+    if kind == "stats":
+        return "GET", "/fraud/stats", None
+    if kind == "alerts":
+        return "GET", "/fraud/alerts?limit=50", None
+    txn_id = tenant.random_id(rng)
+    if txn_id is None:
+        return None
+    if kind == "explain":
+        return "GET", f"/transactions/{txn_id}/explain", None
+    if kind == "review":
+        return "PATCH", f"/transactions/{txn_id}/review", {"status": rng.choice(REVIEW_CHOICES)}
+    raise ValueError(f"unknown request kind {kind!r}")
+
+
+def _seed_tenant(port: int, tenant: Tenant, pool: RowPool, rows: int):
+    """Give each tenant data to list / explain / review before the clock starts."""
+    client = Client(port, tenant.token)
+    status, body = client.call("POST", "/transactions/upload", pool.take(rows))
+    if status != 200:
+        raise RuntimeError(f"Seeding {tenant.uid} failed: {status} {body[:200]!r}")
+    page = 1
+    while len(tenant.txn_ids) < rows:
+        status, body = client.call("GET", f"/transactions/?page={page}&limit=100")
+        listed = json.loads(body)["data"]["transactions"] if status == 200 else []
+        if not listed:
+            break
+        tenant.add_ids([t["id"] for t in listed])
+        page += 1
+
+
+def _worker(port: int, tenants: list, pool: RowPool, mix: dict, batch: int,
+            deadline: float, seed: int, samples: dict, lock: threading.Lock):
+    rng     = random.Random(seed)
+    kinds   = list(mix)
+    weights = [mix[k] for k in kinds]
+    clients = {t.uid: Client(port, t.token) for t in tenants}
+    local   = defaultdict(list)
+
+    while time.perf_counter() < deadline:
+        kind   = rng.choices(kinds, weights)[0]
+        tenant = rng.choice(tenants)
+        req    = _request_for(kind, tenant, pool, batch, rng)
+        if req is None:
+            continue
+        t0 = time.perf_counter()
+        status, _ = clients[tenant.uid].call(*req)
+        local[kind].append((time.perf_counter() - t0, status))
+
+    with lock:
+        for kind, rows in local.items():
+            samples[kind].extend(rows)
+
+
+def _summarize(rows: list, elapsed: float) -> dict:
+    latencies = np.array([t for t, _ in rows]) * 1000
+    statuses  = defaultdict(int)
+    for _, status in rows:
+        statuses[str(status)] += 1
+    return {
+        "requests": len(rows),
+        "errors":   sum(1 for _, s in rows if not 200 <= s < 300),
+        "statuses": dict(statuses),
+        "rps":      round(len(rows) / elapsed, 2),
+        "p50_ms":   round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms":   round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms":   round(float(np.percentile(latencies, 99)), 2),
+        "max_ms":   round(float(latencies.max()), 2),
+    }
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = float(weight or 1)
+    unknown = set(mix) - {"upload", "list", "stats", "alerts", "explain", "review"}
+    if unknown:
+        raise ValueError(f"unknown request kinds in --mix: {sorted(unknown)}")
+    return mix
+
+
+def run(concurrency: int, duration: float, tenants_n: int, mix: dict, batch: int,
+        seed_rows: int, seed: int) -> dict:
+    from database import engine
+    from firebase_middleware import get_verifier
+
+    verifier = get_verifier()
+    pool     = RowPool(seed)
+    tenants  = [Tenant(f"loadtest-{i}", verifier.issue(f"loadtest-{i}", ttl=24 * 3600,
+                                                       email=f"loadtest-{i}@example.com"))
+                for i in range(tenants_n)]
+
+    with Server() as server:
+        for tenant in tenants:
+            _seed_tenant(server.port, tenant, pool, seed_rows)
+
+        samples, lock = defaultdict(list), threading.Lock()
+        deadline = time.perf_counter() + duration
+        started  = time.perf_counter()
+        workers  = [threading.Thread(target=_worker,
+                                     args=(server.port, tenants, pool, mix, batch,
+                                           deadline, seed + i, samples, lock))
+                    for i in range(concurrency)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - started
+
+    everything = [row for rows in samples.values() for row in rows]
+    return {
+        "meta": {
+            "created_at":  datetime.now(timezone.utc).isoformat(),
+            "database":    engine.dialect.name,
+            "concurrency": concurrency,
+            "duration":    round(elapsed, 2),
+            "tenants":     tenants_n,
+            "mix":         mix,
+            "upload_batch": batch,
+        },
+        "total":     _summarize(everything, elapsed) if everything else {},
+        "endpoints": {kind: _summarize(rows, elapsed) for kind, rows in sorted(samples.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--concurrency",  type=int,   default=8)
+    parser.add_argument("--duration",     type=float, default=20.0, help="Seconds of traffic")
+    parser.add_argument("--tenants",      type=int,   default=4)
+    parser.add_argument("--mix",          default=DEFAULT_MIX, help="kind=weight,...")
+    parser.add_argument("--batch",        type=int,   default=50, help="Rows per upload")
+    parser.add_argument("--seed-rows",    type=int,   default=200, help="Rows uploaded per tenant up front")
+    parser.add_argument("--seed",         type=int,   default=7)
+    parser.add_argument("--database-url", default=None,
+                        help="Defaults to a fresh SQLite file in a temp directory")
+    parser.add_argument("--out",          default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    database_url = args.database_url
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="fraudsense-load-"), "load.db")
+    _configure_env(database_url)
+    _tune_sqlite()
+
+    warnings.filterwarnings("ignore")
+    report = run(args.concurrency, args.duration, args.tenants, mix, args.batch,
+                 args.seed_rows, args.seed)
+
+    print(f"\nLoad test — {report['meta']['database']}, concurrency {args.concurrency}, "
+          f"{report['meta']['duration']}s")
+    print(f"  {'endpoint':<10} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for kind, s in [*report["endpoints"].items(), ("TOTAL", report["total"])]:
+        if s:
+            print(f"  {kind:<10} {s['requests']:>7} {s['errors']:>5} {s['rps']:>8} "
+                  f"{s['p50_ms']:>8}ms {s['p95_ms']:>8}ms {s['p99_ms']:>8}ms")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
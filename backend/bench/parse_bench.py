@@ -0,0 +1,110 @@
+"""
+FraudSense — Upload Parse Throughput Report
+Encodes the same synthetic workload as CSV and as Parquet and times each
+upload path from raw bytes to scoring input:
+
+  csv:     DictReader + coerce_row() per row + per-row ML feature vectors
+  parquet: read_columnar() + build_feature_matrix() + columns_to_rows()
+
+Also times ML scoring per row (predict_fraud) vs one predict_fraud_batch call.
+
+Usage:
+    cd backend
+    python -m bench.parse_bench --rows 20000 [--out parse_bench.json]
+"""
+
+import io
+import csv
+import json
+import time
+import argparse
+import warnings
+
+import numpy as np
+
+from bench.workload import synthetic_workload
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def build_report(rows: int, seed: int, repeat: int) -> dict:
+    import pandas as pd
+    from ingest import coerce_row, read_columnar, columns_to_rows
+    from model import _build_feature_vector, build_feature_matrix, predict_fraud, predict_fraud_batch
+
+    items = synthetic_workload(rows, seed=seed)
+    frame = pd.DataFrame([item["tx"] for item in items])
+
+    buf = io.StringIO()
+    frame.to_csv(buf, index=False)
+    csv_bytes = buf.getvalue().encode()
+    pq_buf = io.BytesIO()
+    frame.to_parquet(pq_buf, index=False)
+    parquet_bytes = pq_buf.getvalue()
+
+    def parse_csv():
+        reader = csv.DictReader(io.StringIO(csv_bytes.decode("utf-8")))
+        txs = [coerce_row(row) for row in reader]
+        return txs, np.array([_build_feature_vector(tx) for tx in txs], dtype=float)
+
+    def parse_parquet():
+        cols = read_columnar(parquet_bytes)
+        return columns_to_rows(cols), build_feature_matrix(cols)
+
+    csv_txs, csv_features = parse_csv()
+    pq_txs,  pq_features  = parse_parquet()
+
+    t_csv     = _best_of(parse_csv, repeat)
+    t_parquet = _best_of(parse_parquet, repeat)
+
+    sample = csv_txs[:min(2000, len(csv_txs))]
+    t_ml_row   = _best_of(lambda: [predict_fraud(tx) for tx in sample], 1) / len(sample) * len(csv_txs)
+    t_ml_batch = _best_of(lambda: predict_fraud_batch(pq_features), repeat)
+
+    return {
+        "rows":                   len(items),
+        "csv_bytes":              len(csv_bytes),
+        "parquet_bytes":          len(parquet_bytes),
+        "csv_parse_seconds":      round(t_csv, 4),
+        "parquet_parse_seconds":  round(t_parquet, 4),
+        "csv_rows_per_sec":       round(len(items) / t_csv),
+        "parquet_rows_per_sec":   round(len(items) / t_parquet),
+        "parse_speedup":          round(t_csv / t_parquet, 2),
+        "rows_identical":         csv_txs == pq_txs,
+        "max_feature_diff":       float(np.abs(csv_features - pq_features).max()),
+        "ml_per_row_seconds":     round(t_ml_row, 4),
+        "ml_batch_seconds":       round(t_ml_batch, 4),
+        "ml_batch_speedup":       round(t_ml_row / t_ml_batch, 1) if t_ml_batch else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows",   type=int, default=20000)
+    parser.add_argument("--seed",   type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing")
+    parser.add_argument("--out",    default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    report = build_report(args.rows, args.seed, args.repeat)
+
+    print("\nUpload parse throughput")
+    for key, value in report.items():
+        print(f"  {key:<24} {value}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
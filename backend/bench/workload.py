@@ -0,0 +1,92 @@
+"""
+FraudSense — Benchmark Workloads
+Turns the feature-level synthetic dataset from ml/generate_data.py back into
+raw transaction rows (the shape /transactions/upload receives), so offline
+reports and benchmarks exercise the real engine code paths.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from ml.generate_data import (                       # noqa: E402
+    generate_dataset, PAYMENT_ENC, HIGH_RISK_CC, SAFE_CC, CATEGORIES,
+)
+
+N_VENDORS      = 2_000
+N_SHELL_VENDOR = 25       # small pool fraud rows are steered towards
+N_BUSINESSES   = 200
+BASE_DATE      = datetime(2025, 1, 6, tzinfo=timezone.utc)   # a Monday
+
+PAYMENT_DEC = {v: k for k, v in PAYMENT_ENC.items()}
+
+
+def synthetic_workload(n: int = 2_000, seed: int = 7) -> list[dict]:
+    """
+    Return n workload items:
+    {"tx": dict, "business_id": int, "business_avg_amount": float, "is_fraud": int}
+    """
+    df  = generate_dataset(output_path=None, n=n, seed=seed)
+    rng = np.random.default_rng(seed)
+
+    high_risk = sorted(HIGH_RISK_CC)
+    vendors   = [f"Vendor {i:04d}" for i in range(N_VENDORS)]
+    shells    = [f"Shell Trading {i:02d}" for i in range(N_SHELL_VENDOR)]
+
+    vendor_w  = rng.zipf(1.3, N_VENDORS).astype(float)
+    vendor_w /= vendor_w.sum()
+    biz_w     = rng.zipf(1.5, N_BUSINESSES).astype(float)
+    biz_w    /= biz_w.sum()
+
+    items = []
+    for row in df.itertuples(index=False):
+        fraud  = int(row.is_fraud)
+        amount = float(row.amount)
+        if row.round_amount:
+            amount = max(1000.0, round(amount / 1000.0) * 1000.0)
+
+        if fraud and rng.random() < 0.30:
+            vendor = shells[rng.integers(N_SHELL_VENDOR)]
+        else:
+            vendor = vendors[rng.choice(N_VENDORS, p=vendor_w)]
+
+        vendor_country = (high_risk[rng.integers(len(high_risk))]
+                          if row.high_risk_country else SAFE_CC[rng.integers(len(SAFE_CC))])
+        ip_country     = vendor_country
+        if row.country_mismatch:
+            ip_country = next(c for c in SAFE_CC if c != vendor_country)
+
+        ts = BASE_DATE + timedelta(days=int(row.day_of_week) + 7 * int(rng.integers(0, 8)),
+                                   hours=int(row.hour_of_day),
+                                   minutes=int(rng.integers(0, 60)))
+        prev_balance = amount * float(rng.uniform(4, 12))
+
+        items.append({
+            "tx": {
+                "amount":              round(amount, 2),
+                "vendor_name":         vendor,
+                "category":            "crypto" if row.is_crypto_category
+                                       else CATEGORIES[rng.integers(len(CATEGORIES))],
+                "payment_method":      PAYMENT_DEC.get(int(row.payment_method_encoded), "credit_card"),
+                "timestamp":           ts.isoformat(),
+                "previous_balance":    round(prev_balance, 2),
+                "new_balance":         round(prev_balance * (1 - float(row.balance_drop_ratio)), 2),
+                "ip_country":          ip_country,
+                "vendor_country":      vendor_country,
+                "time_since_last_txn": float(row.time_since_last_txn),
+                "num_txns_last_1h":    int(row.num_txns_last_1h),
+                "num_txns_last_24h":   int(row.num_txns_last_24h),
+                "vendor_risk_score":   float(row.vendor_risk_score),
+                "is_new_vendor":       int(row.is_new_vendor),
+            },
+            "business_id":         int(rng.choice(N_BUSINESSES, p=biz_w)) + 1,
+            "business_avg_amount": round(amount / max(0.05, float(row.amount_vs_avg_ratio)), 2),
+            "is_fraud":            fraud,
+        })
+    return items
@@ -2,13 +2,27 @@
 FraudSense — Database Models (v2)
 Added: risk_level, confidence_score, final_score, fraud_reasons,
        shap_reasons, review_status, reviewed_by to Transaction.
+Added: BusinessStat counters and keyset-pagination indexes on Transaction.
+Added: FraudRollup hourly/daily time-series aggregates.
+Added: typed, indexed Transaction.event_time (backfilled from timestamp).
+Changed: fraud_reasons / shap_reasons are native JSON (JSONB on Postgres).
+Added: Transaction.expected_loss priority index and reviewer claim lease.
+Added: Transaction.content_hash dedup index and IdempotencyKey.
+Added: UploadSession for resumable chunked CSV uploads.
+Added: Transaction rule-input columns for fraud_engine.backtest.
+Added: Transaction.rule_config_version (rule thresholds a verdict used).
+Added: VendorListEntry per-business vendor blacklist / allowlist.
 """
 
 import os
+import ast
+import json
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float,
-    Boolean, DateTime, ForeignKey, Text
+    create_engine, Column, Integer, BigInteger, String, Float, LargeBinary,
+    Boolean, DateTime, ForeignKey, Text, Index, JSON, Numeric, cast, func,
+    inspect, text, update,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import sessionmaker, relationship, declarative_base
 from datetime import datetime, timezone
 from dotenv import load_dotenv
@@ -24,6 +38,8 @@ engine       = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base         = declarative_base()
 
+JSONType     = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Business(Base):
     __tablename__ = "businesses"
@@ -42,6 +58,19 @@ class Business(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Keyset pagination: filter columns first, then id for ORDER BY id DESC
+        Index("ix_transactions_biz_id",            "business_id", "id"),
+        Index("ix_transactions_biz_suspicious_id", "business_id", "suspicious_flag", "id"),
+        Index("ix_transactions_biz_risk_id",       "business_id", "risk_level", "id"),
+        Index("ix_transactions_biz_review_id",     "business_id", "review_status", "id"),
+        # Time-range filters
+        Index("ix_transactions_biz_event_time",    "business_id", "event_time"),
+        # Review queue: riskiest pending alerts first
+        Index("ix_transactions_biz_review_loss",   "business_id", "review_status", "expected_loss", "id"),
+        # Ingest dedup (NULL for rows stored before hashing was added)
+        Index("ux_transactions_biz_content_hash",  "business_id", "content_hash", unique=True),
+    )
 
     id               = Column(Integer, primary_key=True, index=True)
     business_id      = Column(Integer, ForeignKey("businesses.id"), nullable=False)
@@ -51,27 +80,163 @@ class Transaction(Base):
     vendor_name      = Column(String,  default="")
     category         = Column(String,  default="")
     payment_method   = Column(String,  default="")
-    timestamp        = Column(String,  default="")
+    timestamp        = Column(String,  default="")               # raw value from the client
+    content_hash     = Column(String(64), nullable=True)         # ingest dedup key, see ingest.content_hash
+    event_time       = Column(DateTime(timezone=True), nullable=True)  # parsed UTC event time
     previous_balance = Column(Float,   default=0.0)
     new_balance      = Column(Float,   default=0.0)
 
+    # Rule inputs as scored, for rule backtesting (NULL on older rows)
+    ip_country          = Column(String,  nullable=True)
+    vendor_country      = Column(String,  nullable=True)
+    num_txns_last_1h    = Column(Integer, nullable=True)
+    num_txns_last_24h   = Column(Integer, nullable=True)
+    is_new_vendor       = Column(Integer, nullable=True)
+    vendor_risk_score   = Column(Float,   nullable=True)   # before the network layer raised it
+    business_avg_amount = Column(Float,   nullable=True)
+
     # Fraud detection output
     suspicious_flag  = Column(Boolean, default=False)
     risk_level       = Column(String,  default="low")        # low/medium/high/critical
     confidence_score = Column(Float,   default=0.0)          # ML calibrated prob
     final_score      = Column(Float,   default=0.0)          # composite 0-1 score
-    fraud_reasons    = Column(Text,    default="[]")          # rule flag messages (JSON list)
-    shap_reasons     = Column(Text,    default="[]")          # SHAP text reasons (JSON list)
+    expected_loss    = Column(Float,   default=0.0)          # final_score × amount (queue priority)
+    fraud_reasons    = Column(JSONType, default=list)   # [{rule_id, severity, message, score_delta}]
+    shap_reasons     = Column(JSONType, default=list)   # SHAP text reasons
+    rule_config_version = Column(String, nullable=True)   # fraud_engine.rules RuleConfig.version
 
     # Human review
     review_status    = Column(String,  default="auto_cleared")  # pending_review / confirmed_fraud / false_positive / auto_cleared
     reviewed_by      = Column(String,  nullable=True)           # firebase UID of reviewer
+    claimed_by       = Column(String,  nullable=True)           # reviewer holding the queue lease
+    claimed_until    = Column(DateTime(timezone=True), nullable=True)
 
     created_at       = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     business = relationship("Business", back_populates="transactions")
 
 
+class BusinessStat(Base):
+    """
+    Materialized transaction counts, one row per business and
+    (suspicious_flag, risk_level, review_status) cell. Maintained
+    incrementally by ingest and review — see stats.py.
+    """
+    __tablename__ = "business_stats"
+
+    business_id     = Column(Integer, ForeignKey("businesses.id"), primary_key=True)
+    suspicious_flag = Column(Boolean, primary_key=True)
+    risk_level      = Column(String,  primary_key=True)
+    review_status   = Column(String,  primary_key=True)
+    txn_count       = Column(Integer, default=0, nullable=False)
+
+
+class FraudRollup(Base):
+    """
+    Pre-aggregated per-business time series, one row per hour and per day
+    bucket of transaction event time. Maintained incrementally by ingest and
+    review — see stats.py.
+    """
+    __tablename__ = "fraud_rollups"
+
+    business_id          = Column(Integer, ForeignKey("businesses.id"), primary_key=True)
+    bucket               = Column(String,  primary_key=True)       # "hour" | "day"
+    bucket_start         = Column(DateTime(timezone=True), primary_key=True)
+
+    txn_count            = Column(Integer, default=0, nullable=False)
+    total_amount         = Column(Float,   default=0.0, nullable=False)
+    fraud_count          = Column(Integer, default=0, nullable=False)
+    fraud_amount         = Column(Float,   default=0.0, nullable=False)
+
+    critical_count       = Column(Integer, default=0, nullable=False)
+    high_count           = Column(Integer, default=0, nullable=False)
+    medium_count         = Column(Integer, default=0, nullable=False)
+    low_count            = Column(Integer, default=0, nullable=False)
+
+    pending_count        = Column(Integer, default=0, nullable=False)
+    confirmed_count      = Column(Integer, default=0, nullable=False)
+    false_positive_count = Column(Integer, default=0, nullable=False)
+    cleared_count        = Column(Integer, default=0, nullable=False)
+
+
+class IdempotencyKey(Base):
+    """
+    Stored upload responses by Idempotency-Key header, replayed when a client
+    retries the same request (see idempotency.py). status_code is NULL while
+    the first request is still in flight; claimed_at dates that claim.
+    """
+    __tablename__ = "idempotency_keys"
+
+    business_id  = Column(Integer, ForeignKey("businesses.id"), primary_key=True)
+    key          = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code  = Column(Integer, nullable=True)
+    response     = Column(Text, nullable=True)
+    created_at   = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    claimed_at   = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class UploadSession(Base):
+    """
+    A resumable chunked CSV upload (see routes/uploads.py). next_chunk and
+    the carried-over header / partial last line are committed in the same
+    transaction as the rows each chunk scores.
+    """
+    __tablename__ = "upload_sessions"
+
+    id             = Column(String(32), primary_key=True)            # uuid4 hex
+    business_id    = Column(Integer, ForeignKey("businesses.id"), nullable=False, index=True)
+    filename       = Column(String,  default="")
+    status         = Column(String,  default="open")                 # open / finalized
+    header         = Column(LargeBinary, nullable=True)              # CSV header line
+    tail           = Column(LargeBinary, default=b"")                # bytes after the last newline
+    next_chunk     = Column(Integer, default=0, nullable=False)
+    bytes_received = Column(BigInteger, default=0, nullable=False)
+    rows_received  = Column(Integer, default=0, nullable=False)
+    rows_ingested  = Column(Integer, default=0, nullable=False)
+    duplicates     = Column(Integer, default=0, nullable=False)
+    fraud_count    = Column(Integer, default=0, nullable=False)
+    created_at     = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at     = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class UploadRowCount(Base):
+    """
+    Occurrences of each id-less row content seen so far by an open chunked
+    upload, so a repeat in a later chunk gets the next occurrence hash (see
+    ingest.content_hashes). Written with each chunk, dropped on finalize.
+    """
+    __tablename__ = "upload_row_counts"
+
+    upload_id    = Column(String(32), ForeignKey("upload_sessions.id"), primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    seen         = Column(Integer, default=0, nullable=False)
+
+
+class VendorListEntry(Base):
+    """
+    A vendor on a business's blacklist or allowlist (see fraud_engine/vendor_lists.py).
+    Deletes are soft (active=False) and bump updated_at, so every worker's
+    in-memory index can sync changes incrementally.
+    """
+    __tablename__ = "vendor_list_entries"
+    __table_args__ = (
+        Index("ux_vendor_list_biz_type_key", "business_id", "list_type", "name_key", unique=True),
+        Index("ix_vendor_list_biz_updated",  "business_id", "updated_at"),
+    )
+
+    id          = Column(Integer, primary_key=True)
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    list_type   = Column(String(16), nullable=False)             # blacklist / allowlist
+    vendor_name = Column(String,  nullable=False)                # as entered
+    name_key    = Column(String,  nullable=False)                # vendor_lists.vendor_key
+    reason      = Column(String,  default="")
+    active      = Column(Boolean, default=True, nullable=False)
+    created_by  = Column(String,  nullable=True)                 # firebase UID
+    created_at  = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at  = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -84,7 +249,161 @@ class AuditLog(Base):
     created_at     = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
+def parse_event_time(raw, default: datetime = None) -> datetime:
+    """
+    Parse a CSV/API timestamp as aware UTC (naive values are taken as UTC).
+    Unparseable values fall back to `default`, or now.
+    """
+    try:
+        ts = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        ts = default or datetime.now(timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
 def init_db():
-    """Create all tables. Safe to call on startup."""
+    """Create all tables, then migrate existing ones. Safe to call on startup."""
+    existing = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+
+    added = _add_missing_columns(Transaction.__table__) if "transactions" in existing else set()
+    if "idempotency_keys" in existing:
+        _add_missing_columns(IdempotencyKey.__table__)
+
+    # create_all skips tables that already exist, so add new indexes explicitly
+    for index in Transaction.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    if "event_time" in added:
+        _backfill("transactions.event_time", _backfill_event_time)
+    if "expected_loss" in added:
+        _backfill("transactions.expected_loss", _backfill_expected_loss)
+    if "transactions" in existing:
+        _migrate_reason_columns()
+    if "transactions" in existing and "business_stats" not in existing:
+        from stats import rebuild_business_stats
+        _backfill("business_stats", rebuild_business_stats)
+    if "transactions" in existing and "fraud_rollups" not in existing:
+        from stats import rebuild_fraud_rollups
+        _backfill("fraud_rollups", rebuild_fraud_rollups)
+
     print("[DB] Tables initialized.")
+
+
+def _add_missing_columns(table) -> set:
+    """ALTER TABLE ADD COLUMN for model columns the live table lacks."""
+    live  = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    added = set()
+    with engine.begin() as conn:
+        for col in table.columns:
+            if col.name in live:
+                continue
+            col_type = col.type.compile(dialect=engine.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}'))
+            added.add(col.name)
+            print(f"[DB] Added column {table.name}.{col.name}")
+    return added
+
+
+def _backfill(label: str, fn):
+    session = SessionLocal()
+    try:
+        fn(session)
+        session.commit()
+        print(f"[DB] {label} backfilled from transactions.")
+    finally:
+        session.close()
+
+
+def _backfill_event_time(session, batch_size: int = 5000):
+    """Populate event_time from the raw timestamp string, in id-ordered batches."""
+    last_id = 0
+    while True:
+        rows = session.query(Transaction.id, Transaction.timestamp, Transaction.created_at) \
+                      .filter(Transaction.id > last_id) \
+                      .order_by(Transaction.id).limit(batch_size).all()
+        if not rows:
+            break
+        session.execute(update(Transaction), [
+            {"id": tx_id, "event_time": parse_event_time(ts, default=created)}
+            for tx_id, ts, created in rows
+        ])
+        session.commit()
+        last_id = rows[-1].id
+
+
+def _backfill_expected_loss(session):
+    session.query(Transaction).update({
+        Transaction.expected_loss: func.round(cast(
+            func.coalesce(Transaction.final_score, 0.0) * func.coalesce(Transaction.amount, 0.0),
+            Numeric), 2),
+    }, synchronize_session=False)
+
+
+# Message prefix → rule_id, for reasons stored before flags were structured
+_LEGACY_RULE_PREFIXES = [
+    ("Amount $",                 "R1"), ("Amount is",               "R1"),
+    ("transactions in past hour", "R2"), ("transactions in past 24h", "R3"),
+    ("Both vendor",              "R4"), ("Vendor in high-risk",     "R4"),
+    ("Request IP from",          "R4"), ("Country mismatch",        "R5"),
+    ("Crypto payment",           "R6"), ("Cryptocurrency payment",  "R6"),
+    ("Transaction at",           "R6"), ("Round amount",            "R7"),
+    ("Vendor risk score",        "R8"), ("Vendor receiving",        "NET1"),
+]
+
+
+def _legacy_flag(message: str) -> dict:
+    rule_id = next((rid for prefix, rid in _LEGACY_RULE_PREFIXES if prefix in message), None)
+    return {"rule_id": rule_id, "severity": None, "message": message, "score_delta": None}
+
+
+def _parse_legacy_list(raw) -> list:
+    try:
+        value = ast.literal_eval(raw) if raw else []
+    except (ValueError, SyntaxError):
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else []
+
+
+def _migrate_reason_columns(batch_size: int = 5000):
+    """
+    Convert fraud_reasons / shap_reasons from str(list) TEXT to native JSON:
+    add *_json columns, convert in id-ordered batches, then swap them in.
+    """
+    live = {c["name"]: c["type"] for c in inspect(engine).get_columns("transactions")}
+    if isinstance(live.get("fraud_reasons"), JSON):
+        return
+
+    json_type = Transaction.__table__.c.fraud_reasons.type.compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        for col in ("fraud_reasons", "shap_reasons"):
+            if f"{col}_json" not in live:
+                conn.execute(text(f"ALTER TABLE transactions ADD COLUMN {col}_json {json_type}"))
+
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, fraud_reasons, shap_reasons FROM transactions "
+                "WHERE id > :last ORDER BY id LIMIT :n"), {"last": last_id, "n": batch_size}).all()
+            if not rows:
+                break
+            conn.execute(text(
+                "UPDATE transactions SET fraud_reasons_json = :fr, shap_reasons_json = :sr "
+                "WHERE id = :id"), [
+                {
+                    "id": tx_id,
+                    "fr": json.dumps([_legacy_flag(str(m)) for m in _parse_legacy_list(fraud)]),
+                    "sr": json.dumps([str(r) for r in _parse_legacy_list(shap)]),
+                }
+                for tx_id, fraud, shap in rows
+            ])
+            last_id = rows[-1].id
+
+    with engine.begin() as conn:
+        for col in ("fraud_reasons", "shap_reasons"):
+            conn.execute(text(f"ALTER TABLE transactions DROP COLUMN {col}"))
+            conn.execute(text(f"ALTER TABLE transactions RENAME COLUMN {col}_json TO {col}"))
+    print("[DB] fraud_reasons / shap_reasons migrated to JSON.")
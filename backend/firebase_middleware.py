@@ -1,7 +1,190 @@
+"""
+FraudSense — Firebase Auth Middleware
+verify_firebase_token() checks the request's bearer token against a bounded
+cache of already-verified tokens (keyed by token hash, expiring at the
+token's `exp`) and only falls through to full signature verification on a
+miss. Firebase public keys are pre-fetched and refreshed in the background
+so no request blocks on a key fetch.
+
+AUTH_VERIFIER=local swaps Firebase for LocalVerifier, an HMAC-signed
+stand-in for tests, benchmarks and load tests. Never enable it in production.
+It refuses to start without LOCAL_AUTH_SECRET: a default key would be public
+in this repo and let anyone mint a token for any user.
+"""
+
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
 from flask import request, jsonify
 import firebase_admin
 from firebase_admin import auth
 
+logger = logging.getLogger("fraudsense.auth")
+
+AUTH_VERIFIER        = os.getenv("AUTH_VERIFIER", "firebase")       # "firebase" | "local"
+TOKEN_CACHE_SIZE     = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+KEY_REFRESH_SECONDS  = int(os.getenv("FIREBASE_KEY_REFRESH_SECONDS", "600"))
+LOCAL_AUTH_SECRET    = os.getenv("LOCAL_AUTH_SECRET", "")
+
+# Public x509 certificates Firebase ID tokens are signed with
+ID_TOKEN_CERT_URI = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+
+class TokenCache:
+    """Bounded LRU of verified token claims, keyed by SHA-256 of the token."""
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                return None
+            if claims.get("exp", 0) <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: dict):
+        if claims.get("exp", 0) <= time.time():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _sdk_cert_fetcher():
+    """
+    The request callable firebase_admin's token verifier fetches signing
+    keys with. Private SDK internals — None when a release moves them.
+    """
+    try:
+        return auth._get_client(None)._token_verifier.request
+    except (AttributeError, TypeError):
+        return None
+
+
+class FirebaseVerifier:
+    """Full Firebase ID-token verification, with public keys kept warm."""
+
+    def __init__(self):
+        self._fallback = None
+
+    def verify(self, token: str) -> dict:
+        return auth.verify_id_token(token)
+
+    def prefetch_keys(self):
+        """
+        Fetch the ID-token signing certificates into the cache-controlled
+        session the Firebase SDK verifies with, bypassing (and replacing)
+        any cached copy so it never goes stale under live traffic. If this
+        SDK version does not expose that session, fetch with our own cached
+        request instead (the SDK then refreshes on its own cache misses).
+        """
+        fetch = _sdk_cert_fetcher()
+        if fetch is None:
+            if self._fallback is None:
+                import google.auth.transport.requests
+                logger.warning("Firebase SDK token verifier session not found; public key "
+                               "prefetch no longer warms the SDK's cache")
+                self._fallback = google.auth.transport.requests.Request()
+            fetch = self._fallback
+        fetch(ID_TOKEN_CERT_URI, headers={"Cache-Control": "no-cache"})
+
+    def start_key_refresher(self, interval: int = KEY_REFRESH_SECONDS):
+        def _loop():
+            while True:
+                try:
+                    self.prefetch_keys()
+                except Exception as e:
+                    logger.warning(f"Firebase public key refresh failed: {e}")
+                time.sleep(interval)
+
+        threading.Thread(target=_loop, name="firebase-key-refresh", daemon=True).start()
+
+
+class LocalVerifier:
+    """
+    Stand-in verifier for tests and benchmarks: tokens are
+    base64url(claims JSON) + "." + HMAC-SHA256 signature.
+    """
+
+    def __init__(self, secret: str = LOCAL_AUTH_SECRET):
+        if not secret:
+            raise RuntimeError("AUTH_VERIFIER=local requires LOCAL_AUTH_SECRET to be set")
+        self._secret = secret.encode()
+
+    def _sign(self, payload: bytes) -> str:
+        sig = hmac.new(self._secret, payload, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(sig).decode().rstrip("=")
+
+    def issue(self, uid: str, ttl: int = 3600, **claims) -> str:
+        now  = int(time.time())
+        body = json.dumps({"uid": uid, "sub": uid, "iat": now, "exp": now + ttl, **claims})
+        payload = base64.urlsafe_b64encode(body.encode()).decode().rstrip("=")
+        return f"{payload}.{self._sign(payload.encode())}"
+
+    def verify(self, token: str) -> dict:
+        payload, _, sig = token.partition(".")
+        if not hmac.compare_digest(sig, self._sign(payload.encode())):
+            raise ValueError("bad signature")
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        if claims.get("exp", 0) <= time.time():
+            raise ValueError("token expired")
+        return claims
+
+
+# ── Singletons ────────────────────────────────────────────────────────────────
+_verifier = None
+_token_cache = TokenCache()
+
+
+def get_verifier():
+    global _verifier
+    if _verifier is None:
+        _verifier = LocalVerifier() if AUTH_VERIFIER == "local" else FirebaseVerifier()
+    return _verifier
+
+
+def get_token_cache() -> TokenCache:
+    return _token_cache
+
+
+def init_token_verifier():
+    """Called once from create_app(): pick the verifier and warm public keys."""
+    verifier = get_verifier()
+    if isinstance(verifier, LocalVerifier):
+        logger.warning("AUTH_VERIFIER=local — using the local stand-in token verifier.")
+    elif firebase_admin._apps:
+        verifier.start_key_refresher()
+
 
 def verify_firebase_token():
     """Middleware to verify Firebase Auth token"""
@@ -13,7 +196,10 @@ def verify_firebase_token():
     try:
         # Extract token from "Bearer <token>"
         token = id_token.split(" ")[1]
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = _token_cache.get(token)
+        if decoded_token is None:
+            decoded_token = get_verifier().verify(token)
+            _token_cache.put(token, decoded_token)
         return decoded_token, None  # Return token + no error
 
     except Exception as e:
@@ -0,0 +1,401 @@
+"""
+FraudSense — Rule Backtesting
+Replays candidate rule thresholds over historical transactions and
+reports, per configuration:
+
+  - per-rule hit count / hit rate, and precision against labelled rows
+  - alert volume (rows that would enter the review queue) and its change
+    against the active rule config, with alert precision and fraud caught
+
+Rules are re-implemented column-wise with numpy (vectorized_rules), so a
+million rows take seconds per configuration; --verify checks them against
+rules.evaluate_rules() row by row on a sample.
+
+Sources:
+  db         streams transactions (partitioned, yield_per) with the rule
+             inputs stored at ingest; labels come from analyst review
+             (confirmed_fraud = 1, false_positive = 0, others unlabelled)
+  synthetic  ml/generate_data.py rows mapped to raw fields as in
+             bench/workload.py, labelled by is_fraud
+
+The baseline is the active rule config (rules.get_rule_config(), with the
+--business-id overrides applied); candidates override its thresholds.
+Alerts use the stored ML confidence (db) or a batch model prediction
+(synthetic) with the composite weights from engine.py; the network layer
+is order-dependent graph state and is left out (scored as 0).
+
+Usage:
+    cd backend
+    python -m fraud_engine.backtest --source synthetic --rows 1000000 --set large_txn_threshold=20000
+    python -m fraud_engine.backtest --source db --sweep velocity_1h_limit=6,8,10,12 [--out backtest.json]
+"""
+
+import re
+import json
+import time
+import argparse
+import warnings
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from fraud_engine.rules import CFG, HIGH_RISK_COUNTRIES, evaluate_rules, get_rule_config
+from fraud_engine.engine import WEIGHTS, FRAUD_THRESHOLD, REVIEW_THRESHOLD
+
+RULE_IDS  = ["R1", "R2", "R3", "R4", "R5", "R6", "R7", "R8"]
+DB_CHUNK_ROWS = 50_000
+
+# Raw input columns every source provides, as numpy arrays of equal length
+RAW_FIELDS = ["amount", "business_avg_amount", "category", "payment_method", "timestamp",
+              "ip_country", "vendor_country", "num_txns_last_1h", "num_txns_last_24h",
+              "is_new_vendor", "vendor_risk_score", "ml_confidence", "label"]
+
+_HOUR_RE = re.compile(r"^\d{4}-?\d{2}-?\d{2}(?:[T ](\d{2}))?")
+
+
+# ── Vectorized rules ──────────────────────────────────────────────────────────
+
+def _hours(timestamps: np.ndarray) -> np.ndarray:
+    """Hour the way rule_after_hours_crypto reads it: 0 for a bare date, 12 if unparsable."""
+    s     = pd.Series(timestamps, dtype=object).fillna("").astype(str)
+    match = s.str.extract(_HOUR_RE, expand=False)
+    dated = s.str.match(_HOUR_RE)
+    hours = pd.to_numeric(match, errors="coerce")
+    hours = np.where(dated, np.where(hours.isna(), 0, hours), 12)
+    return np.where(hours > 23, 12, hours).astype(np.int16)
+
+
+def rule_inputs(raw: dict) -> dict:
+    """Raw columns → the derived arrays the rules compare against thresholds."""
+    amount  = np.nan_to_num(raw["amount"].astype(float))
+    avg     = np.nan_to_num(raw["business_avg_amount"].astype(float))
+    vendor  = pd.Series(raw["vendor_country"], dtype=object).fillna("").astype(str)
+    ip      = pd.Series(raw["ip_country"], dtype=object).fillna("").astype(str)
+    risky   = list(HIGH_RISK_COUNTRIES)
+    crypto  = (pd.Series(raw["category"], dtype=object).fillna("").astype(str).str.lower().str.contains("crypto")
+               | pd.Series(raw["payment_method"], dtype=object).fillna("").astype(str).str.lower().str.contains("crypto"))
+    return {
+        "amount":      amount,
+        "ratio":       amount / np.maximum(1.0, np.where(avg == 0, amount, avg)),
+        "n1h":         np.nan_to_num(raw["num_txns_last_1h"].astype(float)),
+        "n24h":        np.nan_to_num(raw["num_txns_last_24h"].astype(float)),
+        "vendor_hr":   vendor.isin(risky).to_numpy(),
+        "ip_hr":       ip.isin(risky).to_numpy(),
+        "mismatch":    ((vendor != "") & (ip != "") & (vendor != ip)).to_numpy(),
+        "crypto":      crypto.to_numpy(),
+        "hour":        _hours(raw["timestamp"]),
+        "new_vendor":  np.nan_to_num(raw["is_new_vendor"].astype(float)) != 0,
+        "vendor_risk": np.nan_to_num(raw["vendor_risk_score"].astype(float)),
+    }
+
+
+def vectorized_rules(x: dict, cfg: dict) -> dict:
+    """rule_id → (score_delta array, critical mask), mirroring rules.py."""
+    amount, limit = x["amount"], cfg["large_txn_threshold"]
+    v1h = cfg["velocity_1h_limit"]
+    after_hours = (x["hour"] < cfg["after_hours_end"]) | (x["hour"] >= cfg["after_hours_start"])
+    is_round = (amount >= cfg["round_amount_min"]) & ((amount % 1000 < 1) | (amount % 500 < 1))
+    risk = x["vendor_risk"]
+
+    def tiers(conditions, deltas, critical_tier: Optional[int] = None):
+        delta    = np.select(conditions, deltas, 0.0)
+        critical = conditions[critical_tier] if critical_tier is not None else np.zeros(len(delta), bool)
+        return delta, critical
+
+    r1_crit = amount >= limit * 5
+    r2_crit = x["n1h"] >= v1h * 2
+    r4_crit = x["vendor_hr"] & x["ip_hr"]
+    r8_crit = risk >= 0.90
+    return {
+        "R1": tiers([r1_crit, amount >= limit, x["ratio"] >= cfg["ratio_spike"]],
+                    [0.35, 0.20, 0.12], 0),
+        "R2": tiers([r2_crit, x["n1h"] >= v1h], [0.30, 0.18], 0),
+        "R3": tiers([x["n24h"] >= cfg["velocity_24h_limit"]], [0.10]),
+        "R4": tiers([r4_crit, x["vendor_hr"], x["ip_hr"]], [0.35, 0.22, 0.12], 0),
+        "R5": tiers([x["mismatch"]], [0.10]),
+        "R6": tiers([x["crypto"] & after_hours, x["crypto"], after_hours], [0.25, 0.05, 0.03]),
+        "R7": tiers([is_round & x["new_vendor"], is_round], [0.22, 0.04]),
+        "R8": tiers([r8_crit, risk >= cfg["vendor_risk_high"], risk >= 0.40], [0.35, 0.20, 0.08], 0),
+    }
+
+
+def score(x: dict, ml: np.ndarray, cfg: dict) -> dict:
+    """Per-rule hits plus rule score, composite and alert / fraud masks."""
+    per_rule = vectorized_rules(x, cfg)
+    raw      = np.sum([d for d, _ in per_rule.values()], axis=0)
+    rule_score = np.round(np.minimum(1.0, raw), 4)
+    critical   = np.any([c for _, c in per_rule.values()], axis=0)
+
+    final = WEIGHTS["ml"] * ml + WEIGHTS["rules"] * rule_score
+    final = np.round(np.minimum(1.0, np.where(critical, np.maximum(final, 0.75), final)), 4)
+    return {
+        "hits":       {rid: d > 0 for rid, (d, _) in per_rule.items()},
+        "rule_score": rule_score,
+        "critical":   critical,
+        "alert":      final >= REVIEW_THRESHOLD,
+        "fraud":      (final >= FRAUD_THRESHOLD) | critical,
+    }
+
+
+# ── Sources ───────────────────────────────────────────────────────────────────
+
+def load_synthetic(rows: int, seed: int = 7) -> dict:
+    """ml/generate_data.py rows as raw fields (vectorized version of bench.workload)."""
+    from ml.generate_data import generate_dataset, PAYMENT_ENC, HIGH_RISK_CC, SAFE_CC, CATEGORIES
+
+    df  = generate_dataset(output_path=None, n=rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    n   = len(df)
+
+    amount = df["amount"].to_numpy(dtype=float)
+    amount = np.where(df["round_amount"] == 1, np.maximum(1000.0, np.round(amount / 1000.0) * 1000.0), amount)
+    high_risk, safe = np.array(sorted(HIGH_RISK_CC)), np.array(SAFE_CC)
+    vendor = np.where(df["high_risk_country"] == 1,
+                      high_risk[rng.integers(len(high_risk), size=n)], safe[rng.integers(len(safe), size=n)])
+    ip     = np.where(df["country_mismatch"] == 1, np.where(vendor == safe[0], safe[1], safe[0]), vendor)
+
+    pay_names = np.empty(max(PAYMENT_ENC.values()) + 1, dtype=object)
+    for name, code in PAYMENT_ENC.items():
+        pay_names[code] = name
+    minutes = ((df["day_of_week"].to_numpy() + 7 * rng.integers(0, 8, n)) * 1440
+               + df["hour_of_day"].to_numpy() * 60 + rng.integers(0, 60, n))
+    timestamps = np.datetime_as_string(np.datetime64("2025-01-06T00:00") + minutes.astype("timedelta64[m]"),
+                                       unit="m")
+
+    return {
+        "amount":              np.round(amount, 2),
+        "business_avg_amount": np.round(amount / np.maximum(0.05, df["amount_vs_avg_ratio"].to_numpy()), 2),
+        "category":            np.where(df["is_crypto_category"] == 1, "crypto",
+                                        np.array(CATEGORIES)[rng.integers(len(CATEGORIES), size=n)]),
+        "payment_method":      pay_names[df["payment_method_encoded"].to_numpy()],
+        "timestamp":           timestamps,
+        "ip_country":          ip,
+        "vendor_country":      vendor,
+        "num_txns_last_1h":    df["num_txns_last_1h"].to_numpy(),
+        "num_txns_last_24h":   df["num_txns_last_24h"].to_numpy(),
+        "is_new_vendor":       df["is_new_vendor"].to_numpy(),
+        "vendor_risk_score":   df["vendor_risk_score"].to_numpy(dtype=float),
+        "ml_confidence":       _predict(df),
+        "label":               df["is_fraud"].to_numpy(dtype=np.int8),
+    }
+
+
+def _predict(df: pd.DataFrame) -> np.ndarray:
+    try:
+        from model import FEATURE_COLS, predict_fraud_batch
+        return np.round(predict_fraud_batch(df[FEATURE_COLS].to_numpy(dtype=float)), 4)
+    except Exception as e:
+        print(f"[Backtest] ML unavailable, scoring rules only: {e}")
+        return np.zeros(len(df))
+
+
+def load_db(business_id: Optional[int] = None, limit: Optional[int] = None) -> dict:
+    """Stream transactions in DB_CHUNK_ROWS partitions into raw columns."""
+    from sqlalchemy import select
+    from database import SessionLocal, Transaction
+
+    cols = [Transaction.amount, Transaction.business_avg_amount, Transaction.category,
+            Transaction.payment_method, Transaction.timestamp, Transaction.ip_country,
+            Transaction.vendor_country, Transaction.num_txns_last_1h, Transaction.num_txns_last_24h,
+            Transaction.is_new_vendor, Transaction.vendor_risk_score, Transaction.confidence_score,
+            Transaction.review_status]
+    stmt = select(*cols).order_by(Transaction.id).execution_options(yield_per=DB_CHUNK_ROWS)
+    if business_id is not None:
+        stmt = stmt.where(Transaction.business_id == business_id)
+    if limit:
+        stmt = stmt.limit(limit)
+
+    parts   = []
+    session = SessionLocal()
+    try:
+        for chunk in session.execute(stmt).partitions():
+            parts.append(pd.DataFrame(chunk, columns=[c.key for c in cols]))
+    finally:
+        session.close()
+    frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[c.key for c in cols])
+
+    labels = frame["review_status"].map({"confirmed_fraud": 1, "false_positive": 0}).fillna(-1)
+    raw = {f: frame[f].to_numpy() for f in RAW_FIELDS if f in frame}
+    raw["ml_confidence"] = frame["confidence_score"].fillna(0).to_numpy(dtype=float)
+    raw["label"]         = labels.to_numpy(dtype=np.int8)
+    raw["missing_inputs"] = int(frame["vendor_country"].isna().sum())
+    return raw
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+
+def _precision(mask: np.ndarray, labels: np.ndarray) -> dict:
+    labelled = mask & (labels >= 0)
+    n_lab    = int(labelled.sum())
+    tp       = int((labelled & (labels == 1)).sum())
+    return {"labelled": n_lab, "true_positive": tp,
+            "precision": round(tp / n_lab, 4) if n_lab else None}
+
+
+def evaluate(x: dict, ml: np.ndarray, labels: np.ndarray, cfg: dict) -> dict:
+    n      = len(ml)
+    result = score(x, ml, cfg)
+    fraud_labelled = int((labels == 1).sum())
+    caught = int((result["alert"] & (labels == 1)).sum())
+    return {
+        "rules": {
+            rid: {"hits": int(hit.sum()), "hit_rate": round(float(hit.mean()), 5) if n else 0.0,
+                  **_precision(hit, labels)}
+            for rid, hit in result["hits"].items()
+        },
+        "alerts": {
+            "count":        int(result["alert"].sum()),
+            "rate":         round(float(result["alert"].mean()), 5) if n else 0.0,
+            "fraud_flags":  int(result["fraud"].sum()),
+            "fraud_recall": round(caught / fraud_labelled, 4) if fraud_labelled else None,
+            **_precision(result["alert"], labels),
+        },
+    }
+
+
+def compare_to_baseline(baseline: dict, candidate: dict) -> dict:
+    base_alerts, cand_alerts = baseline["alerts"]["count"], candidate["alerts"]["count"]
+    return {
+        "alert_change":     cand_alerts - base_alerts,
+        "alert_change_pct": round((cand_alerts - base_alerts) / base_alerts * 100, 2) if base_alerts else None,
+        "rule_hit_change":  {rid: candidate["rules"][rid]["hits"] - baseline["rules"][rid]["hits"]
+                             for rid in RULE_IDS},
+    }
+
+
+def verify(raw: dict, sample: int, cfg: dict) -> int:
+    """Rows where vectorized rule_score / critical differ from rules.evaluate_rules()."""
+    n   = min(sample, len(raw["amount"]))
+    sub = {f: np.asarray(raw[f])[:n] for f in RAW_FIELDS}
+    vec = score(rule_inputs(sub), np.zeros(n), cfg)
+
+    mismatches = 0
+    for i in range(n):
+        tx = {f: (None if isinstance(sub[f][i], float) and np.isnan(sub[f][i]) else sub[f][i])
+              for f in RAW_FIELDS}
+        if not tx["business_avg_amount"]:
+            tx.pop("business_avg_amount")
+        out = evaluate_rules(tx, cfg)
+        if out["rule_score"] != vec["rule_score"][i] or out["critical_hit"] != vec["critical"][i]:
+            mismatches += 1
+    return mismatches
+
+
+def parse_overrides(pairs: list[str]) -> dict:
+    """["key=value", ...] → typed CFG overrides."""
+    out = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        if key not in CFG:
+            raise ValueError(f"Unknown rule setting {key!r}; known: {sorted(CFG)}")
+        out[key] = type(CFG[key])(float(value))
+    return out
+
+
+def candidates_from_args(sets: list[str], sweep: Optional[str], config: Optional[str]) -> list[dict]:
+    base = parse_overrides(sets)
+    if config:
+        with open(config) as f:
+            loaded = json.load(f)
+        loaded = loaded if isinstance(loaded, list) else [loaded]
+        return [{**base, **parse_overrides([f"{k}={v}" for k, v in c.items()])} for c in loaded]
+    if sweep:
+        key, _, values = sweep.partition("=")
+        return [{**base, **parse_overrides([f"{key}={v}"])} for v in values.split(",")]
+    return [base] if base else []
+
+
+def run_backtest(raw: dict, candidates: list[dict], business_id: Optional[int] = None) -> dict:
+    config = get_rule_config()
+    base   = config.resolve(business_id)
+
+    t0     = time.perf_counter()
+    x      = rule_inputs(raw)
+    ml     = np.asarray(raw["ml_confidence"], dtype=float)
+    labels = np.asarray(raw["label"])
+    t_prep = time.perf_counter() - t0
+
+    t0       = time.perf_counter()
+    baseline = evaluate(x, ml, labels, base)
+    t_eval   = time.perf_counter() - t0
+
+    results = []
+    for overrides in candidates:
+        res = evaluate(x, ml, labels, {**base, **overrides})
+        results.append({"overrides": overrides, **res, "vs_baseline": compare_to_baseline(baseline, res)})
+
+    return {
+        "rows":              len(ml),
+        "labelled_rows":     int((labels >= 0).sum()),
+        "labelled_fraud":    int((labels == 1).sum()),
+        "missing_inputs":    raw.get("missing_inputs", 0),
+        "prepare_seconds":   round(t_prep, 3),
+        "seconds_per_config": round(t_eval, 3),
+        "baseline":          {"version": config.version, "config": dict(base), **baseline},
+        "candidates":        results,
+    }
+
+
+def _print_report(report: dict):
+    print(f"\nRule backtest — {report['rows']:,} rows ({report['labelled_rows']:,} labelled, "
+          f"{report['labelled_fraud']:,} fraud), {report['seconds_per_config']}s per config")
+    if report["missing_inputs"]:
+        print(f"  {report['missing_inputs']:,} rows predate stored rule inputs (country / velocity rules can't fire)")
+    configs = [(f"baseline {report['baseline']['version']}", report["baseline"])] + [
+        (", ".join(f"{k}={v}" for k, v in c["overrides"].items()) or "baseline", c)
+        for c in report["candidates"]]
+    for name, res in configs:
+        a = res["alerts"]
+        change = res.get("vs_baseline", {}).get("alert_change_pct")
+        print(f"\n  [{name}] alerts {a['count']:,} ({a['rate']:.2%})"
+              + (f", {change:+.2f}% vs baseline" if change is not None else "")
+              + f", precision {a['precision']}, fraud recall {a['fraud_recall']}")
+        for rid, r in res["rules"].items():
+            print(f"    {rid}  hits {r['hits']:>9,}  rate {r['hit_rate']:.4f}  precision {r['precision']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--source",      choices=["db", "synthetic"], default="synthetic")
+    parser.add_argument("--rows",        type=int, default=100_000, help="Synthetic rows / DB row limit")
+    parser.add_argument("--seed",        type=int, default=7)
+    parser.add_argument("--business-id", type=int, default=None, help="DB source: one business only")
+    parser.add_argument("--set",         action="append", default=[], metavar="KEY=VALUE",
+                        help="Candidate override (repeatable)")
+    parser.add_argument("--sweep",       default=None, metavar="KEY=V1,V2,...",
+                        help="One candidate per value")
+    parser.add_argument("--config",      default=None, help="JSON object or list of override objects")
+    parser.add_argument("--verify",      type=int, default=0, metavar="N",
+                        help="Check vectorized rules against evaluate_rules() on N rows")
+    parser.add_argument("--out",         default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    candidates = candidates_from_args(args.set, args.sweep, args.config)
+    t0  = time.perf_counter()
+    raw = (load_db(args.business_id, args.rows if args.rows else None) if args.source == "db"
+           else load_synthetic(args.rows, args.seed))
+    print(f"[Backtest] Loaded {len(raw['amount']):,} rows from {args.source} in {time.perf_counter() - t0:.1f}s")
+
+    report = run_backtest(raw, candidates, args.business_id)
+    report["source"] = args.source
+    if args.verify:
+        base = report["baseline"]["config"]
+        report["verify_mismatches"] = {
+            "rows": min(args.verify, report["rows"]),
+            "baseline": verify(raw, args.verify, base),
+            "candidates": [verify(raw, args.verify, {**base, **c}) for c in candidates],
+        }
+    _print_report(report)
+    if args.verify:
+        print(f"\n  Verify vs evaluate_rules(): {report['verify_mismatches']}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"  Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,27 @@
 """
 FraudSense — Fraud Engine Orchestrator
-Runs all 4 layers and returns a unified FraudVerdict.
+Runs all 4 layers and returns a unified FraudVerdict; analyze_batch() does
+the same for a whole upload with one vectorized ML call. Per-layer latency,
+rule hits and verdicts are recorded in metrics.py. Rule thresholds come from
+the active versioned rule config, resolved once per call / batch for the
+business; the version is stamped on every verdict.
+
+Cascade mode (FRAUD_CASCADE=1) runs the cheap layers first — rules, ML and the
+vendor's cached network score — and skips SHAP and the PageRank recomputation
+for rows that stay below REVIEW_THRESHOLD even with the network score taken
+as the cached score plus CASCADE_TOLERANCE. That margin is a heuristic, not
+a proof: a vendor whose score rose by more since it was last fully scored
+can be short-circuited to a lower verdict than the full pipeline would give
+(bench/cascade_report.py measures how often).
 """
 
+import os
+import time
 from dataclasses import dataclass, field
 from typing import Optional
-from .rules    import evaluate_rules, FlagResult
-from .network  import analyze_transaction_network
+from .rules    import evaluate_rules, get_rule_config, FlagResult
+from .network  import analyze_transaction_network, network_score_upper_bound
+from metrics   import STAGE_SECONDS, record_verdict
 
 
 @dataclass
@@ -22,6 +37,8 @@ class FraudVerdict:
     critical_hit:    bool     # Any critical rule fired
     review_required: bool     # Flag for human review queue
     verdict_source:  str      # "ml" | "rules" | "combined"
+    cascade_skipped: bool = False   # SHAP + full network layer skipped by cascade
+    config_version:  str  = ""      # rule config the thresholds came from
 
     def to_dict(self) -> dict:
         return {
@@ -31,19 +48,13 @@ class FraudVerdict:
             "rule_score":      self.rule_score,
             "network_score":   self.network_score,
             "final_score":     self.final_score,
-            "flags":           [
-                {
-                    "rule_id":   f.rule_id,
-                    "severity":  f.severity,
-                    "message":   f.message,
-                    "score_delta": f.score_delta,
-                }
-                for f in self.flags
-            ],
+            "flags":           [f.to_dict() for f in self.flags],
             "shap_reasons":    self.shap_reasons,
             "critical_hit":    self.critical_hit,
             "review_required": self.review_required,
             "verdict_source":  self.verdict_source,
+            "cascade_skipped": self.cascade_skipped,
+            "config_version":  self.config_version,
         }
 
 
@@ -54,9 +65,16 @@ WEIGHTS = {"ml": 0.50, "rules": 0.35, "network": 0.15}
 FRAUD_THRESHOLD    = 0.45   # composite score above which → is_fraud=True
 REVIEW_THRESHOLD   = 0.30   # composite score above which → review_required=True
 
+# Cascade mode
+CASCADE_ENABLED    = os.getenv("FRAUD_CASCADE", "0") == "1"
+# How far a vendor's true network score may have drifted above its cached
+# value before a short-circuited verdict could differ from the full one.
+CASCADE_TOLERANCE  = float(os.getenv("FRAUD_CASCADE_TOLERANCE", "0.15"))
+
 
 def analyze(tx: dict, business_id: int,
-            business_avg_amount: float = 0.0) -> FraudVerdict:
+            business_avg_amount: float = 0.0,
+            cascade: Optional[bool] = None) -> FraudVerdict:
     """
     Run all 4 fraud detection layers for a single transaction.
 
@@ -64,19 +82,24 @@ def analyze(tx: dict, business_id: int,
         tx:                   Transaction dict (from CSV row or API request)
         business_id:          DB business ID for network graph
         business_avg_amount:  Business's historical average transaction (for rules)
+        cascade:              Short-circuit benign rows (defaults to FRAUD_CASCADE)
 
     Returns:
         FraudVerdict
     """
+    if cascade is None:
+        cascade = CASCADE_ENABLED
+
     # Inject business context into tx for rules
     if business_avg_amount > 0:
         tx["business_avg_amount"] = business_avg_amount
 
     # ── Layer 1: Rules ─────────────────────────────────────────────────────────
-    rule_result = evaluate_rules(tx)
-    rule_score  = rule_result["rule_score"]
-    critical    = rule_result["critical_hit"]
-    flags       = rule_result["flags"]
+    t0 = time.perf_counter()
+    config      = get_rule_config()
+    rule_result = evaluate_rules(tx, config.resolve(business_id))
+    t1 = time.perf_counter()
+    STAGE_SECONDS.observe(t1 - t0, "rules")
 
     # ── Layer 2: ML Model ──────────────────────────────────────────────────────
     ml_confidence = 0.0
@@ -88,8 +111,83 @@ def analyze(tx: dict, business_id: int,
     except Exception as e:
         print(f"[FraudEngine] ML layer error: {e}")
         raw_features = []
+    STAGE_SECONDS.observe(time.perf_counter() - t1, "ml")
+
+    return _finish(tx, business_id, rule_result, ml_confidence, raw_features, cascade,
+                   config.version)
+
+
+def analyze_batch(txs: list[dict], business_id: int,
+                  business_avg_amount: float = 0.0,
+                  cascade: Optional[bool] = None,
+                  columns: Optional[dict] = None) -> list[FraudVerdict]:
+    """
+    analyze() for a whole upload: the ML layer scores every row in one
+    vectorized model call, then rules, SHAP and the network layer run per
+    row in order (the vendor graph is order-dependent). Verdicts match
+    calling analyze() on each row in turn.
+
+    Args:
+        columns: the same rows column-wise ({field: sequence}); built from
+                 txs when not given — columnar uploads pass theirs straight in.
+    """
+    if cascade is None:
+        cascade = CASCADE_ENABLED
+    if not txs:
+        return []
+
+    t0 = time.perf_counter()
+    try:
+        from model import build_feature_matrix, predict_fraud_batch
+        from ingest import rows_to_columns
+        features = build_feature_matrix(columns if columns is not None else rows_to_columns(txs),
+                                        business_avg_amount)
+        probs    = predict_fraud_batch(features)
+    except Exception as e:
+        print(f"[FraudEngine] ML layer error: {e}")
+        features, probs = None, None
+    STAGE_SECONDS.observe(time.perf_counter() - t0, "ml_batch")
+
+    config     = get_rule_config()
+    thresholds = config.resolve(business_id)
+
+    verdicts = []
+    for i, tx in enumerate(txs):
+        if business_avg_amount > 0:
+            tx["business_avg_amount"] = business_avg_amount
+        t0 = time.perf_counter()
+        rule_result = evaluate_rules(tx, thresholds)
+        STAGE_SECONDS.observe(time.perf_counter() - t0, "rules")
+        if probs is None:
+            ml_confidence, raw_features = 0.0, []
+        else:
+            ml_confidence, raw_features = round(float(probs[i]), 4), features[i].tolist()
+        verdicts.append(_finish(tx, business_id, rule_result, ml_confidence, raw_features, cascade,
+                                config.version))
+    return verdicts
+
+
+def _finish(tx: dict, business_id: int, rule_result: dict,
+            ml_confidence: float, raw_features: list, cascade: bool,
+            config_version: str = "") -> FraudVerdict:
+    """Layers after ML: cascade check, SHAP, network, composite verdict."""
+    rule_score = rule_result["rule_score"]
+    critical   = rule_result["critical_hit"]
+    flags      = rule_result["flags"]
+
+    # ── Cascade: skip SHAP + PageRank when the score can't reach review ────────
+    if cascade and not critical:
+        net_bound = network_score_upper_bound(tx, business_id, CASCADE_TOLERANCE)
+        if net_bound is not None and _composite(ml_confidence, rule_score, net_bound) < REVIEW_THRESHOLD:
+            t0 = time.perf_counter()
+            network_score = _network_layer(tx, business_id, flags, use_cached_score=True)
+            STAGE_SECONDS.observe(time.perf_counter() - t0, "network")
+            return _build_verdict(ml_confidence, rule_score, network_score,
+                                  flags, [], critical, cascade_skipped=True,
+                                  config_version=config_version)
 
     # ── Layer 3: SHAP Explainer ────────────────────────────────────────────────
+    t0 = time.perf_counter()
     shap_reasons = []
     try:
         from fraud_engine.explainer import explain_transaction
@@ -97,11 +195,23 @@ def analyze(tx: dict, business_id: int,
             shap_reasons = explain_transaction(raw_features, top_n=4)
     except Exception as e:
         print(f"[FraudEngine] SHAP explainer error: {e}")
+    t1 = time.perf_counter()
+    STAGE_SECONDS.observe(t1 - t0, "shap")
 
     # ── Layer 4: Network Analysis ──────────────────────────────────────────────
+    network_score = _network_layer(tx, business_id, flags)
+    STAGE_SECONDS.observe(time.perf_counter() - t1, "network")
+
+    return _build_verdict(ml_confidence, rule_score, network_score,
+                          flags, shap_reasons, critical, config_version=config_version)
+
+
+def _network_layer(tx: dict, business_id: int, flags: list,
+                   use_cached_score: bool = False) -> float:
+    """Run Layer 4, appending a NET1 flag on collusion. Returns network score."""
     network_score = 0.0
     try:
-        net_result    = analyze_transaction_network(tx, business_id)
+        net_result    = analyze_transaction_network(tx, business_id, use_cached_score)
         network_score = net_result.get("network_risk_score", 0.0)
         # Update tx vendor_risk_score from network analysis
         vendor_risk   = net_result.get("vendor_risk_score", 0.0)
@@ -118,14 +228,23 @@ def analyze(tx: dict, business_id: int,
             ))
     except Exception as e:
         print(f"[FraudEngine] Network layer error: {e}")
+    return network_score
 
-    # ── Composite Score ────────────────────────────────────────────────────────
-    final_score = (
+
+def _composite(ml_confidence: float, rule_score: float, network_score: float) -> float:
+    return (
         WEIGHTS["ml"]      * ml_confidence +
         WEIGHTS["rules"]   * rule_score +
         WEIGHTS["network"] * network_score
     )
 
+
+def _build_verdict(ml_confidence: float, rule_score: float, network_score: float,
+                   flags: list, shap_reasons: list, critical: bool,
+                   cascade_skipped: bool = False, config_version: str = "") -> FraudVerdict:
+    # ── Composite Score ────────────────────────────────────────────────────────
+    final_score = _composite(ml_confidence, rule_score, network_score)
+
     # Critical rule → override to fraud regardless of score
     if critical:
         final_score = max(final_score, 0.75)
@@ -145,6 +264,7 @@ def analyze(tx: dict, business_id: int,
         risk_level = "low"
 
     review_required = final_score >= REVIEW_THRESHOLD
+    record_verdict(risk_level, flags)
 
     # Determine primary verdict source
     if critical:
@@ -168,4 +288,6 @@ def analyze(tx: dict, business_id: int,
         critical_hit=critical,
         review_required=review_required,
         verdict_source=verdict_source,
+        cascade_skipped=cascade_skipped,
+        config_version=config_version,
     )
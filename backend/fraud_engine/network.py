@@ -4,45 +4,223 @@ Builds a vendor graph per business and detects:
 - Vendor concentration risk (too few vendors getting too much money)
 - Collusion patterns (vendors sharing unusual activity windows)
 - Vendor risk score based on network centrality
+
+Vendor nodes are keyed by canonical vendor ID (fraud_engine/vendors.py), so
+"Johns Electronics LLC" and "JOHN'S ELECTRONICS" are one vendor; the node's
+`name` is the first spelling seen.
+
+Memory: vendor names are free text, so the graph is bounded. Risk scoring
+uses time-decayed weights (half-life VENDOR_GRAPH_HALF_LIFE_DAYS of wall-clock
+time) kept as forward-decayed values — amount * 2^((t - t0) / half_life) —
+so one update costs O(1) and every stored value is comparable without
+rescaling the rest of the graph. When the estimated size passes
+VENDOR_GRAPH_MAX_BYTES the vendors with the lowest decayed weight (stale or
+small) are evicted until the graph is back under VENDOR_GRAPH_EVICT_TARGET
+of the cap.
 """
 
 import os
 import json
 import math
+import time
+import heapq
+import functools
+import threading
 from collections import defaultdict
-from typing import Optional
+from typing import Callable, Optional
 import networkx as nx
 
+from .vendors import canonical_vendor_id
+
+VENDOR_GRAPH_MAX_BYTES      = int(os.getenv("VENDOR_GRAPH_MAX_BYTES", str(64 * 1024 * 1024)))
+VENDOR_GRAPH_HALF_LIFE_DAYS = float(os.getenv("VENDOR_GRAPH_HALF_LIFE_DAYS", "30"))
+VENDOR_GRAPH_EVICT_TARGET   = float(os.getenv("VENDOR_GRAPH_EVICT_TARGET", "0.9"))
+
+# Approximate size per element, from tracemalloc on networkx DiGraphs
+# carrying these attributes (CPython 3.11, 64-bit, networkx 3). Real usage
+# drifts ±20% with edge density (a business's first edge costs more than
+# later ones), key length and the Python / networkx version, so the cap is
+# a budget for this estimate rather than a hard limit on process memory.
+NODE_BYTES       = 620
+EDGE_BYTES       = 350
+NAME_CHAR_BYTES  = 3       # node key + name attribute per character
+RISK_CACHE_BYTES = 150
+
+# Rebase forward-decayed values before 2^exponent gets large
+_MAX_DECAY_EXPONENT = 64
+
+
+def _locked(method):
+    """
+    Run a VendorGraph reader under the graph lock: eviction removes nodes
+    while add_transaction runs, and iterating G (PageRank, predecessors)
+    mid-eviction would fail or see a half-evicted graph.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def vendor_node(vendor_name: str) -> str:
+    return f"vendor_{canonical_vendor_id(vendor_name)}"
+
 
 class VendorGraph:
     """
     Maintains an in-memory directed graph: business → vendor edges.
-    Edge weight = cumulative transaction amount.
+    Edge weight = cumulative transaction amount; edge `decayed` and vendor
+    `decayed_received` are the forward-decayed amounts used for scoring.
     """
-    def __init__(self):
+    def __init__(self, max_bytes: int = VENDOR_GRAPH_MAX_BYTES,
+                 half_life_days: float = VENDOR_GRAPH_HALF_LIFE_DAYS,
+                 clock: Callable[[], float] = time.time):
         self.G = nx.DiGraph()
+        # Last full (PageRank-based) risk score per vendor node, with the
+        # vendor's in-degree at the time — used by cascade mode
+        self._risk_cache: dict[str, tuple[float, int]] = {}
+
+        self.max_bytes      = max_bytes
+        self.half_life      = half_life_days * 86400
+        self._clock         = clock
+        self._t0            = clock()
+        self._decayed_total = 0.0       # sum of vendor decayed_received
+        self._name_chars    = 0
+        self._edges         = 0         # DiGraph.number_of_edges() walks every node
+        self.evicted_vendors = 0
+        self.eviction_runs   = 0
+        self._lock = threading.RLock()
+
+    def _decay_factor(self, now: float) -> float:
+        """Forward-decay multiplier for a value added at `now`."""
+        exponent = (now - self._t0) / self.half_life
+        if exponent > _MAX_DECAY_EXPONENT:
+            self._rebase(now)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, now: float):
+        """Move t0 to now, scaling every stored decayed value to match."""
+        scale = 2.0 ** (-(now - self._t0) / self.half_life)
+        for _, _, data in self.G.edges(data=True):
+            data["decayed"] *= scale
+        for _, data in self.G.nodes(data=True):
+            if data.get("type") == "vendor":
+                data["decayed_received"] *= scale
+        self._decayed_total *= scale
+        self._t0 = now
 
     def add_transaction(self, business_id: int, vendor_name: str,
                         amount: float, timestamp: str = ""):
-        biz_node    = f"biz_{business_id}"
-        vendor_node = f"vendor_{vendor_name}"
-
-        if not self.G.has_node(biz_node):
-            self.G.add_node(biz_node, type="business", business_id=business_id)
-        if not self.G.has_node(vendor_node):
-            self.G.add_node(vendor_node, type="vendor", name=vendor_name,
-                            total_received=0.0, txn_count=0)
-
-        if self.G.has_edge(biz_node, vendor_node):
-            self.G[biz_node][vendor_node]["weight"] += amount
-            self.G[biz_node][vendor_node]["txn_count"] += 1
-        else:
-            self.G.add_edge(biz_node, vendor_node, weight=amount, txn_count=1)
+        biz_node = f"biz_{business_id}"
+        v_node   = vendor_node(vendor_name)
+
+        with self._lock:
+            decayed = amount * self._decay_factor(self._clock())
+
+            if not self.G.has_node(biz_node):
+                self.G.add_node(biz_node, type="business", business_id=business_id)
+                self._name_chars += len(biz_node)
+            if not self.G.has_node(v_node):
+                self.G.add_node(v_node, type="vendor", name=vendor_name,
+                                total_received=0.0, txn_count=0, decayed_received=0.0)
+                self._name_chars += len(v_node)
+
+            if self.G.has_edge(biz_node, v_node):
+                edge = self.G[biz_node][v_node]
+                edge["weight"]    += amount
+                edge["txn_count"] += 1
+                edge["decayed"]   += decayed
+            else:
+                self.G.add_edge(biz_node, v_node, weight=amount, txn_count=1, decayed=decayed)
+                self._edges += 1
+
+            # Update vendor totals
+            node = self.G.nodes[v_node]
+            node["total_received"]   += amount
+            node["txn_count"]        += 1
+            node["decayed_received"] += decayed
+            self._decayed_total      += decayed
+
+            if self.estimated_bytes() > self.max_bytes:
+                self.evict(int(self.max_bytes * VENDOR_GRAPH_EVICT_TARGET), keep=v_node)
 
-        # Update vendor totals
-        self.G.nodes[vendor_node]["total_received"] += amount
-        self.G.nodes[vendor_node]["txn_count"]      += 1
+    # ── Memory accounting / eviction ─────────────────────────────────────────
 
+    def estimated_bytes(self) -> int:
+        return (self.G.number_of_nodes() * NODE_BYTES
+                + self._edges * EDGE_BYTES
+                + self._name_chars * NAME_CHAR_BYTES
+                + len(self._risk_cache) * RISK_CACHE_BYTES)
+
+    def evict(self, target_bytes: int, keep: Optional[str] = None) -> int:
+        """
+        Drop the vendors with the lowest decayed weight until the estimate is
+        at or below target_bytes, plus businesses left without vendors.
+        Returns the number of vendors evicted.
+
+        Candidates come off a heap (O(V + k log V) for k evictions) and the
+        size estimate is adjusted per removal instead of recomputed. Cached
+        risk scores are dropped only for the evicted vendors and for vendors
+        sharing a business with them, whose PageRank neighbourhood changed;
+        the shift in everyone else's concentration is no larger than what
+        ordinary adds already leave in the cache.
+        """
+        with self._lock:
+            vendors = [
+                (data["decayed_received"], n) for n, data in self.G.nodes(data=True)
+                if data.get("type") == "vendor" and n != keep
+            ]
+            heapq.heapify(vendors)
+            size     = self.estimated_bytes()
+            evicted  = 0
+            touched  = set()
+            while vendors and size > target_bytes:
+                decayed, node = heapq.heappop(vendors)
+                owners = list(self.G.predecessors(node))
+                if self._risk_cache.pop(node, None) is not None:
+                    size -= RISK_CACHE_BYTES
+                self.G.remove_node(node)
+                size -= NODE_BYTES + len(owners) * EDGE_BYTES + len(node) * NAME_CHAR_BYTES
+                self._edges         -= len(owners)
+                self._name_chars    -= len(node)
+                self._decayed_total -= decayed
+                evicted += 1
+                for biz in owners:
+                    if self.G.out_degree(biz) == 0:
+                        self.G.remove_node(biz)
+                        self._name_chars -= len(biz)
+                        size -= NODE_BYTES + len(biz) * NAME_CHAR_BYTES
+                    else:
+                        touched.update(self.G.successors(biz))
+
+            for node in touched:
+                self._risk_cache.pop(node, None)
+            self.evicted_vendors += evicted
+            self.eviction_runs   += 1
+        if evicted:
+            print(f"[VendorGraph] Evicted {evicted} vendors "
+                  f"(~{self.estimated_bytes() // 1024} KiB, cap {self.max_bytes // 1024} KiB)")
+        return evicted
+
+    @_locked
+    def stats(self) -> dict:
+        vendors = sum(1 for _, t in self.G.nodes(data="type") if t == "vendor")
+        return {
+            "nodes":           self.G.number_of_nodes(),
+            "vendors":         vendors,
+            "businesses":      self.G.number_of_nodes() - vendors,
+            "edges":           self.G.number_of_edges(),
+            "risk_cache":      len(self._risk_cache),
+            "estimated_bytes": self.estimated_bytes(),
+            "max_bytes":       self.max_bytes,
+            "half_life_days":  self.half_life / 86400,
+            "evicted_vendors": self.evicted_vendors,
+            "eviction_runs":   self.eviction_runs,
+        }
+
+    @_locked
     def get_vendor_risk_score(self, vendor_name: str) -> float:
         """
         Compute a vendor risk score 0–1 based on:
@@ -50,18 +228,18 @@ class VendorGraph:
         - Total amount received (normalized)
         - Number of businesses paying this vendor (concentration)
         """
-        vendor_node = f"vendor_{vendor_name}"
-        if not self.G.has_node(vendor_node):
+        v_node = vendor_node(vendor_name)
+        if not self.G.has_node(v_node):
             return 0.05
 
         # 1. In-degree (number of businesses paying this vendor)
-        in_degree = self.G.in_degree(vendor_node)
+        in_degree = self.G.in_degree(v_node)
 
         # 2. PageRank
         if len(self.G.nodes) > 2:
             try:
-                pr = nx.pagerank(self.G, weight="weight")
-                vendor_pr = pr.get(vendor_node, 0.0)
+                pr = nx.pagerank(self.G, weight="decayed")
+                vendor_pr = pr.get(v_node, 0.0)
                 max_pr    = max(pr.values()) or 1e-9
                 pr_score  = vendor_pr / max_pr
             except Exception:
@@ -70,36 +248,65 @@ class VendorGraph:
             pr_score = 0.0
 
         # 3. Amount concentration (single vendor receiving large fraction = risky)
-        node_data      = self.G.nodes[vendor_node]
-        total_received = node_data.get("total_received", 0)
-        total_in_graph = sum(
-            self.G.nodes[n].get("total_received", 0)
-            for n in self.G.nodes
-            if self.G.nodes[n].get("type") == "vendor"
-        ) or 1
-        concentration = total_received / total_in_graph
+        node_data     = self.G.nodes[v_node]
+        concentration = node_data.get("decayed_received", 0) / (self._decayed_total or 1)
 
         # Combine: weight concentration heavily
         if in_degree <= 1:
             # Single tenant: risk is purely based on concentration (e.g. 1 vendor getting 80% of funds)
             raw_score = concentration
-            return round(min(1.0, raw_score * 1.5), 4)
+            score = round(min(1.0, raw_score * 1.5), 4)
         else:
             # Multi-tenant: apply PR and degree
             raw_score = 0.3 * pr_score + 0.4 * concentration + 0.3 * min(1.0, in_degree / 10.0)
-            return round(min(1.0, raw_score * 2.5), 4)
+            score = round(min(1.0, raw_score * 2.5), 4)
+
+        self._risk_cache[v_node] = (score, in_degree)
+        return score
+
+    @_locked
+    def cached_vendor_risk_score(self, vendor_name: str,
+                                 in_degree: Optional[int] = None) -> Optional[float]:
+        """
+        Last full risk score computed for this vendor, or None if it was never
+        scored or its in-degree has changed since (the score formula switches
+        on in-degree, so the cached value is no longer a useful estimate).
+        """
+        v_node = vendor_node(vendor_name)
+        cached = self._risk_cache.get(v_node)
+        if cached is None:
+            return None
+        if in_degree is None:
+            in_degree = self.G.in_degree(v_node) if self.G.has_node(v_node) else 0
+        score, cached_degree = cached
+        return score if cached_degree == in_degree else None
 
+    @_locked
+    def shared_business_count(self, business_id: int, vendor_name: str) -> int:
+        """
+        Number of businesses paying this vendor once business_id's next
+        transaction is added (cheap — no graph-wide computation).
+        """
+        v_node = vendor_node(vendor_name)
+        if not self.G.has_node(v_node):
+            return 1
+        count = self.G.in_degree(v_node)
+        if not self.G.has_edge(f"biz_{business_id}", v_node):
+            count += 1
+        return count
+
+    @_locked
     def detect_collusion(self, business_id: int, vendor_name: str) -> dict:
         """
         Check if this vendor has been used suspiciously by multiple businesses
         (potential collusion: vendors receiving payments from many businesses
         in short time windows).
         """
-        vendor_node   = f"vendor_{vendor_name}"
-        if not self.G.has_node(vendor_node):
+        v_node = vendor_node(vendor_name)
+        if not self.G.has_node(v_node):
             return {"collusion_detected": False, "shared_businesses": 0}
 
-        predecessors = list(self.G.predecessors(vendor_node))
+        predecessors = list(self.G.predecessors(v_node))
         shared_count = len(predecessors)
 
         if shared_count >= 10:
@@ -114,6 +321,7 @@ class VendorGraph:
                     "message": f"Vendor receiving payments from {shared_count} businesses"}
         return {"collusion_detected": False, "shared_businesses": shared_count}
 
+    @_locked
     def get_graph_json(self, business_id: Optional[int] = None) -> dict:
         """
         Export graph as JSON for the frontend visualization endpoint.
@@ -165,9 +373,12 @@ def get_vendor_graph() -> VendorGraph:
     return _vendor_graph
 
 
-def analyze_transaction_network(tx: dict, business_id: int) -> dict:
+def analyze_transaction_network(tx: dict, business_id: int,
+                                use_cached_score: bool = False) -> dict:
     """
     Add transaction to the graph and return network-based risk signals.
+    With use_cached_score=True the vendor's last full risk score is reused
+    instead of recomputing PageRank over the whole graph.
     """
     graph       = get_vendor_graph()
     vendor_name = str(tx.get("vendor_name", "unknown") or "unknown")
@@ -176,7 +387,11 @@ def analyze_transaction_network(tx: dict, business_id: int) -> dict:
 
     graph.add_transaction(business_id, vendor_name, amount, timestamp)
 
-    vendor_risk  = graph.get_vendor_risk_score(vendor_name)
+    vendor_risk = None
+    if use_cached_score:
+        vendor_risk = graph.cached_vendor_risk_score(vendor_name)
+    if vendor_risk is None:
+        vendor_risk = graph.get_vendor_risk_score(vendor_name)
     collusion    = graph.detect_collusion(business_id, vendor_name)
 
     return {
@@ -188,3 +403,25 @@ def analyze_transaction_network(tx: dict, business_id: int) -> dict:
             4
         ),
     }
+
+
+def network_score_upper_bound(tx: dict, business_id: int,
+                              tolerance: float) -> Optional[float]:
+    """
+    Cheap estimated upper bound on the network_risk_score
+    analyze_transaction_network would return, without mutating the graph.
+    It holds only while the vendor's score has drifted less than `tolerance`
+    above its cached value — a heuristic margin, not a guarantee.
+    Returns None when the vendor has no cached score yet.
+    """
+    graph       = get_vendor_graph()
+    vendor_name = str(tx.get("vendor_name", "unknown") or "unknown")
+
+    shared = graph.shared_business_count(business_id, vendor_name)
+    cached = graph.cached_vendor_risk_score(vendor_name, in_degree=shared)
+    if cached is None:
+        return None
+
+    collusion_possible = shared >= 5
+    vendor_bound       = min(1.0, cached + tolerance)
+    return min(1.0, vendor_bound * 0.6 + (0.4 if collusion_possible else 0))
@@ -1,14 +1,33 @@
 """
 FraudSense — Rule Engine (Layer 1)
 8 configurable threshold-based rules. Each rule returns a FlagResult.
-All thresholds are loaded from env vars so they can be tuned without redeployment.
+Default thresholds come from env vars (CFG). When RULE_CONFIG_PATH points at
+a JSON file, thresholds and per-business overrides are read from it instead
+and re-read whenever the file changes, without a restart:
+
+    {
+      "version":    "2026-10-19.1",
+      "thresholds": {"large_txn_threshold": 20000},
+      "businesses": {"42": {"velocity_1h_limit": 12}}
+    }
+
+Keys left out fall back to CFG. A file that fails to parse or validate is
+logged and ignored; the previous config stays active. Every verdict records
+the version it was scored with ("sha-<hash>" when the file has no version).
 """
 
 import os
+import json
+import time
+import hashlib
+import logging
+import threading
 from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
 
+logger = logging.getLogger("fraudsense.rules")
+
 HIGH_RISK_COUNTRIES = {"NG", "RU", "KP", "IR", "VE", "UA", "BY", "MM"}
 
 # ── Configurable thresholds (env vars with sane defaults) ─────────────────────
@@ -23,6 +42,9 @@ CFG = {
     "after_hours_end":         int(os.getenv("RULE_AFTER_HOURS_END",    "5")),
 }
 
+RULE_CONFIG_PATH           = os.getenv("RULE_CONFIG_PATH", "")
+RULE_CONFIG_RELOAD_SECONDS = float(os.getenv("RULE_CONFIG_RELOAD_SECONDS", "5"))
+
 
 @dataclass
 class FlagResult:
@@ -32,6 +54,14 @@ class FlagResult:
     message:     str
     score_delta: float = 0.0   # additive risk contribution (0–1)
 
+    def to_dict(self) -> dict:
+        return {
+            "rule_id":     self.rule_id,
+            "severity":    self.severity,
+            "message":     self.message,
+            "score_delta": self.score_delta,
+        }
+
 
 def _flag(rule_id: str, severity: str, message: str, delta: float) -> FlagResult:
     return FlagResult(rule_id=rule_id, triggered=True,
@@ -45,26 +75,26 @@ def _ok(rule_id: str) -> FlagResult:
 
 # ── Individual rules ──────────────────────────────────────────────────────────
 
-def rule_large_transaction(tx: dict) -> FlagResult:
+def rule_large_transaction(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R1: Transaction amount unusually large."""
     amount  = float(tx.get("amount", 0) or 0)
     avg     = float(tx.get("business_avg_amount", amount) or amount)
     ratio   = amount / max(1.0, avg)
-    limit   = CFG["large_txn_threshold"]
+    limit   = cfg["large_txn_threshold"]
 
     if amount >= limit * 5:
         return _flag("R1", "critical", f"Amount ${amount:,.0f} is 5x+ above threshold", 0.35)
     if amount >= limit:
         return _flag("R1", "high", f"Amount ${amount:,.0f} exceeds ${limit:,.0f} threshold", 0.20)
-    if ratio >= CFG["ratio_spike"]:
+    if ratio >= cfg["ratio_spike"]:
         return _flag("R1", "medium", f"Amount is {ratio:.1f}x business average", 0.12)
     return _ok("R1")
 
 
-def rule_velocity_1h(tx: dict) -> FlagResult:
+def rule_velocity_1h(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R2: Too many transactions in the past hour."""
     count = int(tx.get("num_txns_last_1h", 0) or 0)
-    limit = CFG["velocity_1h_limit"]
+    limit = cfg["velocity_1h_limit"]
     if count >= limit * 2:
         return _flag("R2", "critical", f"{count} transactions in past hour (limit: {limit})", 0.30)
     if count >= limit:
@@ -72,16 +102,16 @@ def rule_velocity_1h(tx: dict) -> FlagResult:
     return _ok("R2")
 
 
-def rule_velocity_24h(tx: dict) -> FlagResult:
+def rule_velocity_24h(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R3: Too many transactions in the past 24 hours."""
     count = int(tx.get("num_txns_last_24h", 0) or 0)
-    limit = CFG["velocity_24h_limit"]
+    limit = cfg["velocity_24h_limit"]
     if count >= limit:
         return _flag("R3", "medium", f"{count} transactions in past 24h (limit: {limit})", 0.10)
     return _ok("R3")
 
 
-def rule_high_risk_country(tx: dict) -> FlagResult:
+def rule_high_risk_country(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R4: Vendor or transaction originates from high-risk jurisdiction."""
     vendor_country = str(tx.get("vendor_country", "") or "")
     ip_country     = str(tx.get("ip_country",     "") or "")
@@ -97,7 +127,7 @@ def rule_high_risk_country(tx: dict) -> FlagResult:
     return _ok("R4")
 
 
-def rule_country_mismatch(tx: dict) -> FlagResult:
+def rule_country_mismatch(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R5: IP country doesn't match vendor country."""
     ip_country     = str(tx.get("ip_country",     "") or "")
     vendor_country = str(tx.get("vendor_country", "") or "")
@@ -107,7 +137,7 @@ def rule_country_mismatch(tx: dict) -> FlagResult:
     return _ok("R5")
 
 
-def rule_after_hours_crypto(tx: dict) -> FlagResult:
+def rule_after_hours_crypto(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R6: Cryptocurrency purchase after business hours."""
     ts_raw   = tx.get("timestamp") or tx.get("date") or ""
     category = str(tx.get("category", "") or "").lower()
@@ -120,7 +150,7 @@ def rule_after_hours_crypto(tx: dict) -> FlagResult:
     except Exception:
         hour = int(tx.get("hour_of_day", 12) or 12)
 
-    after_hours = hour < CFG["after_hours_end"] or hour >= CFG["after_hours_start"]
+    after_hours = hour < cfg["after_hours_end"] or hour >= cfg["after_hours_start"]
 
     if is_crypto and after_hours:
         return _flag("R6", "high",
@@ -132,11 +162,11 @@ def rule_after_hours_crypto(tx: dict) -> FlagResult:
     return _ok("R6")
 
 
-def rule_round_amount_new_vendor(tx: dict) -> FlagResult:
+def rule_round_amount_new_vendor(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R7: Suspiciously round amount to an unknown vendor."""
     amount     = float(tx.get("amount", 0) or 0)
     is_new     = bool(tx.get("is_new_vendor", 0))
-    min_round  = CFG["round_amount_min"]
+    min_round  = cfg["round_amount_min"]
     is_round   = amount >= min_round and (amount % 1000 < 1 or amount % 500 < 1)
 
     if is_round and is_new:
@@ -147,10 +177,10 @@ def rule_round_amount_new_vendor(tx: dict) -> FlagResult:
     return _ok("R7")
 
 
-def rule_vendor_risk_score(tx: dict) -> FlagResult:
+def rule_vendor_risk_score(tx: dict, cfg: dict = CFG) -> FlagResult:
     """R8: Vendor has a high risk score (from network analysis or blacklist)."""
     score = float(tx.get("vendor_risk_score", 0) or 0)
-    limit = CFG["vendor_risk_high"]
+    limit = cfg["vendor_risk_high"]
     if score >= 0.90:
         return _flag("R8", "critical", f"Vendor risk score: {score:.2f} (critically high)", 0.35)
     if score >= limit:
@@ -160,6 +190,152 @@ def rule_vendor_risk_score(tx: dict) -> FlagResult:
     return _ok("R8")
 
 
+# ── Versioned config ──────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class RuleConfig:
+    version:    str
+    thresholds: dict                                   # full CFG-shaped dict
+    businesses: dict = field(default_factory=dict)     # business_id → overrides
+
+    def resolve(self, business_id: Optional[int] = None) -> dict:
+        """Thresholds for one business — resolve once per batch, not per rule."""
+        overrides = self.businesses.get(business_id)
+        return {**self.thresholds, **overrides} if overrides else self.thresholds
+
+
+def _validated(values: dict, where: str) -> dict:
+    """Cast overrides to the CFG value types; unknown keys are an error."""
+    if not isinstance(values, dict):
+        raise ValueError(f"{where}: expected an object")
+    out = {}
+    for key, value in values.items():
+        if key not in CFG:
+            raise ValueError(f"{where}: unknown rule setting {key!r}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{where}: {key} must be a number")
+        out[key] = type(CFG[key])(value)
+    return out
+
+
+def _digest(raw: bytes) -> str:
+    return "sha-" + hashlib.sha256(raw).hexdigest()[:12]
+
+
+def parse_rule_config(raw: bytes) -> RuleConfig:
+    """RULE_CONFIG_PATH contents → RuleConfig, or ValueError."""
+    try:
+        doc = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from e
+    if not isinstance(doc, dict):
+        raise ValueError("expected a JSON object")
+    unknown = set(doc) - {"version", "thresholds", "businesses"}
+    if unknown:
+        raise ValueError(f"unknown top-level keys: {sorted(unknown)}")
+
+    thresholds = {**CFG, **_validated(doc.get("thresholds", {}), "thresholds")}
+    businesses = {}
+    for biz_id, overrides in (doc.get("businesses") or {}).items():
+        try:
+            key = int(biz_id)
+        except ValueError:
+            raise ValueError(f"businesses: {biz_id!r} is not a business id") from None
+        businesses[key] = _validated(overrides, f"businesses.{biz_id}")
+    return RuleConfig(version=str(doc.get("version") or _digest(raw)),
+                      thresholds=thresholds, businesses=businesses)
+
+
+def env_rule_config() -> RuleConfig:
+    """CFG alone, versioned by content so verdicts still say which thresholds scored them."""
+    digest = hashlib.sha256(json.dumps(CFG, sort_keys=True).encode()).hexdigest()[:12]
+    return RuleConfig(version=f"env-{digest}", thresholds=dict(CFG))
+
+
+class RuleConfigStore:
+    """
+    Holds the active RuleConfig. current() re-checks the file's mtime / size
+    at most every `reload_seconds`; a changed file is parsed in full and
+    swapped in with one reference assignment, so a batch that already
+    resolved its thresholds keeps a consistent snapshot.
+    """
+
+    def __init__(self, path: str = RULE_CONFIG_PATH,
+                 reload_seconds: float = RULE_CONFIG_RELOAD_SECONDS):
+        self.path           = path
+        self.reload_seconds = reload_seconds
+        self.last_error: Optional[str] = None
+        self._config        = env_rule_config()
+        self._stamp         = None
+        self._next_check    = 0.0
+        self._lock          = threading.Lock()
+        if path:
+            self.reload()
+
+    def current(self) -> RuleConfig:
+        if self.path and time.monotonic() >= self._next_check:
+            self.reload()
+        return self._config
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the file if it changed. Returns True when a new config was swapped in."""
+        if not self._lock.acquire(blocking=False):
+            return False                       # another thread is already reloading
+        try:
+            self._next_check = time.monotonic() + self.reload_seconds
+            try:
+                st = os.stat(self.path)
+            except OSError as e:
+                return self._failed(f"cannot stat {self.path}: {e}")
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp == self._stamp and not force:
+                return False
+            try:
+                with open(self.path, "rb") as f:
+                    config = parse_rule_config(f.read())
+            except (OSError, ValueError) as e:
+                self._stamp = stamp            # don't re-parse the same broken file
+                return self._failed(f"{self.path}: {e}")
+
+            self._stamp, self.last_error = stamp, None
+            if config == self._config:
+                return False
+            self._config = config
+            logger.info(f"Rule config {config.version} loaded from {self.path}")
+            return True
+        finally:
+            self._lock.release()
+
+    def _failed(self, message: str) -> bool:
+        if message != self.last_error:
+            logger.error(f"Rule config not reloaded, keeping {self._config.version}: {message}")
+        self.last_error = message
+        return False
+
+    def stats(self) -> dict:
+        config = self._config
+        return {
+            "version":    config.version,
+            "source":     self.path or "env",
+            "businesses": len(config.businesses),
+            "last_error": self.last_error,
+        }
+
+
+_rule_config_store: Optional[RuleConfigStore] = None
+
+
+def get_rule_config_store() -> RuleConfigStore:
+    global _rule_config_store
+    if _rule_config_store is None:
+        _rule_config_store = RuleConfigStore()
+    return _rule_config_store
+
+
+def get_rule_config() -> RuleConfig:
+    return get_rule_config_store().current()
+
+
 # ── Orchestrate all rules ─────────────────────────────────────────────────────
 RULES = [
     rule_large_transaction,
@@ -173,9 +349,10 @@ RULES = [
 ]
 
 
-def evaluate_rules(tx: dict) -> dict:
+def evaluate_rules(tx: dict, cfg: Optional[dict] = None) -> dict:
     """
-    Run all rules and return:
+    Run all rules against `cfg` thresholds (RuleConfig.resolve(); defaults
+    to the active config without business overrides) and return:
     {
       "flags": [FlagResult, ...],          # only triggered rules
       "rule_score": float,                 # weighted sum (0–1)
@@ -183,9 +360,9 @@ def evaluate_rules(tx: dict) -> dict:
       "triggered_count": int,
     }
     """
-    triggered = [r(tx) for r in RULES if r(tx).triggered]
-    # Re-run without short-circuit to get all results
-    all_results = [r(tx) for r in RULES]
+    if cfg is None:
+        cfg = get_rule_config().resolve()
+    all_results = [r(tx, cfg) for r in RULES]
     triggered   = [r for r in all_results if r.triggered]
 
     raw_score    = sum(r.score_delta for r in triggered)
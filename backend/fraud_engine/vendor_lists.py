@@ -0,0 +1,291 @@
+"""
+FraudSense — Vendor Blacklist / Allowlist
+Per-business vendor lists (VendorListEntry rows) held in memory as a
+VendorListIndex per business:
+
+  exact   canonical vendor ID (fraud_engine/vendors.py) → entry id,
+          one dict per list — O(1)
+  fuzzy   trigram → set of blacklist entry ids;
+          shared-trigram counts over all but the query's most common
+          trigrams bound the Dice similarity, and only the few entries
+          that can still reach VENDOR_FUZZY_THRESHOLD are scored exactly
+
+Match results are kept in a bounded LRU until the index next changes.
+
+Adding or removing an entry touches only that entry's keys, so a list of
+millions is loaded once per worker and then kept current incrementally:
+each worker re-reads rows whose updated_at moved since its last sync
+(deletes are soft, active=False) at most every VENDOR_LIST_SYNC_SECONDS.
+Re-reading an entry that has not changed (the sync window overlaps) is a
+no-op and keeps the match cache.
+
+Matches feed the rule inputs before any layer runs (apply_vendor_lists):
+a blacklisted vendor gets vendor_risk_score 1.0 (R8 critical), a close
+lookalike of one VENDOR_FUZZY_RISK, and an allowlisted vendor 0.0.
+Allowlisting is exact-only — a fuzzy allowlist would clear lookalikes.
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from .vendors import canonical_vendor_id, normalize_vendor_name
+
+logger = logging.getLogger("fraudsense.vendor_lists")
+
+VENDOR_FUZZY_THRESHOLD   = float(os.getenv("VENDOR_FUZZY_THRESHOLD", "0.85"))
+VENDOR_FUZZY_RISK        = float(os.getenv("VENDOR_FUZZY_RISK", "0.75"))
+VENDOR_LIST_SYNC_SECONDS = float(os.getenv("VENDOR_LIST_SYNC_SECONDS", "5"))
+VENDOR_MATCH_CACHE_SIZE  = int(os.getenv("VENDOR_MATCH_CACHE_SIZE", "100000"))
+BLACKLIST_RISK           = 1.0
+ALLOWLIST_RISK           = 0.0
+LIST_TYPES               = ("blacklist", "allowlist")
+
+# Re-read this much before the last sync so rows written by a worker whose
+# clock runs behind are not missed; re-applying a row is idempotent.
+SYNC_OVERLAP = timedelta(seconds=60)
+SYNC_BATCH   = 10_000
+
+# Trigram postings longer than this (or 0.2% of the entries) are "common"
+FUZZY_COMMON_MIN = 256
+
+
+def vendor_key(name) -> str:
+    """List key for a vendor name: its canonical ID, or "" when the name has none."""
+    return canonical_vendor_id(name) if normalize_vendor_name(name) else ""
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+class VendorListIndex:
+    """One business's blacklist + allowlist, exact and fuzzy, updated in place."""
+
+    def __init__(self, fuzzy_threshold: float = VENDOR_FUZZY_THRESHOLD,
+                 cache_size: int = VENDOR_MATCH_CACHE_SIZE):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.cache_size      = cache_size
+        self._cache: OrderedDict[str, Optional[dict]] = OrderedDict()   # key → match
+        self._exact   = {t: {} for t in LIST_TYPES}    # list type → key → entry id
+        self._entries: dict[int, tuple] = {}            # entry id → (list type, key, trigram count)
+        self._grams:   dict[str, set] = {}              # trigram → blacklist entry ids
+        self._lock    = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry_id: int, list_type: str, vendor_name: str):
+        key = vendor_key(vendor_name)
+        with self._lock:
+            current = self._entries.get(entry_id)
+            if current is not None and current[:2] == (list_type, key):
+                return
+            self.remove(entry_id)
+            if not key:
+                return
+            self._cache.clear()
+            grams = trigrams(key)
+            self._exact[list_type][key] = entry_id
+            self._entries[entry_id] = (list_type, key, len(grams))
+            if list_type == "blacklist":
+                for gram in grams:
+                    self._grams.setdefault(gram, set()).add(entry_id)
+
+    def remove(self, entry_id: int):
+        with self._lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                return
+            self._cache.clear()
+            list_type, key, _ = entry
+            if self._exact[list_type].get(key) == entry_id:
+                del self._exact[list_type][key]
+            if list_type == "blacklist":
+                for gram in trigrams(key):
+                    posting = self._grams.get(gram)
+                    if posting is not None:
+                        posting.discard(entry_id)
+                        if not posting:
+                            del self._grams[gram]
+
+    def match(self, vendor_name: str) -> Optional[dict]:
+        """
+        {"list", "match": "exact" | "fuzzy", "entry_id", "key", "similarity"}
+        for the vendor, or None. An exact blacklist hit wins over an exact
+        allowlist hit; fuzzy matching only runs against the blacklist.
+        """
+        key = vendor_key(vendor_name)
+        if not key:
+            return None
+        with self._lock:
+            for list_type in LIST_TYPES:
+                entry_id = self._exact[list_type].get(key)
+                if entry_id is not None:
+                    return {"list": list_type, "match": "exact", "entry_id": entry_id,
+                            "key": key, "similarity": 1.0}
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            match = self._fuzzy(key)
+            self._cache[key] = match
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return match
+
+    def _fuzzy(self, key: str) -> Optional[dict]:
+        if not self._grams:
+            return None
+        query = trigrams(key)
+        t     = self.fuzzy_threshold
+        # Dice >= t needs at least ceil(t·|q| / (2 − t)) shared trigrams. Common
+        # query trigrams (suffixes like "llc", first letters) are left out of
+        # the count — they would dominate its cost — and lower the bar for
+        # the rest by as many; at most need − 1 of them, so the bar stays >= 1.
+        need   = max(1, math.ceil(t * len(query) / (2 - t) - 1e-9))
+        grams  = sorted(query, key=lambda g: len(self._grams.get(g, ())))
+        common = max(FUZZY_COMMON_MIN, len(self._entries) // 500)
+        skip   = sum(1 for g in grams[len(grams) - need + 1:] if len(self._grams.get(g, ())) > common)
+        counts = Counter()
+        for gram in grams[:len(grams) - skip]:
+            counts.update(self._grams.get(gram, ()))
+        floor = need - skip
+
+        best, best_score = None, t
+        for entry_id, shared in [item for item in counts.items() if item[1] >= floor]:
+            _, candidate, size = self._entries[entry_id]
+            # the skipped trigrams can add at most `skip` more shared ones
+            if 2 * min(shared + skip, size) < best_score * (len(query) + size):
+                continue
+            score = dice(query, trigrams(candidate))
+            if score >= best_score:
+                best, best_score = (entry_id, candidate), score
+        if best is None:
+            return None
+        return {"list": "blacklist", "match": "fuzzy", "entry_id": best[0],
+                "key": best[1], "similarity": round(best_score, 4)}
+
+
+class VendorLists:
+    """VendorListIndex per business, loaded lazily and synced incrementally from the DB."""
+
+    def __init__(self, session_factory=None, sync_seconds: float = VENDOR_LIST_SYNC_SECONDS):
+        self._session_factory = session_factory
+        self.sync_seconds     = sync_seconds
+        self._indexes: dict[int, VendorListIndex] = {}
+        self._synced_at: dict[int, datetime] = {}
+        self._next_sync: dict[int, float]    = {}
+        self._lock = threading.Lock()
+
+    def index_for(self, business_id: int) -> VendorListIndex:
+        """The business's index, synced if it is due (DB errors keep the last state)."""
+        index = self._indexes.get(business_id)
+        if index is not None and time.monotonic() < self._next_sync.get(business_id, 0):
+            return index
+        with self._lock:
+            index = self._indexes.setdefault(business_id, VendorListIndex())
+            if time.monotonic() >= self._next_sync.get(business_id, 0):
+                try:
+                    self._sync(business_id, index)
+                except Exception as e:
+                    logger.error(f"Vendor list sync failed for business {business_id}: {e}")
+                self._next_sync[business_id] = time.monotonic() + self.sync_seconds
+        return index
+
+    def _sync(self, business_id: int, index: VendorListIndex):
+        from sqlalchemy import select
+        from database import SessionLocal, VendorListEntry
+
+        started = datetime.now(timezone.utc)
+        since   = self._synced_at.get(business_id)
+        stmt = (select(VendorListEntry.id, VendorListEntry.list_type,
+                       VendorListEntry.vendor_name, VendorListEntry.active)
+                .where(VendorListEntry.business_id == business_id)
+                .execution_options(yield_per=SYNC_BATCH))
+        if since is None:
+            stmt = stmt.where(VendorListEntry.active == True)            # noqa: E712
+        else:
+            stmt = stmt.where(VendorListEntry.updated_at >= since - SYNC_OVERLAP)
+
+        session = (self._session_factory or SessionLocal)()
+        applied = 0
+        try:
+            for rows in session.execute(stmt).partitions():
+                for entry_id, list_type, vendor_name, active in rows:
+                    if active:
+                        index.add(entry_id, list_type, vendor_name)
+                    else:
+                        index.remove(entry_id)
+                applied += len(rows)
+        finally:
+            session.close()
+        self._synced_at[business_id] = started
+        if since is None and applied:
+            logger.info(f"Loaded {applied} vendor list entries for business {business_id}")
+
+    def apply_local(self, business_id: int, entries):
+        """Reflect this worker's own writes at once instead of at the next sync."""
+        index = self._indexes.get(business_id)
+        if index is None:
+            return
+        for e in entries:
+            if e.active:
+                index.add(e.id, e.list_type, e.vendor_name)
+            else:
+                index.remove(e.id)
+
+    def stats(self) -> dict:
+        return {"businesses": len(self._indexes),
+                "entries":    sum(len(i) for i in self._indexes.values())}
+
+
+_vendor_lists: Optional[VendorLists] = None
+
+
+def get_vendor_lists() -> VendorLists:
+    global _vendor_lists
+    if _vendor_lists is None:
+        _vendor_lists = VendorLists()
+    return _vendor_lists
+
+
+def apply_vendor_lists(txs: list[dict], business_id: int, columns: Optional[dict] = None) -> list:
+    """
+    Set each row's vendor_risk_score from the business's lists (before the
+    fraud engine runs) and return the per-row match, or None. `columns`,
+    when given, gets the same vendor_risk_score values.
+    """
+    index = get_vendor_lists().index_for(business_id)
+    if not len(index):
+        return [None] * len(txs)
+
+    by_vendor, matches = {}, []
+    for tx in txs:
+        vendor = tx.get("vendor_name", "")
+        if vendor not in by_vendor:
+            by_vendor[vendor] = index.match(vendor)
+        m = by_vendor[vendor]
+        if m is not None:
+            if m["list"] == "allowlist":
+                tx["vendor_risk_score"] = ALLOWLIST_RISK
+            else:
+                risk = BLACKLIST_RISK if m["match"] == "exact" else VENDOR_FUZZY_RISK
+                tx["vendor_risk_score"] = max(float(tx.get("vendor_risk_score", 0) or 0), risk)
+        matches.append(m)
+
+    if columns is not None and any(matches):
+        import numpy as np
+        scores = [tx["vendor_risk_score"] for tx in txs]
+        col = columns.get("vendor_risk_score")
+        columns["vendor_risk_score"] = np.asarray(scores, dtype=float) if isinstance(col, np.ndarray) else scores
+    return matches
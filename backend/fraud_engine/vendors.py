@@ -0,0 +1,79 @@
+"""
+FraudSense — Vendor Name Canonicalization
+Maps free-text vendor names to a canonical vendor ID so spelling variants
+of one vendor meet in the same place:
+
+    "John's Electronics", "JOHNS ELECTRONICS ", "Johns Electronics LLC"
+        → "johns electronics"
+
+Stages: Unicode folding to ASCII, lower case, apostrophes dropped, "&" →
+"and", punctuation → spaces, spelled-out initials joined ("A.B.C." → "abc"),
+a leading "the" and trailing legal-form words (LLC, Inc, Ltd, GmbH, ...)
+dropped.
+
+The canonical key doubles as the vendor ID: every worker derives the same
+ID without a shared table, and evicting a vendor from the graph leaves no
+index entry behind. Raw name → ID results are memoized in a bounded LRU
+(VENDOR_CANON_CACHE_SIZE) since uploads repeat the same names constantly.
+Used by the vendor graph (network layer) and the blacklist / allowlist.
+"""
+
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+VENDOR_CANON_CACHE_SIZE = int(os.getenv("VENDOR_CANON_CACHE_SIZE", "100000"))
+UNKNOWN_VENDOR          = "unknown"
+
+LEGAL_SUFFIXES = {
+    "llc", "llp", "lp", "inc", "incorporated", "ltd", "limited", "co", "corp",
+    "corporation", "company", "plc", "gmbh", "ag", "sa", "sas", "srl", "bv",
+    "nv", "pty", "pvt", "pte", "private", "oy", "ab", "kk",
+}
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_ALNUM   = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_vendor_name(name) -> str:
+    """"  Jöhn’s Electronics & Co. " → "johns electronics and co"."""
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode()
+    text = _APOSTROPHES.sub("", text.lower()).replace("&", " and ")
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _join_initials(tokens: list[str]) -> list[str]:
+    """["a", "b", "c", "supply"] → ["abc", "supply"]."""
+    out, run = [], []
+    for token in tokens + [""]:
+        if len(token) == 1 and token.isalpha():
+            run.append(token)
+            continue
+        if run:
+            out.extend(["".join(run)] if len(run) > 1 else run)
+            run = []
+        if token:
+            out.append(token)
+    return out
+
+
+@lru_cache(maxsize=VENDOR_CANON_CACHE_SIZE)
+def canonical_vendor_id(name) -> str:
+    """Canonical vendor ID for a raw vendor name ("" / punctuation only → "unknown")."""
+    tokens = _join_initials(normalize_vendor_name(name).split())
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    stripped = False
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+        stripped = True
+    if stripped and len(tokens) > 1 and tokens[-1] == "and":     # "Smith & Co"
+        tokens.pop()
+    return " ".join(tokens) or UNKNOWN_VENDOR
+
+
+def cache_stats() -> dict:
+    info = canonical_vendor_id.cache_info()
+    return {"hits": info.hits, "misses": info.misses,
+            "size": info.currsize, "max_size": info.maxsize}
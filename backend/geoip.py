@@ -0,0 +1,297 @@
+"""
+FraudSense — Offline Geo-IP
+Derives ip_country from an IP address with a local IPv4 range table — no
+network calls. The table is loaded from a standard CSV range file:
+
+    start_ip,end_ip,country[,...]       1.0.0.0,1.0.0.255,AU        (DB-IP style)
+    start_int,end_int,country[,...]     16777216,16777471,AU         (IP2Location style)
+    network,country[,...]               1.0.0.0/24,AU
+
+(an optional header row and IPv6 rows are skipped) and kept as three sorted
+numpy arrays — range start, range end (uint32) and country (2 bytes). The
+first load writes them as .npy files to GEOIP_CACHE_DIR; later loads
+memory-map those, so workers start instantly and share the pages. The cache
+is rebuilt when the CSV's size or mtime changes.
+
+A lookup is a binary search over the range starts: lookup() for one IP,
+lookup_many() with np.searchsorted for a whole upload.
+
+At ingest (apply_geoip) the row's own IP (ip_address / ip column) — or,
+with GEOIP_REQUEST_IP=1, the uploading client's address — fills in a
+missing ip_country; GEOIP_MODE=override also replaces one the client sent.
+"""
+
+import os
+import json
+import socket
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger("fraudsense.geoip")
+
+GEOIP_CSV_PATH   = os.getenv("GEOIP_CSV_PATH", "")
+GEOIP_CACHE_DIR  = os.getenv("GEOIP_CACHE_DIR", "")
+GEOIP_MODE       = os.getenv("GEOIP_MODE", "fill")          # fill | override
+GEOIP_REQUEST_IP = os.getenv("GEOIP_REQUEST_IP", "0") == "1"
+
+UNKNOWN_COUNTRIES = {"", "-", "ZZ", "XX"}
+CACHE_FILES       = ("starts", "ends", "countries")
+
+# Batches at least this long are looked up in sorted order: searchsorted
+# over increasing keys walks the table in order instead of missing cache
+SORTED_LOOKUP_MIN = 4096
+
+
+# ── Address parsing ────────────────────────────────────────────────────────────
+
+def ip_to_int(ip) -> Optional[int]:
+    """Dotted IPv4 → int, or None when it is not a valid IPv4 address."""
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, str(ip).strip()), "big")
+    except (OSError, ValueError):
+        return None
+
+
+def ips_to_ints(ips, chunk: int = 4096) -> tuple[np.ndarray, np.ndarray]:
+    """IP strings → (uint32 addresses, valid mask); invalid / missing entries are 0, False."""
+    ips    = list(ips)
+    addrs  = np.zeros(len(ips), dtype=np.uint32)
+    valid  = np.ones(len(ips), dtype=bool)
+    pton, family = socket.inet_pton, socket.AF_INET
+    # Whole chunks through inet_pton at C speed; one bad entry (None, IPv6,
+    # a header cell) sends only its chunk down the per-item path
+    for lo in range(0, len(ips), chunk):
+        part = ips[lo:lo + chunk]
+        try:
+            packed = b"".join([pton(family, ip) for ip in part])
+            addrs[lo:lo + len(part)] = np.frombuffer(packed, dtype=">u4")
+        except (OSError, TypeError, ValueError):
+            for i, ip in enumerate(part, lo):
+                value = ip_to_int(ip) if ip else None
+                if value is None:
+                    valid[i] = False
+                else:
+                    addrs[i] = value
+    return addrs, valid
+
+
+# ── Range table ────────────────────────────────────────────────────────────────
+
+def _parse_addresses(col) -> np.ndarray:
+    """A CSV column of dotted IPv4 or integer addresses → int64 (−1 when unparseable)."""
+    text = col.astype(str).str.strip()
+    addrs, valid = ips_to_ints(text.tolist())
+    out = np.where(valid, addrs.astype(np.int64), -1)
+    digits = ~valid & text.str.isdigit().to_numpy()
+    if digits.any():
+        out[digits] = text[digits].astype(np.int64).to_numpy()
+    out[out > 0xFFFFFFFF] = -1
+    return out
+
+
+def _parse_networks(col) -> tuple[np.ndarray, np.ndarray]:
+    """A CSV column of IPv4 CIDR networks → int64 (start, end), −1 when unparseable."""
+    import ipaddress
+
+    starts = np.full(len(col), -1, dtype=np.int64)
+    ends   = np.full(len(col), -1, dtype=np.int64)
+    for i, network in enumerate(col.astype(str)):
+        try:
+            net = ipaddress.ip_network(network.strip(), strict=False)
+        except ValueError:
+            continue
+        if net.version == 4:
+            starts[i], ends[i] = int(net.network_address), int(net.broadcast_address)
+    return starts, ends
+
+
+@lru_cache(maxsize=1)
+def _code_names() -> np.ndarray:
+    """uint16 view of an S2 country code → its str ("" for the zero code)."""
+    names = np.empty(1 << 16, dtype=object)
+    names[:] = [code.rstrip(b"\0").decode("latin-1")
+                for code in np.arange(1 << 16, dtype=np.uint16).view("S2").tolist()]
+    return names
+
+
+class GeoIPTable:
+    """Sorted, non-overlapping IPv4 ranges → ISO country code."""
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, countries: np.ndarray,
+                 source: str = ""):
+        self.starts    = starts
+        self.ends      = ends
+        self.countries = countries
+        self.source    = source
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "GeoIPTable":
+        import pandas as pd
+
+        frame = pd.read_csv(path, header=None, dtype=str, keep_default_na=False,
+                            comment="#", skipinitialspace=True)
+        if frame.shape[1] < 2:
+            raise ValueError(f"{path}: expected start,end,country or network,country columns")
+        if frame[0].head(10).str.contains("/", regex=False).any():
+            starts, ends = _parse_networks(frame[0])
+            country = frame[1]
+        else:
+            starts, ends = _parse_addresses(frame[0]), _parse_addresses(frame[1])
+            country = frame[2] if frame.shape[1] > 2 else None
+        if country is None:
+            raise ValueError(f"{path}: no country column")
+
+        country = country.str.strip().str.upper()
+        keep = ((starts >= 0) & (ends >= starts) & (country.str.len() == 2).to_numpy()
+                & ~country.isin(UNKNOWN_COUNTRIES).to_numpy())
+        order = np.argsort(starts[keep], kind="stable")
+        table = cls(starts[keep][order].astype(np.uint32),
+                    ends[keep][order].astype(np.uint32),
+                    country[keep].to_numpy()[order].astype("S2"),
+                    source=path)
+        if not len(table):
+            raise ValueError(f"{path}: no IPv4 ranges found")
+        # Overlapping ranges: searchsorted finds the last start <= ip, so a
+        # range swallowed by its predecessor would never be reached
+        overlaps = int(np.count_nonzero(table.starts[1:] <= table.ends[:-1]))
+        if overlaps:
+            logger.warning(f"GeoIP table {path}: {overlaps} overlapping ranges")
+        return table
+
+    @classmethod
+    def load(cls, path: str, cache_dir: str = "") -> "GeoIPTable":
+        """
+        Load `path`, memory-mapping the .npy cache in `cache_dir` (default
+        "<path>.idx") when it matches the CSV and rebuilding it otherwise.
+        """
+        cache_dir = cache_dir or f"{path}.idx"
+        st        = os.stat(path)
+        stamp     = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        meta_path = os.path.join(cache_dir, "meta.json")
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if {k: meta.get(k) for k in stamp} == stamp:
+                arrays = [np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode="r")
+                          for name in CACHE_FILES]
+                return cls(*arrays, source=path)
+        except (OSError, ValueError):
+            pass
+
+        table = cls.from_csv(path)
+        try:
+            table._write_cache(cache_dir, {**stamp, "ranges": len(table)})
+        except OSError as e:
+            logger.warning(f"GeoIP cache not written to {cache_dir}: {e}")
+        return table
+
+    def _write_cache(self, cache_dir: str, meta: dict):
+        os.makedirs(cache_dir, exist_ok=True)
+        pid = os.getpid()
+        for name in CACHE_FILES:
+            tmp = os.path.join(cache_dir, f".{name}.{pid}.npy")
+            np.save(tmp, getattr(self, name))
+            os.replace(tmp, os.path.join(cache_dir, f"{name}.npy"))
+        tmp = os.path.join(cache_dir, f".meta.{pid}.json")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(cache_dir, "meta.json"))
+
+    def lookup(self, ip) -> str:
+        """Country code for one IP ("" when unknown or not IPv4)."""
+        addr = ip if isinstance(ip, (int, np.integer)) else ip_to_int(ip)
+        if addr is None:
+            return ""
+        # np.uint32 key: a Python int would make searchsorted cast the table
+        i = int(self.starts.searchsorted(np.uint32(addr), side="right")) - 1
+        if i < 0 or addr > self.ends[i]:
+            return ""
+        return self.countries[i].decode()
+
+    def lookup_many(self, ips) -> np.ndarray:
+        """Country codes (object array of str, "" when unknown) for IP strings or uint32 addresses."""
+        if isinstance(ips, np.ndarray) and ips.dtype.kind in "iu":
+            addrs, valid = ips.astype(np.uint32, copy=False), np.ones(len(ips), dtype=bool)
+        else:
+            addrs, valid = ips_to_ints(ips)
+        if len(addrs) >= SORTED_LOOKUP_MIN:
+            order = np.argsort(addrs, kind="stable")
+            idx   = np.empty(len(addrs), dtype=np.int64)
+            idx[order] = np.searchsorted(self.starts, addrs[order], side="right")
+        else:
+            idx = np.searchsorted(self.starts, addrs, side="right")
+        idx  -= 1
+        safe  = np.maximum(idx, 0)
+        found = valid & (idx >= 0) & (addrs <= self.ends[safe])
+        # 2-byte codes read as uint16 index a table of every code's string
+        codes = np.where(found, self.countries.view(np.uint16)[safe], 0)
+        return _code_names()[codes]
+
+    def stats(self) -> dict:
+        return {"ranges": len(self), "source": self.source,
+                "mapped": isinstance(self.starts, np.memmap)}
+
+
+# ── Singleton / ingest ─────────────────────────────────────────────────────────
+
+_table: Optional[GeoIPTable] = None
+_loaded = False
+_lock   = threading.Lock()
+
+
+def get_geoip() -> Optional[GeoIPTable]:
+    """The GEOIP_CSV_PATH table, or None when unset or unreadable (logged once)."""
+    global _table, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                if GEOIP_CSV_PATH:
+                    try:
+                        _table = GeoIPTable.load(GEOIP_CSV_PATH, GEOIP_CACHE_DIR)
+                        logger.info(f"GeoIP table loaded: {len(_table)} ranges from {GEOIP_CSV_PATH}")
+                    except Exception as e:
+                        logger.error(f"GeoIP table not loaded from {GEOIP_CSV_PATH}: {e}")
+                _loaded = True
+    return _table
+
+
+def geoip_stats() -> Optional[dict]:
+    table = get_geoip()
+    return table.stats() if table is not None else None
+
+
+def apply_geoip(txs: list[dict], ips: Optional[list] = None,
+                request_ip: Optional[str] = None, columns: Optional[dict] = None) -> int:
+    """
+    Set ip_country on rows from their IP (`ips`, aligned with `txs`), falling
+    back to `request_ip` when GEOIP_REQUEST_IP is on. Only rows without an
+    ip_country change unless GEOIP_MODE is "override". `columns`, when given,
+    gets the same ip_country values. Returns the number of rows derived.
+    """
+    table = get_geoip()
+    if table is None or not txs:
+        return 0
+    fallback = request_ip if GEOIP_REQUEST_IP else None
+    ips = [ip or fallback for ip in (ips or [None] * len(txs))]
+    override = GEOIP_MODE == "override"
+    todo = [i for i, (tx, ip) in enumerate(zip(txs, ips))
+            if ip and (override or not tx["ip_country"])]
+    if not todo:
+        return 0
+
+    countries = table.lookup_many([ips[i] for i in todo])
+    derived = 0
+    for i, country in zip(todo, countries.tolist()):
+        if country:
+            txs[i]["ip_country"] = country
+            derived += 1
+    if derived and columns is not None:
+        columns["ip_country"] = [tx["ip_country"] for tx in txs]
+    return derived
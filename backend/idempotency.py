@@ -0,0 +1,121 @@
+"""
+FraudSense — Idempotency-Key Handling for Uploads
+A client that sends `Idempotency-Key: <key>` with an upload gets the stored
+response back on every retry with that key, instead of a second ingest.
+
+    begin()    claims the key (committed at once, so concurrent retries see
+               it) or returns the stored response to replay
+    complete() stores the response in the caller's transaction, so it
+               commits atomically with the rows it describes
+    abandon()  releases the claim after a failed request so it can be retried
+
+A claim whose worker died before complete() or abandon() (OOM, SIGKILL,
+deploy) is taken over by a retry once it is IDEMPOTENCY_LEASE_SECONDS old.
+Keys expire after IDEMPOTENCY_TTL_HOURS.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import IdempotencyKey
+
+IDEMPOTENCY_TTL_HOURS     = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "300"))
+MAX_KEY_LENGTH            = 255
+
+
+class IdempotencyConflict(Exception):
+    """Key in flight, or reused for a different request. Carries the HTTP status."""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _expired(row: IdempotencyKey) -> bool:
+    return _utc(row.created_at) < datetime.now(timezone.utc) - timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+
+
+def _reclaim(session: Session, row: IdempotencyKey) -> bool:
+    """
+    Take over an in-flight claim older than the lease. Compare-and-set on
+    claimed_at, so of several retries racing for it exactly one wins.
+    """
+    claimed = row.claimed_at or row.created_at
+    now     = datetime.now(timezone.utc)
+    if _utc(claimed) >= now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS):
+        return False
+    won = session.query(IdempotencyKey).filter(
+        IdempotencyKey.business_id == row.business_id,
+        IdempotencyKey.key         == row.key,
+        IdempotencyKey.status_code.is_(None),
+        (IdempotencyKey.claimed_at == row.claimed_at) if row.claimed_at is not None
+        else IdempotencyKey.claimed_at.is_(None),
+    ).update({IdempotencyKey.claimed_at: now}, synchronize_session=False)
+    session.commit()
+    return won == 1
+
+
+def begin(session: Session, business_id: int, key: str,
+          request_hash: str) -> Optional[tuple[int, str]]:
+    """
+    Claim `key` for this request. Returns (status_code, body) when a finished
+    response should be replayed, None when the caller should proceed.
+    Raises IdempotencyConflict otherwise.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyConflict(f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters", 400)
+
+    row = session.get(IdempotencyKey, (business_id, key))
+    if row is not None and _expired(row):
+        session.delete(row)
+        session.commit()
+        row = None
+
+    if row is None:
+        session.add(IdempotencyKey(business_id=business_id, key=key, request_hash=request_hash))
+        try:
+            session.commit()
+            return None
+        except IntegrityError:
+            session.rollback()
+            row = session.get(IdempotencyKey, (business_id, key))
+            if row is None:
+                raise IdempotencyConflict("Idempotency-Key is being released; retry", 409)
+
+    if row.request_hash != request_hash:
+        raise IdempotencyConflict("Idempotency-Key was already used for a different upload", 422)
+    if row.status_code is None:
+        if _reclaim(session, row):
+            return None
+        raise IdempotencyConflict("A request with this Idempotency-Key is still in progress", 409)
+    return row.status_code, row.response
+
+
+def complete(session: Session, business_id: int, key: str, status_code: int, body: str):
+    """Record the response for replay. Caller commits."""
+    session.query(IdempotencyKey).filter(
+        IdempotencyKey.business_id == business_id,
+        IdempotencyKey.key         == key,
+    ).update({
+        IdempotencyKey.status_code: status_code,
+        IdempotencyKey.response:    body,
+    }, synchronize_session=False)
+
+
+def abandon(session: Session, business_id: int, key: str):
+    """Drop an unfinished claim so the client can retry the request."""
+    session.query(IdempotencyKey).filter(
+        IdempotencyKey.business_id == business_id,
+        IdempotencyKey.key         == key,
+        IdempotencyKey.status_code.is_(None),
+    ).delete(synchronize_session=False)
+    session.commit()
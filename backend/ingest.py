@@ -0,0 +1,246 @@
+"""
+FraudSense — Upload Parsing
+Turns an uploaded batch into coerced transaction fields. CSV / JSON rows go
+through coerce_row() one dict at a time; Parquet and Arrow IPC uploads are
+read and coerced column by column (read_columnar), and those columns feed
+model.build_feature_matrix() directly. Only the parse and the ML feature
+matrix are columnar: rules, the vendor graph, dedup hashing and the ORM
+inserts still take one dict per row, built by columns_to_rows().
+
+Both paths apply the same rules: missing or empty numeric fields take their
+default, missing text fields become "". A missing vendor name or timestamp
+stays "" until fill_defaults() — after hashing, so generated values
+(vendor_<row>, the current time) never reach a dedup key.
+
+content_hashes() gives every row its per-business dedup key: the client's own
+transaction id when the upload carries one, otherwise a hash of the coerced
+fields (so the same row hashes the same whether it came as CSV or Parquet).
+Identical rows without an id are told apart by their occurrence in the
+upload, so both are ingested and a retry of the file still matches them.
+"""
+
+import io
+import json
+import hashlib
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# field → default for `x or default` numeric coercion
+NUMERIC_FIELDS = {
+    "amount":              0.0,
+    "previous_balance":    0.0,
+    "new_balance":         0.0,
+    "time_since_last_txn": 3600.0,
+    "num_txns_last_1h":    0,
+    "num_txns_last_24h":   0,
+    "vendor_risk_score":   0.0,
+    "is_new_vendor":       0,
+}
+INT_FIELDS  = {"num_txns_last_1h", "num_txns_last_24h", "is_new_vendor"}
+TEXT_FIELDS = ["vendor_name", "category", "payment_method", "timestamp",
+               "ip_country", "vendor_country"]
+TX_FIELDS   = TEXT_FIELDS + list(NUMERIC_FIELDS)
+CLIENT_ID_FIELDS = ("transaction_id", "txn_id", "external_id")
+IP_FIELDS        = ("ip_address", "ip")
+
+PARQUET_MAGIC = b"PAR1"
+ARROW_MAGIC   = b"ARROW1"
+COLUMNAR_CONTENT_TYPES = {
+    "application/vnd.apache.parquet", "application/x-parquet",
+    "application/vnd.apache.arrow.file", "application/vnd.apache.arrow.stream",
+}
+
+
+def coerce_row(row: dict) -> dict:
+    """Coerce one CSV / JSON row into a transaction dict."""
+    return {
+        "amount":           float(row.get("amount", 0) or 0),
+        "vendor_name":      str(row.get("vendor_name", row.get("name", "")) or ""),
+        "category":         str(row.get("category", "") or ""),
+        "payment_method":   str(row.get("payment_method", "") or ""),
+        "timestamp":        str(row.get("timestamp", row.get("date", "")) or ""),
+        "previous_balance": float(row.get("previous_balance", 0) or 0),
+        "new_balance":      float(row.get("new_balance", 0) or 0),
+        "ip_country":       str(row.get("ip_country", "") or ""),
+        "vendor_country":   str(row.get("vendor_country", "") or ""),
+        "time_since_last_txn": float(row.get("time_since_last_txn", 3600) or 3600),
+        "num_txns_last_1h":    int(float(row.get("num_txns_last_1h", 0) or 0)),
+        "num_txns_last_24h":   int(float(row.get("num_txns_last_24h", 0) or 0)),
+        "vendor_risk_score":   float(row.get("vendor_risk_score", 0) or 0),
+        "is_new_vendor":       int(float(row.get("is_new_vendor", 0) or 0)),
+    }
+
+
+def client_id(row: dict) -> Optional[str]:
+    """The client's own transaction id for a CSV / JSON row, if it sent one."""
+    for field in CLIENT_ID_FIELDS:
+        value = row.get(field)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def row_ip(row: dict) -> Optional[str]:
+    """The IP address a CSV / JSON row carries (for geoip.apply_geoip), if any."""
+    for field in IP_FIELDS:
+        value = row.get(field)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def content_hash(tx: dict, client_txn_id: Optional[str] = None, occurrence: int = 0) -> str:
+    if client_txn_id:
+        payload = "id:" + client_txn_id
+    else:
+        payload = json.dumps([tx[f] for f in TX_FIELDS], default=str)
+        if occurrence:
+            payload += f"#{occurrence}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def content_hashes(txs: list[dict], ids: list[Optional[str]],
+                   seen: Optional[Counter] = None) -> list[str]:
+    """
+    Dedup keys for one upload (before fill_defaults). The n-th repeat of an
+    id-less row hashes with its occurrence number: two identical payments in
+    one file are both kept, and re-sending the file maps each to itself.
+    `seen` (base hash → occurrences so far) carries the count across the
+    chunks of one upload and is updated in place.
+    """
+    seen   = Counter() if seen is None else seen
+    hashes = []
+    for tx, cid in zip(txs, ids):
+        if cid:
+            hashes.append(content_hash(tx, cid))
+            continue
+        h = content_hash(tx)
+        n = seen[h]
+        seen[h] += 1
+        hashes.append(content_hash(tx, occurrence=n) if n else h)
+    return hashes
+
+
+def fill_defaults(txs: list[dict], row_offset: int = 0, columns: Optional[dict] = None):
+    """Give rows without a vendor name / timestamp vendor_<row> / the current time."""
+    now = None
+    for i, tx in enumerate(txs):
+        if not tx["vendor_name"]:
+            tx["vendor_name"] = f"vendor_{row_offset + i}"
+        if not tx["timestamp"]:
+            now = now or datetime.now(timezone.utc).isoformat()
+            tx["timestamp"] = now
+    if columns is not None:
+        for f in ("vendor_name", "timestamp"):
+            columns[f] = [tx[f] for tx in txs]
+
+
+def batch_hash(hashes: list[str]) -> str:
+    """Fingerprint of a whole upload, for Idempotency-Key reuse checks."""
+    return hashlib.sha256("".join(hashes).encode()).hexdigest()
+
+
+def is_columnar(data: bytes, filename: str = "", content_type: str = "") -> bool:
+    """Parquet / Arrow upload? Decided by magic bytes, extension or content type."""
+    name = (filename or "").lower()
+    return (data[:4] == PARQUET_MAGIC or data[:6] == ARROW_MAGIC
+            or name.endswith((".parquet", ".arrow", ".arrows", ".feather", ".ipc"))
+            or (content_type or "").split(";")[0].strip() in COLUMNAR_CONTENT_TYPES)
+
+
+def _read_table(data: bytes):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    if data[:4] == PARQUET_MAGIC:
+        return pq.read_table(io.BytesIO(data))
+    if data[:6] == ARROW_MAGIC:
+        return ipc.open_file(pa.BufferReader(data)).read_all()
+    return ipc.open_stream(pa.BufferReader(data)).read_all()
+
+
+def _text_column(table, name: str, n: int, fallback: Optional[list] = None) -> list:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if name not in table.column_names:
+        return fallback if fallback is not None else [""] * n
+    col = table.column(name)
+    if pa.types.is_timestamp(col.type):
+        return ["" if v is None else v.isoformat() for v in col.to_pylist()]
+    if not (pa.types.is_string(col.type) or pa.types.is_large_string(col.type)):
+        col = pc.cast(col, pa.string())
+    return pc.fill_null(col, "").to_pylist()
+
+
+def _numeric_column(table, name: str, default, n: int) -> np.ndarray:
+    if name not in table.column_names:
+        return np.full(n, default, dtype=float)
+    values = pd.to_numeric(table.column(name).to_pandas(), errors="coerce").to_numpy(dtype=float)
+    values = np.where(np.isnan(values) | (values == 0), default, values)
+    return np.trunc(values) if name in INT_FIELDS else values
+
+
+def read_columnar(data: bytes) -> dict:
+    """
+    Parquet or Arrow IPC (file or stream) bytes → {field: column} for every
+    TX_FIELDS entry, coerced with the same defaults as coerce_row(), plus
+    "client_id" and "ip_address" (None per row when the upload has no such
+    column).
+    """
+    table = _read_table(data)
+    n     = table.num_rows
+
+    vendors    = _text_column(table, "vendor_name" if "vendor_name" in table.column_names else "name", n)
+    timestamps = _text_column(table, "timestamp" if "timestamp" in table.column_names else "date", n)
+
+    cols = {
+        "vendor_name": vendors,
+        "timestamp":   timestamps,
+        **{f: _text_column(table, f, n)
+           for f in ("category", "payment_method", "ip_country", "vendor_country")},
+        **{f: _numeric_column(table, f, default, n)
+           for f, default in NUMERIC_FIELDS.items()},
+    }
+    id_field = next((f for f in CLIENT_ID_FIELDS if f in table.column_names), None)
+    cols["client_id"] = ([v or None for v in _text_column(table, id_field, n)]
+                         if id_field else [None] * n)
+    ip_field = next((f for f in IP_FIELDS if f in table.column_names), None)
+    cols["ip_address"] = ([v.strip() or None for v in _text_column(table, ip_field, n)]
+                          if ip_field else [None] * n)
+    return cols
+
+
+def columns_to_rows(cols: dict) -> list[dict]:
+    """
+    Per-row transaction dicts (for rules, network and persistence) from columns.
+
+    A Parquet / Arrow upload still pays for one dict per row here: the rule
+    layer, VendorGraph.add_transaction(), content_hashes() and the
+    Transaction rows are all per-row. What the columnar path saves is the
+    CSV text parse and per-field coercion, plus the feature matrix built
+    straight from the columns instead of from these dicts.
+    """
+    lists = {
+        f: (col.astype(int).tolist() if f in INT_FIELDS else col.tolist())
+        if isinstance(col, np.ndarray) else col
+        for f, col in cols.items() if f in TX_FIELDS
+    }
+    return [dict(zip(lists, values)) for values in zip(*lists.values())]
+
+
+def select_rows(cols: dict, keep: list[int]) -> dict:
+    """The given row positions of a column dict."""
+    idx = np.asarray(keep, dtype=int)
+    return {f: col[idx] if isinstance(col, np.ndarray) else [col[i] for i in keep]
+            for f, col in cols.items()}
+
+
+def rows_to_columns(txs: list[dict]) -> dict:
+    """Inverse of columns_to_rows, for batch-scoring CSV / JSON uploads."""
+    return {f: [tx[f] for tx in txs] for f in TX_FIELDS}
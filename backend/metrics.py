@@ -0,0 +1,237 @@
+"""
+FraudSense — Metrics
+A small in-process metrics registry rendered in the Prometheus text format
+on GET /metrics. Hot paths call Histogram.observe() / Counter.inc(), each a
+lock-guarded increment; values that already live elsewhere (vendor graph
+size, model version, audit counters) are read by callbacks at scrape time.
+
+    fraudsense_stage_seconds{stage}        rules | ml | ml_batch | shap | network | db_commit
+    fraudsense_rule_hits_total{rule_id}    triggered rules, including NET1
+    fraudsense_verdicts_total{risk_level}
+    fraudsense_http_request_seconds{endpoint,method,status}
+
+METRICS_ENABLED=0 turns every observation into a no-op.
+METRICS_TOKEN is required as a bearer token on /metrics and /health/details;
+with no token configured both answer only loopback clients.
+"""
+
+import os
+import hmac
+import math
+import time
+import threading
+from contextlib import contextmanager
+from bisect import bisect_left
+from typing import Callable, Optional
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_TOKEN   = os.getenv("METRICS_TOKEN", "")
+
+LOOPBACK_ADDRS  = {"127.0.0.1", "::1", "::ffff:127.0.0.1"}
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = METRICS_ENABLED
+
+
+def set_enabled(enabled: bool):
+    """Switch recording on or off at runtime (used by the overhead benchmark)."""
+    global _enabled
+    _enabled = enabled
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = tuple(buckets)
+        # labels → [per-bucket counts (last = +Inf), sum, count]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        if not _enabled:
+            return
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """`with HIST.time("db_commit"): ...` — observes the block's duration."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are read at scrape time: fn() → [(labels dict, value)]."""
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], list]):
+        self.name, self.help, self.kind, self.fn = name, help, kind, fn
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            for labels, value in self.fn():
+                lines.append(f"{self.name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+        except Exception as e:
+            lines.append(f"# {self.name} unavailable: {_escape(e)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+# ── Metrics ────────────────────────────────────────────────────────────────────
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "fraudsense_stage_seconds", "Time spent per fraud engine layer and DB commit", ("stage",)))
+RULE_HITS = REGISTRY.register(Counter(
+    "fraudsense_rule_hits_total", "Triggered fraud rules", ("rule_id",)))
+VERDICTS = REGISTRY.register(Counter(
+    "fraudsense_verdicts_total", "Fraud engine verdicts by risk level", ("risk_level",)))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "fraudsense_http_request_seconds", "Request latency by endpoint",
+    ("endpoint", "method", "status")))
+
+
+def _graph_size() -> list:
+    from fraud_engine.network import get_vendor_graph
+    G = get_vendor_graph().G
+    return [({"kind": "nodes"}, G.number_of_nodes()), ({"kind": "edges"}, G.number_of_edges())]
+
+
+def _graph_memory() -> list:
+    from fraud_engine.network import get_vendor_graph
+    return [({}, get_vendor_graph().estimated_bytes())]
+
+
+def _graph_evictions() -> list:
+    from fraud_engine.network import get_vendor_graph
+    return [({}, get_vendor_graph().evicted_vendors)]
+
+
+def _model_info() -> list:
+    from model import get_model_metadata
+    meta = get_model_metadata()
+    return [({"version": meta.get("trained_at", meta.get("status", "unknown"))}, 1)]
+
+
+def _audit_events() -> list:
+    from audit import get_audit_writer
+    writer = get_audit_writer()
+    return [({"outcome": "written"}, writer.written), ({"outcome": "dropped"}, writer.dropped)]
+
+
+REGISTRY.register(CallbackMetric(
+    "fraudsense_vendor_graph_size", "Vendor graph nodes and edges", "gauge", _graph_size))
+REGISTRY.register(CallbackMetric(
+    "fraudsense_vendor_graph_bytes", "Estimated vendor graph memory", "gauge", _graph_memory))
+REGISTRY.register(CallbackMetric(
+    "fraudsense_vendor_graph_evictions_total", "Vendors evicted under the memory cap",
+    "counter", _graph_evictions))
+REGISTRY.register(CallbackMetric(
+    "fraudsense_model_info", "Loaded fraud model version", "gauge", _model_info))
+REGISTRY.register(CallbackMetric(
+    "fraudsense_audit_events_total", "Audit events written / dropped", "counter", _audit_events))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def record_verdict(risk_level: str, flags: list):
+    """Verdict distribution + rule hit counters for one scored transaction."""
+    if not _enabled:
+        return
+    VERDICTS.inc(risk_level)
+    for flag in flags:
+        if flag.triggered:
+            RULE_HITS.inc(flag.rule_id)
+
+
+def authorized(auth_header: Optional[str], remote_addr: Optional[str] = None) -> bool:
+    """
+    True when the request's bearer token matches METRICS_TOKEN. With no token
+    configured, only loopback clients (a local scraper or sidecar) get in.
+    """
+    if not METRICS_TOKEN:
+        return remote_addr in LOOPBACK_ADDRS
+    return hmac.compare_digest(auth_header or "", f"Bearer {METRICS_TOKEN}")
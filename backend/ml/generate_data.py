@@ -30,11 +30,12 @@ PAY_PROBS = np.array([0.45, 0.30, 0.15, 0.05, 0.05])
 CATEGORIES = ["retail","food","travel","utilities","healthcare",
               "entertainment","crypto","wholesale","services","real_estate"]
 
-def generate_dataset(output_path: str = "ml/fraud_dataset.csv"):
+def generate_dataset(output_path: str = "ml/fraud_dataset.csv",
+                     n: int = N_TRANSACTIONS, seed: int = RANDOM_SEED):
+    """Generate the synthetic dataset; pass output_path=None to skip writing."""
     import time
     t0  = time.time()
-    n   = N_TRANSACTIONS
-    rng = np.random.default_rng(RANDOM_SEED)
+    rng = np.random.default_rng(seed)
     print(f"Generating {n:,} transactions (v3 — sweet spot)...")
 
     # ── 1. Business profiles ──────────────────────────────────────────────────
@@ -158,9 +159,10 @@ def generate_dataset(output_path: str = "ml/fraud_dataset.csv"):
     for feat, c in corr.head(6).items():
         print(f"    {feat:<28} |r|={c:.4f}")
 
-    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
-    df.to_csv(output_path, index=False)
-    print(f"  Saved → {output_path}  ({time.time()-t0:.1f}s)")
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
+        df.to_csv(output_path, index=False)
+        print(f"  Saved → {output_path}  ({time.time()-t0:.1f}s)")
     return df
 
 if __name__ == "__main__":
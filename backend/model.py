@@ -1,12 +1,15 @@
 """
 FraudSense — Model Loader
-Loads the trained fraud pipeline and exposes predict_fraud().
+Loads the trained fraud pipeline and exposes predict_fraud(), plus the
+column-wise build_feature_matrix() / predict_fraud_batch() used to score a
+whole upload with one predict_proba call.
 """
 
 import os
 import json
 import numpy as np
 import joblib
+from datetime import datetime
 from typing import Optional
 
 BASE_DIR = os.path.dirname(__file__)
@@ -130,6 +133,75 @@ def _build_feature_vector(tx: dict) -> list:
     ]
 
 
+def _or_default(values, default: float) -> np.ndarray:
+    """Column form of `float(x or default)`: NaN / None / 0 become default."""
+    arr = np.asarray(values, dtype=float)
+    return np.where(np.isnan(arr) | (arr == 0), default, arr)
+
+
+def _hour_and_weekday(timestamps) -> tuple[np.ndarray, np.ndarray]:
+    hours, days = [], []
+    for raw in timestamps:
+        try:
+            ts = datetime.fromisoformat(str(raw or "").replace("Z", "+00:00"))
+            hours.append(ts.hour)
+            days.append(ts.weekday())
+        except Exception:
+            hours.append(12)
+            days.append(0)
+    return np.array(hours, dtype=float), np.array(days, dtype=float)
+
+
+def build_feature_matrix(cols: dict, business_avg_amount: float = 0.0) -> np.ndarray:
+    """
+    Column-wise _build_feature_vector for a batch: `cols` maps the coerced
+    upload fields (see ingest.TX_FIELDS) to equal-length sequences. Returns an
+    (n, len(FEATURE_COLS)) matrix with the same values, row for row.
+    """
+    amount       = _or_default(cols["amount"], 0.0)
+    prev_balance = _or_default(cols["previous_balance"], 1.0)
+    new_balance  = _or_default(cols["new_balance"], 0.0)
+    balance_drop = np.maximum(0.0, prev_balance - new_balance)
+    balance_drop_ratio = np.round(balance_drop / np.maximum(1.0, prev_balance), 4)
+
+    hour_of_day, day_of_week = _hour_and_weekday(cols["timestamp"])
+
+    ip_country     = np.asarray(cols["ip_country"], dtype=object)
+    vendor_country = np.asarray(cols["vendor_country"], dtype=object)
+    country_mismatch = ((ip_country != "") & (vendor_country != "")
+                        & (ip_country != vendor_country)).astype(float)
+    high_risk_country = np.array([c in HIGH_RISK_COUNTRIES for c in vendor_country], dtype=float)
+
+    is_crypto = np.array(["crypto" in str(c).lower() for c in cols["category"]], dtype=float)
+
+    new_flag = _or_default(cols["is_new_vendor"], 0.0)
+    name_new = np.array(["new" in str(v).lower() for v in cols["vendor_name"]], dtype=float)
+    is_new_vendor = np.where(new_flag != 0, np.trunc(new_flag), name_new)
+
+    payment_enc = np.array([PAYMENT_ENC.get(str(p).lower(), 0) for p in cols["payment_method"]],
+                           dtype=float)
+
+    business_avg  = np.full_like(amount, business_avg_amount) if business_avg_amount > 0 else amount
+    amount_vs_avg = np.round(amount / np.maximum(1.0, business_avg), 4)
+
+    round_amount   = ((amount > 0) & ((amount % 1000 < 1) | (amount % 500 < 1))).astype(float)
+    is_after_hours = ((hour_of_day < 5) | (hour_of_day > 22)).astype(float)
+
+    return np.column_stack([
+        amount, hour_of_day, day_of_week,
+        _or_default(cols["time_since_last_txn"], 3600.0),
+        np.trunc(_or_default(cols["num_txns_last_1h"], 0.0)),
+        np.trunc(_or_default(cols["num_txns_last_24h"], 0.0)),
+        amount_vs_avg,
+        country_mismatch, high_risk_country,
+        is_crypto, is_new_vendor,
+        _or_default(cols["vendor_risk_score"], 0.1),
+        payment_enc,
+        balance_drop_ratio,
+        round_amount, is_after_hours,
+    ])
+
+
 # ─── Public API ───────────────────────────────────────────────────────────────
 def predict_fraud(tx: dict) -> dict:
     """
@@ -165,6 +237,14 @@ def predict_fraud(tx: dict) -> dict:
     }
 
 
+def predict_fraud_batch(features: np.ndarray) -> np.ndarray:
+    """Calibrated fraud probabilities for a feature matrix, in one model call."""
+    if _model_bundle is None or len(features) == 0:
+        return np.zeros(len(features))
+    features_sc = _model_bundle["scaler"].transform(features)
+    return _model_bundle["calibrated"].predict_proba(features_sc)[:, 1]
+
+
 def get_model_metadata() -> dict:
     if not os.path.exists(LOG_PATH):
         return {"status": "no_model"}
@@ -0,0 +1,191 @@
+"""
+FraudSense — Opt-in Request Profiling
+Profiles a sampled fraction of requests and writes one file per profiled
+request into PROFILE_DIR, named with the endpoint, row count and model
+version:
+
+    20261018T101502_transactions.upload_500rows_model-20260220T142918_812ms.prof
+    20261018T101502_transactions.upload_500rows_model-20260220T142918_812ms.collapsed
+
+  .prof       cProfile output — `python -m pstats <file>` or snakeviz
+  .collapsed  sampled wall-clock stacks, one "frame;frame;frame count" line
+              per stack — feed to flamegraph.pl or speedscope
+
+A request is profiled when PROFILE_ENABLED=1 and it falls in the
+PROFILE_SAMPLE_RATE sample, or when it carries
+`X-FraudSense-Profile: <PROFILE_TOKEN>` (only if PROFILE_TOKEN is set).
+With neither configured no hooks are registered at all, so disabled
+profiling costs nothing. One request is profiled at a time; others that
+would have been sampled meanwhile run unprofiled.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import cProfile
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import Flask, g, has_request_context, request
+
+logger = logging.getLogger("fraudsense.profiling")
+
+PROFILE_ENABLED     = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_TOKEN       = os.getenv("PROFILE_TOKEN", "")
+PROFILE_DIR         = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_FORMAT      = os.getenv("PROFILE_FORMAT", "both")          # pstats | collapsed | both
+PROFILE_ENDPOINTS   = {e for e in os.getenv("PROFILE_ENDPOINTS", "").split(",") if e}
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_MAX_FILES   = int(os.getenv("PROFILE_MAX_FILES", "500"))
+PROFILE_HEADER      = "X-FraudSense-Profile"
+
+_busy = threading.Lock()          # cProfile allows one active profiler per process
+
+
+class StackSampler:
+    """Samples one thread's Python stack every `interval` seconds from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval  = interval
+        self.stacks: Counter = Counter()
+        self._stop     = threading.Event()
+        self._thread   = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def tag(**tags):
+    """Attach tags (e.g. rows=500) to the current request's profile, if it has one."""
+    if has_request_context() and "profile" in g:
+        g.profile["tags"].update(tags)
+
+
+def _wanted() -> bool:
+    if PROFILE_TOKEN and request.headers.get(PROFILE_HEADER) == PROFILE_TOKEN:
+        return True
+    if not PROFILE_ENABLED:
+        return False
+    if PROFILE_ENDPOINTS and request.endpoint not in PROFILE_ENDPOINTS:
+        return False
+    return random.random() < PROFILE_SAMPLE_RATE
+
+
+def _model_version() -> str:
+    try:
+        from model import get_model_metadata
+        version = get_model_metadata().get("trained_at", "none")
+    except Exception:
+        version = "unknown"
+    return "model-" + re.sub(r"[^0-9A-Za-z]", "", version.split(".")[0])
+
+
+def _start():
+    if not _wanted() or not _busy.acquire(blocking=False):
+        return
+    profile = {"tags": {}, "started": time.perf_counter(), "profiler": None, "sampler": None}
+    if PROFILE_FORMAT in ("pstats", "both"):
+        profile["profiler"] = cProfile.Profile()
+    if PROFILE_FORMAT in ("collapsed", "both"):
+        profile["sampler"] = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+        profile["sampler"].start()
+    if profile["profiler"]:
+        profile["profiler"].enable()
+    g.profile = profile
+
+
+def _finish(response):
+    profile = g.pop("profile", None)
+    if profile is None:
+        return response
+    try:
+        if profile["profiler"]:
+            profile["profiler"].disable()
+        if profile["sampler"]:
+            profile["sampler"].stop()
+        elapsed_ms = (time.perf_counter() - profile["started"]) * 1000
+        stem = _write(profile, elapsed_ms)
+        response.headers["X-Profile-Id"] = stem
+    except Exception as e:
+        logger.error(f"Profile write failed: {e}")
+    finally:
+        _busy.release()
+    return response
+
+
+def _abandon(exc):
+    """Teardown: release a profile whose response never reached _finish."""
+    profile = g.pop("profile", None)
+    if profile is None:
+        return
+    if profile["profiler"]:
+        profile["profiler"].disable()
+    if profile["sampler"]:
+        profile["sampler"].stop()
+    _busy.release()
+
+
+def _write(profile: dict, elapsed_ms: float) -> str:
+    rows = profile["tags"].get("rows")
+    parts = [
+        datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S"),
+        request.endpoint or "unmatched",
+        f"{rows}rows" if rows is not None else None,
+        _model_version(),
+        f"{elapsed_ms:.0f}ms",
+    ]
+    stem = "_".join(p for p in parts if p)
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, stem)
+
+    if profile["profiler"]:
+        profile["profiler"].dump_stats(base + ".prof")
+    if profile["sampler"]:
+        with open(base + ".collapsed", "w") as f:
+            f.write(profile["sampler"].collapsed())
+    _prune()
+    logger.info(f"Profiled {request.method} {request.path} → {base}")
+    return stem
+
+
+def _prune():
+    """Keep at most PROFILE_MAX_FILES profile files, oldest deleted first."""
+    files = sorted((os.path.join(PROFILE_DIR, f) for f in os.listdir(PROFILE_DIR)),
+                   key=os.path.getmtime)
+    for path in files[:max(0, len(files) - PROFILE_MAX_FILES)]:
+        os.remove(path)
+
+
+def init_profiling(app: Flask):
+    """Register the profiling hooks — only if profiling can ever trigger."""
+    if not (PROFILE_ENABLED or PROFILE_TOKEN):
+        return
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.teardown_request(_abandon)
+    logger.info(f"Request profiling on: sample={PROFILE_SAMPLE_RATE if PROFILE_ENABLED else 0} "
+                f"header={'yes' if PROFILE_TOKEN else 'no'} → {PROFILE_DIR}")
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from database import SessionLocal, Business
 from firebase_middleware import verify_firebase_token
+from tenancy import invalidate_tenant
 
 logger = logging.getLogger("fraudsense.business")
 
@@ -99,6 +100,7 @@ def edit_business():
             biz.category = data["category"]
 
         session.commit()
+        invalidate_tenant(decoded["uid"])
         return jsonify({"data": _biz_to_dict(biz), "error": None}), 200
 
     except Exception as e:
@@ -126,8 +128,10 @@ def link_firebase():
         if not biz:
             return jsonify({"error": "No business found with that email"}), 404
 
+        previous_uid     = biz.firebase_uid
         biz.firebase_uid = decoded["uid"]
         session.commit()
+        invalidate_tenant(previous_uid, decoded["uid"])
 
         return jsonify({
             "data":  {"business_id": biz.id, "firebase_uid": biz.firebase_uid},
@@ -0,0 +1,108 @@
+"""
+FraudSense — Transaction Export Encoders
+Turn a stream of row chunks (from a yield_per server-side cursor) into CSV
+or Parquet bytes chunk by chunk, so an export of any size holds only one
+chunk in memory. Parquet needs pyarrow, which is imported lazily.
+"""
+
+import io
+import csv
+from typing import Iterable, Iterator
+
+from sqlalchemy import Text, cast
+
+from database import Transaction
+from routes.pagination import iso_utc
+
+EXPORT_COLUMNS = (
+    Transaction.id, Transaction.event_time, Transaction.timestamp,
+    Transaction.amount, Transaction.vendor_name, Transaction.category,
+    Transaction.payment_method, Transaction.suspicious_flag,
+    Transaction.risk_level, Transaction.confidence_score,
+    Transaction.final_score, Transaction.expected_loss,
+    Transaction.review_status, Transaction.reviewed_by,
+    cast(Transaction.fraud_reasons, Text).label("fraud_reasons"),
+)
+EXPORT_FIELDS = [c.key for c in EXPORT_COLUMNS]
+
+EXPORT_FORMATS = {
+    "csv":     ("text/csv",                       "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def csv_chunks(chunks: Iterable[list]) -> Iterator[bytes]:
+    buf    = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in chunks:
+        for r in rows:
+            writer.writerow([
+                iso_utc(v) if f == "event_time" else v
+                for f, v in zip(EXPORT_FIELDS, r)
+            ])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+class _DrainSink(io.RawIOBase):
+    """Write-only file object whose bytes are collected and handed out per chunk."""
+
+    def __init__(self):
+        self._parts, self._pos = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def parquet_chunks(chunks: Iterable[list]) -> Iterator[bytes]:
+    """One Parquet row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id",               pa.int64()),
+        ("event_time",       pa.timestamp("us", tz="UTC")),
+        ("timestamp",        pa.string()),
+        ("amount",           pa.float64()),
+        ("vendor_name",      pa.string()),
+        ("category",         pa.string()),
+        ("payment_method",   pa.string()),
+        ("suspicious_flag",  pa.bool_()),
+        ("risk_level",       pa.string()),
+        ("confidence_score", pa.float64()),
+        ("final_score",      pa.float64()),
+        ("expected_loss",    pa.float64()),
+        ("review_status",    pa.string()),
+        ("reviewed_by",      pa.string()),
+        ("fraud_reasons",    pa.string()),   # JSON text
+    ])
+
+    sink   = _DrainSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows)) if rows else [[] for _ in EXPORT_FIELDS]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
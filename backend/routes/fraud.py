@@ -1,18 +1,26 @@
 """
 FraudSense — Fraud/Admin Blueprint
-Alerts feed, aggregated stats, blacklist management,
+Alerts feed, aggregated stats, vendor blacklist / allowlist management,
 network graph export, and model health endpoint.
 """
 
+import os
 import logging
+from datetime import datetime, timedelta, timezone
 from flask import Blueprint, request, jsonify
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 
-from database import SessionLocal, Transaction, Business
+from database import SessionLocal, Transaction, VendorListEntry
 from firebase_middleware import verify_firebase_token
+from audit import get_audit_writer
+from tenancy import resolve_business_id
 from model import get_model_metadata
 from fraud_engine.network import get_vendor_graph
+from fraud_engine.vendor_lists import get_vendor_lists, vendor_key
+from stats import business_summary, count_transactions, rollup_series, BUCKETS
+from routes.pagination import paginate, paginate_by_priority, time_arg, iso_utc
+from routes.serializers import ALERT_LIST_COLUMNS, alert_row_json, list_response
 
 logger = logging.getLogger("fraudsense.fraud")
 
@@ -23,8 +31,11 @@ fraud_bp = Blueprint("fraud", __name__, url_prefix="/fraud")
 @fraud_bp.route("/alerts", methods=["GET"])
 def get_alerts():
     """
-    GET /fraud/alerts?page=1&limit=20&risk_level=critical&review_status=pending_review
+    GET /fraud/alerts?limit=20&cursor=<id>&risk_level=critical&status=pending_review&from=<iso>&to=<iso>&sort=priority
     Returns paginated high-risk transactions for the alert investigation feed.
+    Pass next_cursor from the previous response as ?cursor= to page; ?page= still works.
+    sort=priority orders by expected loss (final_score × amount) instead of newest first.
+    from/to filter on event time; total is null for time-filtered requests.
     """
     decoded, err = verify_firebase_token()
     if err:
@@ -32,41 +43,117 @@ def get_alerts():
 
     session = SessionLocal()
     try:
-        uid  = decoded["uid"]
-        biz  = _get_biz(session, uid)
-        if not biz:
-            return jsonify({"error": "Business not found"}), 404
+        biz_id = resolve_business_id(session, decoded)
 
         page         = max(1, int(request.args.get("page", 1)))
         limit        = min(100, int(request.args.get("limit", 20)))
         risk_level   = request.args.get("risk_level")
         review_stat  = request.args.get("status")
-        
+        by_priority  = request.args.get("sort") == "priority"
+
         if review_stat == "pending":
             review_stat = "pending_review"
+        try:
+            start, end = time_arg("from"), time_arg("to")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        q = session.query(Transaction).filter(
-            Transaction.business_id   == biz.id,
+        q = session.query(*ALERT_LIST_COLUMNS).filter(
+            Transaction.business_id   == biz_id,
             Transaction.suspicious_flag == True
         )
         if risk_level:
             q = q.filter(Transaction.risk_level == risk_level)
         if review_stat:
             q = q.filter(Transaction.review_status == review_stat)
+        if start:
+            q = q.filter(Transaction.event_time >= start)
+        if end:
+            q = q.filter(Transaction.event_time < end)
 
-        total  = q.count()
-        alerts = q.order_by(Transaction.id.desc()) \
-                   .offset((page - 1) * limit).limit(limit).all()
+        total = None
+        if not (start or end):
+            total = count_transactions(session, biz_id, suspicious=True,
+                                       risk_level=risk_level, review_status=review_stat)
+        try:
+            alerts, next_cursor = (paginate_by_priority if by_priority else paginate)(q, limit, page)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        return jsonify({
-            "data": {
-                "alerts": [_alert_to_dict(a) for a in alerts],
-                "total":  total,
-                "page":   page,
-                "pages":  (total + limit - 1) // limit,
-            },
-            "error": None,
-        }), 200
+        return list_response(
+            "alerts", [alert_row_json(a) for a in alerts],
+            total       = total,
+            page        = page,
+            pages       = (total + limit - 1) // limit if total is not None else None,
+            next_cursor = next_cursor,
+        )
+
+    finally:
+        session.close()
+
+
+# ── Review Queue ──────────────────────────────────────────────────────────────
+REVIEW_CLAIM_SECONDS = int(os.getenv("REVIEW_CLAIM_SECONDS", "900"))
+MAX_QUEUE_CLAIM      = 50
+
+
+@fraud_bp.route("/queue/next", methods=["POST", "GET"])
+def claim_next_alerts():
+    """
+    GET|POST /fraud/queue/next?n=5
+    Hands the caller the n highest expected-loss pending_review alerts and
+    leases them for REVIEW_CLAIM_SECONDS, so concurrent reviewers never get
+    the same row. Reviewing a transaction releases its lease; an expired
+    lease puts it back in the queue.
+    """
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    n = max(1, min(MAX_QUEUE_CLAIM, request.args.get("n", 1, type=int)))
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+        now    = datetime.now(timezone.utc)
+        until  = now + timedelta(seconds=REVIEW_CLAIM_SECONDS)
+        unclaimed = or_(Transaction.claimed_until.is_(None), Transaction.claimed_until < now)
+
+        # Candidates in priority order; SKIP LOCKED lets concurrent reviewers
+        # on Postgres pass over rows another claim is in the middle of taking.
+        candidates = session.query(Transaction.id).filter(
+            Transaction.business_id   == biz_id,
+            Transaction.review_status == "pending_review",
+            unclaimed,
+        ).order_by(
+            Transaction.expected_loss.desc(), Transaction.id.desc()
+        ).limit(n).with_for_update(skip_locked=True).all()
+        ids = [c.id for c in candidates]
+
+        claimed = []
+        if ids:
+            # Compare-and-set: only rows still unclaimed are taken
+            session.query(Transaction).filter(
+                Transaction.id.in_(ids), unclaimed,
+            ).update({
+                Transaction.claimed_by:    decoded["uid"],
+                Transaction.claimed_until: until,
+            }, synchronize_session=False)
+            claimed = session.query(*ALERT_LIST_COLUMNS).filter(
+                Transaction.id.in_(ids),
+                Transaction.claimed_by    == decoded["uid"],
+                Transaction.claimed_until == until,
+            ).order_by(Transaction.expected_loss.desc(), Transaction.id.desc()).all()
+        session.commit()
+
+        return list_response(
+            "alerts", [alert_row_json(a) for a in claimed],
+            claimed_until = until.isoformat(),
+        )
+    except Exception as e:
+        session.rollback()
+        logger.exception("queue claim error")
+        return jsonify({"error": str(e)}), 500
     finally:
         session.close()
 
@@ -74,38 +161,22 @@ def get_alerts():
 # ── Dashboard Stats ───────────────────────────────────────────────────────────
 @fraud_bp.route("/stats", methods=["GET"])
 def get_stats():
-    """GET /fraud/stats — aggregated dashboard numbers."""
+    """GET /fraud/stats — aggregated dashboard numbers (read from business_stats)."""
     decoded, err = verify_firebase_token()
     if err:
         return err, 401
 
     session = SessionLocal()
     try:
-        uid = decoded["uid"]
-        biz = _get_biz(session, uid)
-        if not biz:
-            return jsonify({"error": "Business not found"}), 404
-
-        total   = session.query(func.count(Transaction.id)).filter(
-            Transaction.business_id == biz.id).scalar() or 0
-        fraud   = session.query(func.count(Transaction.id)).filter(
-            Transaction.business_id == biz.id,
-            Transaction.suspicious_flag == True).scalar() or 0
-        pending = session.query(func.count(Transaction.id)).filter(
-            Transaction.business_id == biz.id,
-            Transaction.review_status == "pending_review").scalar() or 0
-
-        # Risk breakdown
-        breakdown = {}
-        for level in ["critical", "high", "medium", "low"]:
-            count = session.query(func.count(Transaction.id)).filter(
-                Transaction.business_id == biz.id,
-                Transaction.risk_level  == level).scalar() or 0
-            breakdown[level] = count
+        biz_id = resolve_business_id(session, decoded)
+
+        summary = business_summary(session, biz_id)
+        total   = summary["total_transactions"]
+        fraud   = summary["fraud_count"]
 
         # Recent trend (last 10 fraud transactions)
         recent = session.query(Transaction).filter(
-            Transaction.business_id   == biz.id,
+            Transaction.business_id   == biz_id,
             Transaction.suspicious_flag == True,
         ).order_by(Transaction.id.desc()).limit(10).all()
 
@@ -114,9 +185,9 @@ def get_stats():
                 "total_transactions":   total,
                 "fraud_count":          fraud,
                 "fraud_rate":           round(fraud / total * 100, 2) if total else 0,
-                "pending_review":       pending,
-                "risk_breakdown":       breakdown,
-                "risk_score":           biz.risk_score or 0,
+                "pending_review":       summary["pending_review"],
+                "risk_breakdown":       summary["risk_breakdown"],
+                "risk_score":           round(fraud / total * 100, 2) if total else 0,
                 "recent_fraud":         [_alert_to_dict(t) for t in recent],
             },
             "error": None,
@@ -125,6 +196,59 @@ def get_stats():
         session.close()
 
 
+# ── Time Series ───────────────────────────────────────────────────────────────
+# Default and maximum window per bucket size
+TIMESERIES_WINDOWS = {
+    "hour": (timedelta(hours=48), timedelta(days=31)),
+    "day":  (timedelta(days=30),  timedelta(days=731)),
+}
+
+
+@fraud_bp.route("/timeseries", methods=["GET"])
+def get_timeseries():
+    """
+    GET /fraud/timeseries?from=<iso>&to=<iso>&bucket=hour|day
+    Per-bucket counts by risk level, fraud amount and review outcomes,
+    served from fraud_rollups. Buckets with no transactions are omitted.
+    """
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    bucket = request.args.get("bucket", "day")
+    if bucket not in BUCKETS:
+        return jsonify({"error": f"bucket must be one of {list(BUCKETS)}"}), 400
+    try:
+        end   = time_arg("to") or datetime.now(timezone.utc)
+        start = time_arg("from")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    default_window, max_window = TIMESERIES_WINDOWS[bucket]
+    start = start or end - default_window
+    if start >= end:
+        return jsonify({"error": "'from' must be before 'to'"}), 400
+    if end - start > max_window:
+        return jsonify({"error": f"Range too large for bucket={bucket} "
+                                 f"(max {max_window.days} days)"}), 400
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+
+        return jsonify({
+            "data": {
+                "bucket": bucket,
+                "from":   start.isoformat(),
+                "to":     end.isoformat(),
+                "series": rollup_series(session, biz_id, bucket, start, end),
+            },
+            "error": None,
+        }), 200
+    finally:
+        session.close()
+
+
 # ── Network Graph ────────────────────────────────────────────────────────────
 @fraud_bp.route("/network", methods=["GET"])
 def get_network_graph():
@@ -135,17 +259,207 @@ def get_network_graph():
 
     session = SessionLocal()
     try:
-        uid = decoded["uid"]
-        biz = _get_biz(session, uid)
-        if not biz:
-            return jsonify({"error": "Business not found"}), 404
+        biz_id = resolve_business_id(session, decoded)
 
-        graph_data = get_vendor_graph().get_graph_json(business_id=biz.id)
+        graph_data = get_vendor_graph().get_graph_json(business_id=biz_id)
         return jsonify({"data": graph_data, "error": None}), 200
     finally:
         session.close()
 
 
+# ── Vendor blacklist / allowlist ──────────────────────────────────────────────
+MAX_VENDOR_LIST_BULK = 5000
+VENDOR_LIST_URL      = "/vendors/<any(blacklist, allowlist):list_type>"
+
+
+@fraud_bp.route(VENDOR_LIST_URL, methods=["GET"])
+def list_vendor_entries(list_type: str):
+    """
+    GET /fraud/vendors/blacklist?limit=50&cursor=<id>&q=<name prefix>
+    Active entries on the business's blacklist or allowlist, newest first.
+    """
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+        limit  = min(500, int(request.args.get("limit", 50)))
+        cursor = request.args.get("cursor", type=int)
+        prefix = vendor_key(request.args.get("q", ""))
+
+        q = session.query(VendorListEntry).filter(
+            VendorListEntry.business_id == biz_id,
+            VendorListEntry.list_type   == list_type,
+            VendorListEntry.active      == True,
+        )
+        if prefix:
+            q = q.filter(VendorListEntry.name_key.startswith(prefix, autoescape=True))
+        if cursor is not None:
+            q = q.filter(VendorListEntry.id < cursor)
+        rows = q.order_by(VendorListEntry.id.desc()).limit(limit + 1).all()
+
+        return jsonify({
+            "data": {
+                "entries":     [_vendor_entry_to_dict(e) for e in rows[:limit]],
+                "next_cursor": rows[limit - 1].id if len(rows) > limit else None,
+            },
+            "error": None,
+        }), 200
+    finally:
+        session.close()
+
+
+@fraud_bp.route(VENDOR_LIST_URL, methods=["POST"])
+def add_vendor_entries(list_type: str):
+    """
+    POST /fraud/vendors/blacklist
+    Body: {"vendor_name": "...", "reason": "..."} or {"vendors": [{...}, ...]}
+    Adds up to MAX_VENDOR_LIST_BULK vendors; names already on the list
+    (after normalization) are updated / reactivated instead of duplicated.
+    """
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    data  = request.get_json(silent=True)
+    items = data.get("vendors", [data]) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Provide vendor_name or a non-empty vendors list"}), 400
+    if len(items) > MAX_VENDOR_LIST_BULK:
+        return jsonify({"error": f"At most {MAX_VENDOR_LIST_BULK} vendors per request"}), 400
+
+    wanted, invalid = {}, []
+    for i, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        name = str(item.get("vendor_name") or "").strip()
+        key  = vendor_key(name)
+        if not key:
+            invalid.append(i)
+        else:
+            wanted[key] = (name, str(item.get("reason") or ""))     # last entry wins
+    if not wanted:
+        return jsonify({"error": "No valid vendor_name given", "invalid_rows": invalid}), 400
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+        entries, created = _upsert_vendor_entries(session, biz_id, list_type, wanted, decoded["uid"])
+        session.commit()
+        get_vendor_lists().apply_local(biz_id, entries)
+        get_audit_writer().record("vendor_list_updated", business_id=biz_id, actor_uid=decoded["uid"],
+                                  list_type=list_type, added=created, updated=len(entries) - created)
+
+        return jsonify({
+            "data": {
+                "created":      created,
+                "updated":      len(entries) - created,
+                "invalid_rows": invalid,
+                "entries":      [_vendor_entry_to_dict(e) for e in entries[:100]],
+            },
+            "error": None,
+        }), 200
+    except IntegrityError:
+        session.rollback()
+        return jsonify({"error": "Concurrent update to the same vendors, retry"}), 409
+    except Exception as e:
+        session.rollback()
+        logger.exception("vendor list update error")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+@fraud_bp.route(VENDOR_LIST_URL + "/<int:entry_id>", methods=["DELETE"])
+def remove_vendor_entry(list_type: str, entry_id: int):
+    """DELETE /fraud/vendors/blacklist/<id> — take a vendor off the list."""
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+        entry  = session.query(VendorListEntry).filter(
+            VendorListEntry.id          == entry_id,
+            VendorListEntry.business_id == biz_id,
+            VendorListEntry.list_type   == list_type,
+            VendorListEntry.active      == True,
+        ).first()
+        if not entry:
+            return jsonify({"error": "Entry not found"}), 404
+
+        entry.active, entry.updated_at = False, datetime.now(timezone.utc)
+        session.commit()
+        get_vendor_lists().apply_local(biz_id, [entry])
+        get_audit_writer().record("vendor_list_updated", business_id=biz_id, actor_uid=decoded["uid"],
+                                  list_type=list_type, removed=entry.vendor_name)
+        return jsonify({"data": _vendor_entry_to_dict(entry), "error": None}), 200
+    finally:
+        session.close()
+
+
+@fraud_bp.route("/vendors/check", methods=["GET"])
+def check_vendor():
+    """GET /fraud/vendors/check?vendor_name=... — which list entry, if any, the name matches."""
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    vendor_name = request.args.get("vendor_name", "")
+    if not vendor_key(vendor_name):
+        return jsonify({"error": "vendor_name is required"}), 400
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+    finally:
+        session.close()
+    match = get_vendor_lists().index_for(biz_id).match(vendor_name)
+    return jsonify({"data": {"vendor_name": vendor_name, "match": match}, "error": None}), 200
+
+
+def _upsert_vendor_entries(session, biz_id: int, list_type: str, wanted: dict,
+                           uid: str, chunk: int = 500) -> tuple[list, int]:
+    """name_key → (vendor_name, reason) onto the list. Returns (entries, number created)."""
+    keys, existing = list(wanted), {}
+    for i in range(0, len(keys), chunk):
+        for e in session.query(VendorListEntry).filter(
+            VendorListEntry.business_id == biz_id,
+            VendorListEntry.list_type   == list_type,
+            VendorListEntry.name_key.in_(keys[i:i + chunk]),
+        ):
+            existing[e.name_key] = e
+
+    now, entries, created = datetime.now(timezone.utc), [], 0
+    for key, (name, reason) in wanted.items():
+        entry = existing.get(key)
+        if entry is None:
+            entry = VendorListEntry(business_id=biz_id, list_type=list_type, name_key=key,
+                                    created_by=uid, created_at=now)
+            session.add(entry)
+            created += 1
+        entry.vendor_name, entry.reason = name, reason
+        entry.active, entry.updated_at  = True, now
+        entries.append(entry)
+    session.flush()
+    return entries, created
+
+
+def _vendor_entry_to_dict(e: VendorListEntry) -> dict:
+    return {
+        "id":          e.id,
+        "list_type":   e.list_type,
+        "vendor_name": e.vendor_name,
+        "reason":      e.reason,
+        "active":      e.active,
+        "created_by":  e.created_by,
+        "created_at":  iso_utc(e.created_at),
+        "updated_at":  iso_utc(e.updated_at),
+    }
+
+
 # ── Model Health ──────────────────────────────────────────────────────────────
 @fraud_bp.route("/model/health", methods=["GET"])
 def model_health():
@@ -159,44 +473,17 @@ def model_health():
 
 
 def _alert_to_dict(t: Transaction) -> dict:
-    import ast
-    reasons = []
-    try:
-        reasons = ast.literal_eval(t.fraud_reasons or "[]")
-    except Exception:
-        pass
-
     return {
         "id":            t.id,
         "amount":        t.amount,
         "vendor_name":   t.vendor_name,
         "category":      t.category,
         "timestamp":     str(t.timestamp) if t.timestamp else None,
+        "event_time":    iso_utc(t.event_time),
         "risk_level":    t.risk_level,
         "confidence":    t.confidence_score,
         "final_score":   t.final_score,
+        "expected_loss": t.expected_loss,
         "review_status": t.review_status,
-        "reasons":       reasons,
+        "reasons":       t.fraud_reasons or [],
     }
-
-def _get_biz(session: Session, uid: str):
-    biz = session.query(Business).filter(Business.firebase_uid == uid).first()
-    if not biz:
-        try:
-            from firebase_admin import auth
-            user = auth.get_user(uid)
-            email = user.email or f"{uid}@demo.com"
-            name = user.display_name or email.split('@')[0]
-        except Exception:
-            email = f"{uid}@demo.com"
-            name = "Demo Business"
-        biz = Business(
-            firebase_uid=uid,
-            business_name=name,
-            email=email,
-            category="FinTech"
-        )
-        session.add(biz)
-        session.commit()
-        session.refresh(biz)
-    return biz
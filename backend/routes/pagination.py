@@ -0,0 +1,84 @@
+"""
+FraudSense — List Pagination and Filter Helpers
+Keyset (cursor) pagination on Transaction.id — or on (expected_loss, id)
+for the priority ordering — with OFFSET paging kept for clients that still
+send ?page=, and ?from= / ?to= time parsing.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import request
+from sqlalchemy import tuple_
+
+from database import Transaction
+
+
+def paginate(q, limit: int, page: int) -> tuple[list, int | None]:
+    """
+    Order a Transaction query by id desc and apply ?cursor= (preferred) or
+    ?page=. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    cursor = request.args.get("cursor", type=int)
+
+    q = q.order_by(Transaction.id.desc())
+    if cursor is not None:
+        q = q.filter(Transaction.id < cursor)
+    elif page > 1:
+        q = q.offset((page - 1) * limit)
+
+    rows        = q.limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def paginate_by_priority(q, limit: int, page: int) -> tuple[list, str | None]:
+    """
+    Like paginate(), ordered by expected_loss desc, id desc. The cursor is
+    "<expected_loss>:<id>"; raises ValueError on a malformed one.
+    """
+    cursor = request.args.get("cursor")
+    key    = tuple_(Transaction.expected_loss, Transaction.id)
+
+    q = q.order_by(Transaction.expected_loss.desc(), Transaction.id.desc())
+    if cursor:
+        try:
+            loss, _, last_id = cursor.partition(":")
+            q = q.filter(key < (float(loss), int(last_id)))
+        except ValueError:
+            raise ValueError("'cursor' must be '<expected_loss>:<id>' for sort=priority")
+    elif page > 1:
+        q = q.offset((page - 1) * limit)
+
+    rows = q.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = f"{last.expected_loss!r}:{last.id}"
+    return rows[:limit], next_cursor
+
+
+def time_arg(name: str) -> Optional[datetime]:
+    """
+    Parse an ISO-8601 query arg as aware UTC (naive values are taken as UTC).
+    Raises ValueError with a client-facing message on bad input.
+    """
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        ts = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO-8601 timestamp")
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+def iso_utc(ts: Optional[datetime]) -> Optional[str]:
+    """ISO-8601 for a stored UTC datetime (SQLite hands them back naive)."""
+    if ts is None:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.isoformat()
@@ -0,0 +1,80 @@
+"""
+FraudSense — List Response Serializers
+List endpoints select plain columns and splice the stored JSON arrays
+(fraud_reasons / shap_reasons, read back as text) straight into the response
+body, so list pages do no per-row JSON decoding in Python.
+"""
+
+import json
+
+from flask import Response
+from sqlalchemy import Text, cast
+
+from database import Transaction
+from routes.pagination import iso_utc
+
+_FRAUD_REASONS = cast(Transaction.fraud_reasons, Text).label("fraud_reasons")
+_SHAP_REASONS  = cast(Transaction.shap_reasons,  Text).label("shap_reasons")
+
+TX_LIST_COLUMNS = (
+    Transaction.id, Transaction.amount, Transaction.vendor_name,
+    Transaction.category, Transaction.payment_method, Transaction.timestamp,
+    Transaction.event_time, Transaction.suspicious_flag, Transaction.risk_level,
+    Transaction.confidence_score, Transaction.final_score,
+    Transaction.review_status, _FRAUD_REASONS, _SHAP_REASONS,
+)
+
+ALERT_LIST_COLUMNS = (
+    Transaction.id, Transaction.amount, Transaction.vendor_name,
+    Transaction.category, Transaction.timestamp, Transaction.event_time,
+    Transaction.risk_level, Transaction.confidence_score,
+    Transaction.final_score, Transaction.expected_loss,
+    Transaction.review_status, _FRAUD_REASONS,
+)
+
+
+def _splice(head: dict, raw_fields: dict) -> str:
+    """json.dumps(head) with already-encoded JSON values appended."""
+    body  = json.dumps(head)[:-1]
+    extra = ", ".join(f'"{k}": {v or "[]"}' for k, v in raw_fields.items())
+    return f"{body}, {extra}}}"
+
+
+def tx_row_json(r) -> str:
+    return _splice({
+        "id":              r.id,
+        "amount":          r.amount,
+        "vendor_name":     r.vendor_name,
+        "category":        r.category,
+        "payment_method":  r.payment_method,
+        "timestamp":       str(r.timestamp) if r.timestamp else None,
+        "event_time":      iso_utc(r.event_time),
+        "suspicious_flag": r.suspicious_flag,
+        "risk_level":      r.risk_level,
+        "confidence":      r.confidence_score,
+        "final_score":     r.final_score,
+        "review_status":   r.review_status,
+    }, {"fraud_reasons": r.fraud_reasons, "shap_reasons": r.shap_reasons})
+
+
+def alert_row_json(r) -> str:
+    return _splice({
+        "id":            r.id,
+        "amount":        r.amount,
+        "vendor_name":   r.vendor_name,
+        "category":      r.category,
+        "timestamp":     str(r.timestamp) if r.timestamp else None,
+        "event_time":    iso_utc(r.event_time),
+        "risk_level":    r.risk_level,
+        "confidence":    r.confidence_score,
+        "final_score":   r.final_score,
+        "expected_loss": r.expected_loss,
+        "review_status": r.review_status,
+    }, {"reasons": r.fraud_reasons})
+
+
+def list_response(key: str, items: list[str], **meta) -> Response:
+    """{"data": {key: [items...], **meta}, "error": null} from pre-encoded items."""
+    meta_json = json.dumps(meta)[1:]
+    body = f'{{"data": {{"{key}": [{", ".join(items)}], {meta_json}, "error": null}}'
+    return Response(body, status=200, mimetype="application/json")
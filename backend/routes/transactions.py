@@ -6,215 +6,402 @@ SHAP explanation endpoint, and review feedback loop.
 
 import io
 import csv
+import json
 import logging
-from datetime import datetime, timezone
-from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import Session
+from typing import Optional
+from flask import Blueprint, Response, request, jsonify
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
 
-from database import SessionLocal, Transaction, Business
+from database import SessionLocal, Transaction, parse_event_time
 from firebase_middleware import verify_firebase_token
-from fraud_engine.engine import analyze
+from tenancy import resolve_business_id
+from audit import get_audit_writer
+from metrics import STAGE_SECONDS
+from profiling import tag as profile_tag
+from fraud_engine.engine import analyze_batch
+from fraud_engine.vendor_lists import apply_vendor_lists
+from geoip import apply_geoip
+from ingest import (
+    is_columnar, read_columnar, columns_to_rows, select_rows, coerce_row,
+    client_id, row_ip, content_hashes, batch_hash, fill_defaults,
+)
+import idempotency
+from idempotency import IdempotencyConflict
+from stats import (
+    StatsDelta, RollupDelta, apply_delta, apply_rollup_delta,
+    apply_business_totals, count_transactions,
+)
+from routes.pagination import paginate, time_arg, iso_utc
+from routes.serializers import TX_LIST_COLUMNS, tx_row_json, list_response
+from routes.export import EXPORT_COLUMNS, EXPORT_FORMATS, csv_chunks, parquet_chunks
 
 logger = logging.getLogger("fraudsense.transactions")
 
 transactions_bp = Blueprint("transactions", __name__, url_prefix="/transactions")
 
 
-def _get_biz(session: Session, uid: str):
-    """Return Business or auto-create one for seamless dev."""
-    biz = session.query(Business).filter(Business.firebase_uid == uid).first()
-    if not biz:
-        try:
-            from firebase_admin import auth
-            user = auth.get_user(uid)
-            email = user.email or f"{uid}@demo.com"
-            name = user.display_name or email.split('@')[0]
-        except Exception:
-            email = f"{uid}@demo.com"
-            name = "Demo Business"
-        biz = Business(
-            firebase_uid=uid,
-            business_name=name,
-            email=email,
-            category="FinTech"
-        )
-        session.add(biz)
-        session.commit()
-        session.refresh(biz)
-    return biz
-
-
-# ── Upload CSV ─────────────────────────────────────────────────────────────────
+# ── Upload ─────────────────────────────────────────────────────────────────────
 @transactions_bp.route("/upload", methods=["POST"])
 def upload_transactions():
     """
     POST /transactions/upload
-    Body: multipart/form-data with 'file' (CSV) or JSON array
+    Body: multipart/form-data with 'file' (CSV, Parquet or Arrow IPC), a raw
+          Parquet / Arrow body (Content-Type application/vnd.apache.parquet
+          or application/vnd.apache.arrow.*), or a JSON array
     Returns per-row fraud verdicts and persists to DB.
+
+    Rows this business already has (same client transaction_id, or same
+    content) are skipped before scoring and listed in duplicate_rows. With an
+    Idempotency-Key header, a retried request replays the first response.
     """
     decoded, err = verify_firebase_token()
     if err:
         return err, 401
 
-    uid = decoded["uid"]
-    session = SessionLocal()
+    claimed_key = None
+    session     = SessionLocal()
     try:
-        biz = _get_biz(session, uid)
-        if not biz:
-            return jsonify({"error": "Business not found"}), 404
+        biz_id = resolve_business_id(session, decoded)
 
         # --- Parse input ---
-        rows = []
-        if request.files.get("file"):
-            file = request.files["file"]
-            text = file.read().decode("utf-8")
-            reader = csv.DictReader(io.StringIO(text))
-            rows = list(reader)
-        elif request.is_json:
-            data = request.get_json()
-            if isinstance(data, list):
-                rows = data
+        rows, columns = [], None
+        try:
+            if request.files.get("file"):
+                file = request.files["file"]
+                data = file.read()
+                if is_columnar(data, file.filename, file.mimetype):
+                    columns = read_columnar(data)
+                else:
+                    rows = list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+            elif is_columnar(b"", content_type=request.content_type):
+                columns = read_columnar(request.get_data())
+            elif request.is_json:
+                data = request.get_json()
+                if isinstance(data, list):
+                    rows = data
+                else:
+                    return jsonify({"error": "JSON body must be an array of transactions"}), 400
             else:
-                return jsonify({"error": "JSON body must be an array of transactions"}), 400
-        else:
-            return jsonify({"error": "Provide CSV file (multipart) or JSON array"}), 400
-
-        if not rows:
+                return jsonify({"error": "Provide CSV / Parquet / Arrow file (multipart) or JSON array"}), 400
+        except ImportError:
+            return jsonify({"error": "Parquet / Arrow upload requires pyarrow on the server"}), 501
+        except Exception as e:
+            return jsonify({"error": f"Could not read upload: {e}"}), 400
+
+        txs = columns_to_rows(columns) if columns is not None else \
+              [coerce_row(row) for row in rows]
+        if not txs:
             return jsonify({"error": "No rows found in upload"}), 400
 
-        # --- Compute business average from existing transactions ---
-        existing_txns  = session.query(Transaction).filter(
-            Transaction.business_id == biz.id
-        ).all()
-        existing_amounts = [t.amount for t in existing_txns if t.amount]
-        biz_avg = sum(existing_amounts) / len(existing_amounts) if existing_amounts else 0
-
-        results = []
-        fraud_count = 0
-
-        for i, row in enumerate(rows):
-            # Coerce types
-            tx = {
-                "amount":           float(row.get("amount", 0) or 0),
-                "vendor_name":      str(row.get("vendor_name", row.get("name", f"vendor_{i}")) or ""),
-                "category":         str(row.get("category", "") or ""),
-                "payment_method":   str(row.get("payment_method", "") or ""),
-                "timestamp":        str(row.get("timestamp", row.get("date",
-                                        datetime.now(timezone.utc).isoformat())) or ""),
-                "previous_balance": float(row.get("previous_balance", 0) or 0),
-                "new_balance":      float(row.get("new_balance", 0) or 0),
-                "ip_country":       str(row.get("ip_country", "") or ""),
-                "vendor_country":   str(row.get("vendor_country", "") or ""),
-                "time_since_last_txn": float(row.get("time_since_last_txn", 3600) or 3600),
-                "num_txns_last_1h":    int(float(row.get("num_txns_last_1h", 0) or 0)),
-                "num_txns_last_24h":   int(float(row.get("num_txns_last_24h", 0) or 0)),
-                "vendor_risk_score":   float(row.get("vendor_risk_score", 0) or 0),
-                "is_new_vendor":       int(float(row.get("is_new_vendor", 0) or 0)),
-            }
-
-            # Run 4-layer fraud engine
-            verdict = analyze(tx, biz.id, biz_avg)
-
-            # Persist to DB
-            db_tx = Transaction(
-                business_id      = biz.id,
-                amount           = tx["amount"],
-                vendor_name      = tx["vendor_name"],
-                category         = tx["category"],
-                payment_method   = tx["payment_method"],
-                timestamp        = tx["timestamp"],
-                previous_balance = tx["previous_balance"],
-                new_balance      = tx["new_balance"],
-                suspicious_flag  = verdict.is_fraud,
-                risk_level       = verdict.risk_level,
-                confidence_score = verdict.confidence,
-                final_score      = verdict.final_score,
-                fraud_reasons    = str([f.message for f in verdict.flags]),
-                shap_reasons     = str(verdict.shap_reasons),
-                review_status    = "pending_review" if verdict.review_required else "auto_cleared",
-            )
-            session.add(db_tx)
-
-            if verdict.is_fraud:
-                fraud_count += 1
-
-            results.append({
-                "row":     i,
-                "vendor":  tx["vendor_name"],
-                "amount":  tx["amount"],
-                "verdict": verdict.to_dict(),
-            })
-
-        # Update business stats
-        biz.total_transactions = (biz.total_transactions or 0) + len(rows)
-        biz.risk_count         = (biz.risk_count or 0) + fraud_count
-        if biz.total_transactions > 0:
-            biz.risk_score = round(biz.risk_count / biz.total_transactions * 100, 2)
-
-        session.commit()
-
-        return jsonify({
-            "data": {
-                "total":       len(rows),
-                "fraud_count": fraud_count,
-                "results":     results,
-            },
-            "error": None,
-        }), 200
-
+        ids    = columns["client_id"] if columns is not None else [client_id(row) for row in rows]
+        hashes = content_hashes(txs, ids)
+
+        # --- Idempotency-Key: replay the stored response for a retried request ---
+        idem_key = request.headers.get("Idempotency-Key")
+        if idem_key:
+            try:
+                replay = idempotency.begin(session, biz_id, idem_key, batch_hash(hashes))
+            except IdempotencyConflict as e:
+                return jsonify({"error": str(e)}), e.status
+            if replay:
+                status_code, body = replay
+                return Response(body, status=status_code, mimetype="application/json",
+                                headers={"Idempotent-Replayed": "true"})
+            claimed_key = idem_key
+
+        ips = columns["ip_address"] if columns is not None else [row_ip(row) for row in rows]
+        data, events = ingest_rows(session, biz_id, txs, hashes, columns,
+                                   ips=ips, request_ip=request.remote_addr)
+        body = json.dumps({"data": data, "error": None})
+        if claimed_key:
+            idempotency.complete(session, biz_id, claimed_key, 200, body)
+        with STAGE_SECONDS.time("db_commit"):
+            session.commit()
+        claimed_key = None
+
+        record_flagged(biz_id, decoded["uid"], events)
+
+        return Response(body, status=200, mimetype="application/json")
+
+    except IntegrityError:
+        session.rollback()
+        return jsonify({"error": "Some rows were ingested by a concurrent upload; retry to skip them"}), 409
     except Exception as e:
         session.rollback()
         logger.exception("Upload error")
         return jsonify({"error": str(e)}), 500
     finally:
+        if claimed_key:
+            idempotency.abandon(session, biz_id, claimed_key)
         session.close()
 
 
+def ingest_rows(session, biz_id: int, txs: list[dict], hashes: list[str],
+                columns: Optional[dict] = None, row_offset: int = 0,
+                ips: Optional[list] = None, request_ip: Optional[str] = None) -> tuple[dict, list]:
+    """
+    Dedup, score and stage one batch of coerced rows, with the matching
+    counter / rollup deltas. Returns the response data and the fraud_flagged
+    events to record once the caller has committed. `row_offset` numbers rows
+    from the start of the whole upload (chunked uploads); `ips` / `request_ip`
+    feed the geo-IP lookup for ip_country.
+    """
+    profile_tag(rows=len(txs))
+    fill_defaults(txs, row_offset, columns)
+
+    # --- Dedup: skip rows this business has already ingested ---
+    seen = _existing_hashes(session, biz_id, hashes)
+    keep, duplicates = [], []
+    for i, h in enumerate(hashes):
+        if h in seen:
+            duplicates.append(row_offset + i)
+        else:
+            seen.add(h)
+            keep.append(i)
+    if duplicates and columns is not None:
+        columns = select_rows(columns, keep)
+    new_txs = [txs[i] for i in keep]
+
+    # --- Business average over existing (non-zero) amounts, computed in SQL ---
+    biz_avg = float(session.query(func.avg(Transaction.amount)).filter(
+        Transaction.business_id == biz_id,
+        Transaction.amount != 0,
+    ).scalar() or 0)
+
+    results = []
+    flagged = []
+    fraud_count = 0
+    delta  = StatsDelta()
+    rollup = RollupDelta()
+
+    # Derive ip_country from the row / request IP (after dedup, so content
+    # hashes stay those of the rows the client sent)
+    apply_geoip(new_txs, [ips[i] for i in keep] if ips else None, request_ip, columns)
+
+    # Blacklist / allowlist set vendor_risk_score before any layer runs
+    list_matches = apply_vendor_lists(new_txs, biz_id, columns)
+
+    # Rule input; the network layer may raise tx["vendor_risk_score"] afterwards
+    input_vendor_risk = [tx["vendor_risk_score"] for tx in new_txs]
+
+    # Run 4-layer fraud engine (ML scored for the whole batch at once)
+    verdicts = analyze_batch(new_txs, biz_id, biz_avg, columns=columns)
+
+    for i, tx, verdict, vendor_risk, list_match in zip(keep, new_txs, verdicts,
+                                                       input_vendor_risk, list_matches):
+        # Persist to DB
+        db_tx = Transaction(
+            business_id      = biz_id,
+            content_hash     = hashes[i],
+            amount           = tx["amount"],
+            vendor_name      = tx["vendor_name"],
+            category         = tx["category"],
+            payment_method   = tx["payment_method"],
+            timestamp        = tx["timestamp"],
+            event_time       = parse_event_time(tx["timestamp"]),
+            previous_balance = tx["previous_balance"],
+            new_balance      = tx["new_balance"],
+            ip_country          = tx["ip_country"],
+            vendor_country      = tx["vendor_country"],
+            num_txns_last_1h    = tx["num_txns_last_1h"],
+            num_txns_last_24h   = tx["num_txns_last_24h"],
+            is_new_vendor       = tx["is_new_vendor"],
+            vendor_risk_score   = vendor_risk,
+            business_avg_amount = biz_avg,
+            suspicious_flag  = verdict.is_fraud,
+            risk_level       = verdict.risk_level,
+            confidence_score = verdict.confidence,
+            final_score      = verdict.final_score,
+            expected_loss    = round(verdict.final_score * tx["amount"], 2),
+            fraud_reasons    = [f.to_dict() for f in verdict.flags],
+            shap_reasons     = list(verdict.shap_reasons),
+            rule_config_version = verdict.config_version,
+            review_status    = "pending_review" if verdict.review_required else "auto_cleared",
+        )
+        session.add(db_tx)
+        delta.add(db_tx.suspicious_flag, db_tx.risk_level, db_tx.review_status)
+        rollup.add(db_tx.event_time, db_tx.suspicious_flag,
+                   db_tx.risk_level, db_tx.review_status, tx["amount"])
+
+        if verdict.is_fraud:
+            fraud_count += 1
+            flagged.append((db_tx, verdict))
+
+        results.append({
+            "row":         row_offset + i,
+            "vendor":      tx["vendor_name"],
+            "amount":      tx["amount"],
+            "verdict":     verdict.to_dict(),
+            "vendor_list": list_match,
+        })
+
+    # Update business stats
+    apply_business_totals(session, biz_id, len(new_txs), fraud_count)
+    apply_delta(session, biz_id, delta)
+    apply_rollup_delta(session, biz_id, rollup)
+
+    session.flush()
+    events = [
+        dict(transaction_id=db_tx.id, risk_level=verdict.risk_level,
+             final_score=verdict.final_score,
+             rule_ids=[f.rule_id for f in verdict.flags])
+        for db_tx, verdict in flagged
+    ]
+    return {
+        "total":          len(new_txs),
+        "received":       len(txs),
+        "duplicates":     len(duplicates),
+        "duplicate_rows": duplicates,
+        "fraud_count":    fraud_count,
+        "results":        results,
+    }, events
+
+
+def record_flagged(biz_id: int, uid: str, events: list):
+    """Audit fraud_flagged events for a committed ingest."""
+    audit = get_audit_writer()
+    for event in events:
+        audit.record("fraud_flagged", business_id=biz_id, actor_uid=uid, **event)
+
+
+def _existing_hashes(session, biz_id: int, hashes: list[str], chunk: int = 500) -> set:
+    """content_hash values this business already has, via the unique dedup index."""
+    found = set()
+    unique = list(set(hashes))
+    for start in range(0, len(unique), chunk):
+        found.update(h for (h,) in session.query(Transaction.content_hash).filter(
+            Transaction.business_id == biz_id,
+            Transaction.content_hash.in_(unique[start:start + chunk]),
+        ))
+    return found
+
+
 # ── Get Transactions ───────────────────────────────────────────────────────────
 @transactions_bp.route("/", methods=["GET"])
 def get_transactions():
-    """GET /transactions/?page=1&limit=50&risk_level=high&suspicious=true"""
+    """
+    GET /transactions/?limit=50&cursor=<id>&risk_level=high&suspicious=true&from=<iso>&to=<iso>
+    Pass next_cursor from the previous response as ?cursor= to page; ?page= still works.
+    from/to filter on event time; total is null for time-filtered requests
+    (the materialized counters are not time-bucketed).
+    """
     decoded, err = verify_firebase_token()
     if err:
         return err, 401
 
-    uid = decoded["uid"]
     session = SessionLocal()
     try:
-        biz = _get_biz(session, uid)
-        if not biz:
-            return jsonify({"error": "Business not found"}), 404
+        biz_id = resolve_business_id(session, decoded)
 
         page  = max(1, int(request.args.get("page", 1)))
         limit = min(200, int(request.args.get("limit", 50)))
         risk_level  = request.args.get("risk_level")
         suspicious  = request.args.get("suspicious")
 
-        q = session.query(Transaction).filter(Transaction.business_id == biz.id)
+        only_suspicious = bool(suspicious and suspicious.lower() == "true")
+        try:
+            start, end = time_arg("from"), time_arg("to")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        q = session.query(*TX_LIST_COLUMNS).filter(Transaction.business_id == biz_id)
 
         if risk_level:
             q = q.filter(Transaction.risk_level == risk_level)
-        if suspicious and suspicious.lower() == "true":
+        if only_suspicious:
             q = q.filter(Transaction.suspicious_flag == True)
+        if start:
+            q = q.filter(Transaction.event_time >= start)
+        if end:
+            q = q.filter(Transaction.event_time < end)
+
+        total = None
+        if not (start or end):
+            total = count_transactions(session, biz_id,
+                                       suspicious=True if only_suspicious else None,
+                                       risk_level=risk_level)
+        txns, next_cursor = paginate(q, limit, page)
+
+        return list_response(
+            "transactions", [tx_row_json(t) for t in txns],
+            total       = total,
+            page        = page,
+            limit       = limit,
+            pages       = (total + limit - 1) // limit if total is not None else None,
+            next_cursor = next_cursor,
+        )
 
-        total = q.count()
-        txns  = q.order_by(Transaction.id.desc()) \
-                  .offset((page - 1) * limit).limit(limit).all()
+    finally:
+        session.close()
 
-        return jsonify({
-            "data": {
-                "transactions": [_tx_to_dict(t) for t in txns],
-                "total":        total,
-                "page":         page,
-                "limit":        limit,
-                "pages":        (total + limit - 1) // limit,
-            },
-            "error": None,
-        }), 200
+# ── Export ─────────────────────────────────────────────────────────────────────
+EXPORT_CHUNK_ROWS = 5000
+
+
+@transactions_bp.route("/export", methods=["GET"])
+def export_transactions():
+    """
+    GET /transactions/export?format=csv|parquet&from=<iso>&to=<iso>&risk_level=high&review_status=pending_review
+    Streams every matching transaction (oldest first) from a server-side
+    cursor, EXPORT_CHUNK_ROWS at a time, so memory stays flat for any size.
+    """
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
 
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {sorted(EXPORT_FORMATS)}"}), 400
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return jsonify({"error": "Parquet export requires pyarrow on the server"}), 501
+
+    risk_level    = request.args.get("risk_level")
+    review_status = request.args.get("review_status") or request.args.get("status")
+    if review_status == "pending":
+        review_status = "pending_review"
+    try:
+        start, end = time_arg("from"), time_arg("to")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
     finally:
         session.close()
 
+    stmt = select(*EXPORT_COLUMNS).where(Transaction.business_id == biz_id)
+    if risk_level:
+        stmt = stmt.where(Transaction.risk_level == risk_level)
+    if review_status:
+        stmt = stmt.where(Transaction.review_status == review_status)
+    if start:
+        stmt = stmt.where(Transaction.event_time >= start)
+    if end:
+        stmt = stmt.where(Transaction.event_time < end)
+    stmt = stmt.order_by(Transaction.id).execution_options(yield_per=EXPORT_CHUNK_ROWS)
+
+    def row_chunks():
+        session = SessionLocal()
+        try:
+            for rows in session.execute(stmt).partitions():
+                yield rows
+        finally:
+            session.close()
+
+    encode = csv_chunks if fmt == "csv" else parquet_chunks
+    mimetype, ext = EXPORT_FORMATS[fmt]
+    return Response(
+        encode(row_chunks()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="transactions-{biz_id}.{ext}"'},
+    )
+
+
 # ── Get Single Transaction ──────────────────────────────────────────────────────
 @transactions_bp.route("/<int:txn_id>", methods=["GET"])
 def get_transaction(txn_id: int):
@@ -225,14 +412,11 @@ def get_transaction(txn_id: int):
 
     session = SessionLocal()
     try:
-        uid = decoded["uid"]
-        biz = _get_biz(session, uid)
-        if not biz:
-            return jsonify({"error": "Business not found"}), 404
+        biz_id = resolve_business_id(session, decoded)
 
         txn = session.query(Transaction).filter(
             Transaction.id == txn_id,
-            Transaction.business_id == biz.id
+            Transaction.business_id == biz_id
         ).first()
 
         if not txn:
@@ -255,19 +439,14 @@ def explain_transaction_endpoint(txn_id: int):
 
     session = SessionLocal()
     try:
-        txn = session.query(Transaction).filter(Transaction.id == txn_id).first()
+        biz_id = resolve_business_id(session, decoded)
+        txn = session.query(Transaction).filter(
+            Transaction.id == txn_id,
+            Transaction.business_id == biz_id
+        ).first()
         if not txn:
             return jsonify({"error": "Transaction not found"}), 404
 
-        import ast
-        reasons  = []
-        rule_flags = []
-        try:
-            reasons    = ast.literal_eval(txn.shap_reasons  or "[]")
-            rule_flags = ast.literal_eval(txn.fraud_reasons or "[]")
-        except Exception:
-            pass
-
         return jsonify({
             "data": {
                 "transaction_id":  txn_id,
@@ -275,8 +454,9 @@ def explain_transaction_endpoint(txn_id: int):
                 "risk_level":      txn.risk_level,
                 "confidence":      txn.confidence_score,
                 "final_score":     txn.final_score,
-                "shap_reasons":    reasons,
-                "rule_flags":      rule_flags,
+                "shap_reasons":    txn.shap_reasons or [],
+                "rule_flags":      txn.fraud_reasons or [],
+                "rule_config_version": txn.rule_config_version,
                 "review_status":   txn.review_status,
             },
             "error": None,
@@ -286,6 +466,66 @@ def explain_transaction_endpoint(txn_id: int):
 
 
 # ── Review Feedback ────────────────────────────────────────────────────────────
+REVIEW_STATUSES  = {"confirmed_fraud", "false_positive", "pending_review", "auto_cleared"}
+MAX_BULK_REVIEWS = 5000
+
+
+def _apply_reviews(session, biz_id: int, uid: str, reviews: dict[int, str]) -> dict[int, dict]:
+    """
+    Set review_status for {txn_id: status} within one business: one locked
+    SELECT for the current state, one UPDATE per target status, and a single
+    stats / rollup delta. Returns per-id outcomes; caller commits.
+    """
+    current = session.query(
+        Transaction.id, Transaction.suspicious_flag, Transaction.risk_level,
+        Transaction.review_status, Transaction.event_time, Transaction.created_at,
+    ).filter(
+        Transaction.business_id == biz_id,
+        Transaction.id.in_(list(reviews)),
+    ).with_for_update().all()
+
+    outcomes = {txn_id: {"id": txn_id, "outcome": "not_found"} for txn_id in reviews}
+    delta    = StatsDelta()
+    rollup   = RollupDelta()
+    by_status: dict[str, list[int]] = {}
+
+    for t in current:
+        status = reviews[t.id]
+        delta.move(t.suspicious_flag, t.risk_level, t.review_status, status)
+        rollup.move(parse_event_time(t.event_time or t.created_at), t.review_status, status)
+        by_status.setdefault(status, []).append(t.id)
+        outcomes[t.id] = {
+            "id":              t.id,
+            "outcome":         "updated" if t.review_status != status else "unchanged",
+            "previous_status": t.review_status,
+            "review_status":   status,
+        }
+
+    for status, ids in by_status.items():
+        session.query(Transaction).filter(
+            Transaction.business_id == biz_id,
+            Transaction.id.in_(ids),
+        ).update({
+            Transaction.review_status: status,
+            Transaction.reviewed_by:   uid,
+            Transaction.claimed_by:    None,
+            Transaction.claimed_until: None,
+        }, synchronize_session=False)
+
+    apply_delta(session, biz_id, delta)
+    apply_rollup_delta(session, biz_id, rollup)
+    return outcomes
+
+
+def _audit_reviews(biz_id: int, uid: str, outcomes):
+    audit = get_audit_writer()
+    for o in outcomes:
+        if o["outcome"] == "updated":
+            audit.record("review_updated", business_id=biz_id, transaction_id=o["id"],
+                         actor_uid=uid, previous_status=o["previous_status"],
+                         status=o["review_status"])
+
+
 @transactions_bp.route("/<int:txn_id>/review", methods=["PATCH"])
 def review_transaction(txn_id: int):
     """
@@ -299,20 +539,20 @@ def review_transaction(txn_id: int):
 
     data = request.get_json() or {}
     status = data.get("review_status") or data.get("status")
-    VALID  = {"confirmed_fraud", "false_positive", "pending_review", "auto_cleared"}
-    if status not in VALID:
-        return jsonify({"error": f"status must be one of {sorted(VALID)}"}), 400
+    if status not in REVIEW_STATUSES:
+        return jsonify({"error": f"status must be one of {sorted(REVIEW_STATUSES)}"}), 400
 
     session = SessionLocal()
     try:
-        txn = session.query(Transaction).filter(Transaction.id == txn_id).first()
-        if not txn:
+        biz_id  = resolve_business_id(session, decoded)
+        outcome = _apply_reviews(session, biz_id, decoded["uid"], {txn_id: status})[txn_id]
+        if outcome["outcome"] == "not_found":
+            session.rollback()
             return jsonify({"error": "Transaction not found"}), 404
-
-        txn.review_status = status
-        txn.reviewed_by   = decoded["uid"]
         session.commit()
+        _audit_reviews(biz_id, decoded["uid"], [outcome])
 
+        txn = session.get(Transaction, txn_id)
         return jsonify({
             "data": _tx_to_dict(txn),
             "error": None,
@@ -324,8 +564,60 @@ def review_transaction(txn_id: int):
         session.close()
 
 
+@transactions_bp.route("/review", methods=["PATCH"])
+def bulk_review_transactions():
+    """
+    PATCH /transactions/review
+    Body: {"reviews": [{"id": 12, "status": "confirmed_fraud"}, ...]} (or the bare list)
+    Applies up to MAX_BULK_REVIEWS status changes in one DB transaction and
+    returns an outcome per id: updated | unchanged | not_found | invalid.
+    """
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    data  = request.get_json(silent=True)
+    items = data.get("reviews") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Provide a non-empty list of {id, status} reviews"}), 400
+    if len(items) > MAX_BULK_REVIEWS:
+        return jsonify({"error": f"At most {MAX_BULK_REVIEWS} reviews per request"}), 400
+
+    reviews, results = {}, []
+    for item in items:
+        item   = item if isinstance(item, dict) else {}
+        txn_id = item.get("id")
+        status = item.get("review_status") or item.get("status")
+        if not isinstance(txn_id, int) or isinstance(txn_id, bool) or status not in REVIEW_STATUSES:
+            results.append({"id": txn_id, "outcome": "invalid"})
+        else:
+            reviews[txn_id] = status     # last entry wins for repeated ids
+
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+        if reviews:
+            outcomes = _apply_reviews(session, biz_id, decoded["uid"], reviews)
+            session.commit()
+            _audit_reviews(biz_id, decoded["uid"], outcomes.values())
+            results.extend(outcomes.values())
+
+        return jsonify({
+            "data": {
+                "updated": sum(1 for r in results if r["outcome"] == "updated"),
+                "results": results,
+            },
+            "error": None,
+        }), 200
+    except Exception as e:
+        session.rollback()
+        logger.exception("bulk review error")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
 def _tx_to_dict(t: Transaction) -> dict:
-    import ast
     return {
         "id":              t.id,
         "amount":          t.amount,
@@ -333,11 +625,12 @@ def _tx_to_dict(t: Transaction) -> dict:
         "category":        t.category,
         "payment_method":  t.payment_method,
         "timestamp":       str(t.timestamp) if t.timestamp else None,
+        "event_time":      iso_utc(t.event_time),
         "suspicious_flag": t.suspicious_flag,
         "risk_level":      t.risk_level,
         "confidence":      t.confidence_score,
         "final_score":     t.final_score,
         "review_status":   t.review_status,
-        "fraud_reasons":   ast.literal_eval(t.fraud_reasons or "[]") if t.fraud_reasons else [],
-        "shap_reasons":    ast.literal_eval(t.shap_reasons or "[]") if t.shap_reasons else [],
+        "fraud_reasons":   t.fraud_reasons or [],
+        "shap_reasons":    t.shap_reasons or [],
     }
@@ -0,0 +1,275 @@
+"""
+FraudSense — Resumable Chunked Upload Blueprint
+Large CSV files are sent as numbered byte chunks. Each chunk is scored and
+stored as it arrives, and the session's next_chunk, header and partial last
+line are committed in the same transaction as that chunk's rows, so after a
+dropped connection the client asks for next_chunk and resumes from there.
+
+    POST /transactions/uploads                       {"filename": "..."} → upload_id
+    PUT  /transactions/uploads/<id>/chunks/<n>       raw bytes of chunk n (0-based)
+    POST /transactions/uploads/<id>/finalize         scores the final partial line
+    GET  /transactions/uploads/<id>                  progress + next_chunk
+
+Chunks may split a line (or a UTF-8 character) anywhere; only complete lines
+are scored and the remainder is carried into the next chunk. Quoted fields
+containing newlines are not supported on this path. Identical id-less rows
+are numbered across the whole file, not per chunk (UploadRowCount), so a
+repeat split from its twin by a chunk boundary is still kept.
+
+Chunk count grows with file size, so the per-IP rate limit applies only to
+opening a session (app.py exempts the rest); each session is bounded by
+UPLOAD_MAX_CHUNKS instead.
+"""
+
+import io
+import os
+import csv
+import uuid
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import Blueprint, request, jsonify
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal, UploadSession, UploadRowCount
+from firebase_middleware import verify_firebase_token
+from tenancy import resolve_business_id
+from ingest import coerce_row, client_id, row_ip, content_hash, content_hashes
+from routes.transactions import ingest_rows, record_flagged
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger("fraudsense.uploads")
+
+uploads_bp = Blueprint("uploads", __name__, url_prefix="/transactions/uploads")
+
+MAX_CHUNK_BYTES = int(os.getenv("UPLOAD_MAX_CHUNK_BYTES", str(8 * 1024 * 1024)))
+MAX_CHUNKS      = int(os.getenv("UPLOAD_MAX_CHUNKS", "10000"))
+
+
+@uploads_bp.route("", methods=["POST"])
+def create_upload():
+    """POST /transactions/uploads — open a chunked upload session."""
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    data = request.get_json(silent=True) or {}
+    session = SessionLocal()
+    try:
+        biz_id = resolve_business_id(session, decoded)
+        upload = UploadSession(
+            id          = uuid.uuid4().hex,
+            business_id = biz_id,
+            filename    = str(data.get("filename", ""))[:255],
+        )
+        session.add(upload)
+        session.commit()
+        return jsonify({"data": _upload_to_dict(upload), "error": None}), 201
+    except Exception as e:
+        session.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+@uploads_bp.route("/<upload_id>", methods=["GET"])
+def get_upload(upload_id: str):
+    """GET /transactions/uploads/<id> — progress; resume by sending chunk next_chunk."""
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    session = SessionLocal()
+    try:
+        upload = _get_upload(session, decoded, upload_id)
+        if not upload:
+            return jsonify({"error": "Upload not found"}), 404
+        return jsonify({"data": _upload_to_dict(upload), "error": None}), 200
+    finally:
+        session.close()
+
+
+@uploads_bp.route("/<upload_id>/chunks/<int:n>", methods=["PUT"])
+def put_chunk(upload_id: str, n: int):
+    """
+    PUT /transactions/uploads/<id>/chunks/<n>
+    Body: the next raw bytes of the CSV file. Re-sending an already committed
+    chunk is a no-op; skipping ahead is a 409 naming the expected chunk.
+    """
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    if n >= MAX_CHUNKS:
+        return jsonify({"error": f"Uploads are limited to {MAX_CHUNKS} chunks"}), 413
+    chunk = request.get_data()
+    if len(chunk) > MAX_CHUNK_BYTES:
+        return jsonify({"error": f"Chunks are limited to {MAX_CHUNK_BYTES} bytes"}), 413
+
+    session = SessionLocal()
+    try:
+        upload = _get_upload(session, decoded, upload_id)
+        if not upload:
+            return jsonify({"error": "Upload not found"}), 404
+        if upload.status != "open":
+            return jsonify({"error": "Upload is already finalized"}), 409
+        if n < upload.next_chunk:
+            return jsonify({"data": {"upload": _upload_to_dict(upload),
+                                     "already_committed": True}, "error": None}), 200
+        if n > upload.next_chunk:
+            return jsonify({"error": f"Expected chunk {upload.next_chunk}",
+                            "next_chunk": upload.next_chunk}), 409
+
+        buf, header = (upload.tail or b"") + chunk, upload.header
+        if header is None:
+            nl = buf.find(b"\n")
+            if nl >= 0:
+                header, buf = buf[:nl + 1], buf[nl + 1:]
+        cut = buf.rfind(b"\n") if header is not None else -1
+        lines, tail = buf[:cut + 1], buf[cut + 1:]
+
+        return _commit_step(session, upload, decoded["uid"], n, header, lines, tail,
+                            len(chunk), final=False)
+    except (UnicodeDecodeError, ValueError) as e:
+        session.rollback()
+        return jsonify({"error": f"Could not parse chunk {n}: {e}"}), 400
+    except IntegrityError:
+        session.rollback()
+        return jsonify({"error": "Some rows were ingested by a concurrent upload; retry to skip them"}), 409
+    except Exception as e:
+        session.rollback()
+        logger.exception("Chunk upload error")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+@uploads_bp.route("/<upload_id>/finalize", methods=["POST"])
+def finalize_upload(upload_id: str):
+    """POST /transactions/uploads/<id>/finalize — score the unterminated last line, close."""
+    decoded, err = verify_firebase_token()
+    if err:
+        return err, 401
+
+    session = SessionLocal()
+    try:
+        upload = _get_upload(session, decoded, upload_id)
+        if not upload:
+            return jsonify({"error": "Upload not found"}), 404
+        if upload.status != "open":
+            return jsonify({"data": {"upload": _upload_to_dict(upload)}, "error": None}), 200
+
+        lines = upload.tail or b""
+        return _commit_step(session, upload, decoded["uid"], upload.next_chunk,
+                            upload.header, lines if lines.strip() else b"", b"", 0, final=True)
+    except (UnicodeDecodeError, ValueError) as e:
+        session.rollback()
+        return jsonify({"error": f"Could not parse final line: {e}"}), 400
+    except IntegrityError:
+        session.rollback()
+        return jsonify({"error": "Some rows were ingested by a concurrent upload; retry to skip them"}), 409
+    except Exception as e:
+        session.rollback()
+        logger.exception("Finalize upload error")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+def _commit_step(session, upload: UploadSession, uid: str, n: int, header, lines: bytes,
+                 tail: bytes, chunk_bytes: int, final: bool):
+    """Score `lines`, then advance the session with a compare-and-set on next_chunk."""
+    rows = []
+    if header is not None and lines:
+        text = (header + lines).decode("utf-8-sig")
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+    offset = upload.rows_received
+    txs    = [coerce_row(row) for row in rows]
+    ids    = [client_id(row) for row in rows]
+    seen   = _seen_counts(session, upload.id, [content_hash(tx) for tx, cid in zip(txs, ids) if not cid])
+    before = dict(seen)
+    hashes = content_hashes(txs, ids, seen)
+    _save_seen_counts(session, upload.id, seen, before, final)
+    data, events = ingest_rows(session, upload.business_id, txs, hashes, row_offset=offset,
+                               ips=[row_ip(row) for row in rows], request_ip=request.remote_addr)
+
+    advanced = session.query(UploadSession).filter(
+        UploadSession.id         == upload.id,
+        UploadSession.next_chunk == n,
+        UploadSession.status     == "open",
+    ).update({
+        UploadSession.next_chunk:     n if final else n + 1,
+        UploadSession.status:         "finalized" if final else "open",
+        UploadSession.header:         header,
+        UploadSession.tail:           tail,
+        UploadSession.bytes_received: UploadSession.bytes_received + chunk_bytes,
+        UploadSession.rows_received:  UploadSession.rows_received + data["received"],
+        UploadSession.rows_ingested:  UploadSession.rows_ingested + data["total"],
+        UploadSession.duplicates:     UploadSession.duplicates + data["duplicates"],
+        UploadSession.fraud_count:    UploadSession.fraud_count + data["fraud_count"],
+        UploadSession.updated_at:     datetime.now(timezone.utc),
+    }, synchronize_session=False)
+    if advanced != 1:
+        session.rollback()
+        return jsonify({"error": "Chunk was committed by a concurrent request"}), 409
+    with STAGE_SECONDS.time("db_commit"):
+        session.commit()
+    record_flagged(upload.business_id, uid, events)
+
+    session.refresh(upload)
+    return jsonify({
+        "data":  {"upload": _upload_to_dict(upload), "chunk": None if final else n, **data},
+        "error": None,
+    }), 200
+
+
+def _seen_counts(session, upload_id: str, hashes: list[str], chunk: int = 500) -> Counter:
+    """Earlier chunks' occurrence counts for these id-less row hashes."""
+    seen   = Counter()
+    unique = list(set(hashes))
+    for start in range(0, len(unique), chunk):
+        seen.update(dict(session.query(UploadRowCount.content_hash, UploadRowCount.seen).filter(
+            UploadRowCount.upload_id    == upload_id,
+            UploadRowCount.content_hash.in_(unique[start:start + chunk]),
+        ).all()))
+    return seen
+
+
+def _save_seen_counts(session, upload_id: str, seen: Counter, before: dict, final: bool):
+    """Stage the updated counts with the chunk's rows; the last step drops them."""
+    if final:
+        session.query(UploadRowCount).filter(UploadRowCount.upload_id == upload_id) \
+               .delete(synchronize_session=False)
+        return
+    changed = [(h, n) for h, n in seen.items() if before.get(h) != n]
+    updates = [{"upload_id": upload_id, "content_hash": h, "seen": n}
+               for h, n in changed if h in before]
+    if updates:
+        session.execute(update(UploadRowCount), updates)
+    session.add_all(UploadRowCount(upload_id=upload_id, content_hash=h, seen=n)
+                    for h, n in changed if h not in before)
+
+
+def _get_upload(session, decoded: dict, upload_id: str):
+    biz_id = resolve_business_id(session, decoded)
+    return session.query(UploadSession).filter(
+        UploadSession.id          == upload_id,
+        UploadSession.business_id == biz_id,
+    ).first()
+
+
+def _upload_to_dict(u: UploadSession) -> dict:
+    return {
+        "upload_id":      u.id,
+        "filename":       u.filename,
+        "status":         u.status,
+        "next_chunk":     u.next_chunk,
+        "bytes_received": u.bytes_received,
+        "rows_received":  u.rows_received,
+        "rows_ingested":  u.rows_ingested,
+        "duplicates":     u.duplicates,
+        "fraud_count":    u.fraud_count,
+    }
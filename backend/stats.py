@@ -0,0 +1,348 @@
+"""
+FraudSense — Materialized Transaction Counters
+Per-business counts kept in business_stats, one row per
+(suspicious_flag, risk_level, review_status) cell, plus hourly/daily
+time-series buckets in fraud_rollups. Ingest and review apply deltas in the
+same DB transaction as the rows they describe, so list totals, /fraud/stats
+and /fraud/timeseries never scan transactions.
+
+Reconciliation (run from cron or by hand):
+    cd backend
+    python stats.py [--business-id 42] [--dry-run]
+"""
+
+import argparse
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Numeric, cast, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import BusinessStat, Business, FraudRollup, Transaction, parse_event_time
+
+logger = logging.getLogger("fraudsense.stats")
+
+RISK_LEVELS = ["critical", "high", "medium", "low"]
+BUCKETS     = ("hour", "day")
+
+# review_status → FraudRollup outcome column
+OUTCOME_COLUMNS = {
+    "pending_review":  "pending_count",
+    "confirmed_fraud": "confirmed_count",
+    "false_positive":  "false_positive_count",
+    "auto_cleared":    "cleared_count",
+}
+
+
+class StatsDelta:
+    """
+    Accumulates per-cell count changes for one business. NULL risk levels and
+    review statuses land in the same cells _actual_cells() coalesces them to.
+    """
+
+    def __init__(self):
+        self.cells: dict[tuple, int] = defaultdict(int)
+
+    def add(self, suspicious: bool, risk_level: Optional[str],
+            review_status: Optional[str], n: int = 1):
+        self.cells[(bool(suspicious), risk_level or "low", review_status or "auto_cleared")] += n
+
+    def move(self, suspicious: bool, risk_level: Optional[str],
+             old_status: Optional[str], new_status: str):
+        """Record a review status change for one transaction."""
+        if (old_status or "auto_cleared") == new_status:
+            return
+        self.add(suspicious, risk_level, old_status, -1)
+        self.add(suspicious, risk_level, new_status, +1)
+
+
+class RollupDelta:
+    """Accumulates per-bucket time-series increments for one business."""
+
+    def __init__(self):
+        self.buckets: dict[tuple, dict] = defaultdict(lambda: defaultdict(float))
+
+    def add(self, when: datetime, suspicious: bool, risk_level: Optional[str],
+            review_status: Optional[str], amount: float):
+        risk_level = risk_level or "low"
+        for bucket in BUCKETS:
+            row = self.buckets[(bucket, bucket_start(when, bucket))]
+            row["txn_count"]    += 1
+            row["total_amount"] += amount
+            if suspicious:
+                row["fraud_count"]  += 1
+                row["fraud_amount"] += amount
+            row[f"{risk_level}_count"] += 1
+            row[OUTCOME_COLUMNS.get(review_status, "cleared_count")] += 1
+
+    def move(self, when: datetime, old_status: str, new_status: str):
+        """Record a review status change for one transaction."""
+        if old_status == new_status:
+            return
+        for bucket in BUCKETS:
+            row = self.buckets[(bucket, bucket_start(when, bucket))]
+            row[OUTCOME_COLUMNS.get(old_status, "cleared_count")] -= 1
+            row[OUTCOME_COLUMNS.get(new_status, "cleared_count")] += 1
+
+
+def bucket_start(when: datetime, bucket: str) -> datetime:
+    if bucket == "day":
+        return when.replace(hour=0, minute=0, second=0, microsecond=0)
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def _increment(session: Session, model, key: dict, increments: dict):
+    """UPDATE col = col + n on one counter row, inserting it if missing."""
+    filters = [getattr(model, k) == v for k, v in key.items()]
+    values  = {getattr(model, col): getattr(model, col) + n for col, n in increments.items()}
+
+    if session.query(model).filter(*filters).update(values, synchronize_session=False):
+        return
+    try:
+        with session.begin_nested():
+            session.add(model(**key, **increments))
+    except IntegrityError:
+        # A concurrent request created the row first
+        session.query(model).filter(*filters).update(values, synchronize_session=False)
+
+
+def apply_delta(session: Session, business_id: int, delta: StatsDelta):
+    """Apply accumulated deltas. Caller commits."""
+    for (suspicious, risk_level, review_status), n in delta.cells.items():
+        if n == 0:
+            continue
+        _increment(session, BusinessStat,
+                   {"business_id": business_id, "suspicious_flag": suspicious,
+                    "risk_level": risk_level, "review_status": review_status},
+                   {"txn_count": n})
+
+
+def apply_rollup_delta(session: Session, business_id: int, delta: RollupDelta):
+    """Apply accumulated time-series increments. Caller commits."""
+    for (bucket, start), row in delta.buckets.items():
+        increments = {
+            col: (round(n, 2) if col.endswith("_amount") else int(n))
+            for col, n in row.items() if n
+        }
+        if increments:
+            _increment(session, FraudRollup,
+                       {"business_id": business_id, "bucket": bucket, "bucket_start": start},
+                       increments)
+
+
+def apply_business_totals(session: Session, business_id: int, txn_count: int, risk_count: int):
+    """Bump Business.total_transactions / risk_count / risk_score in one UPDATE. Caller commits."""
+    if txn_count == 0:
+        return
+    total = func.coalesce(Business.total_transactions, 0) + txn_count
+    risky = func.coalesce(Business.risk_count, 0) + risk_count
+    session.query(Business).filter(Business.id == business_id).update({
+        Business.total_transactions: total,
+        Business.risk_count:         risky,
+        Business.risk_score:         func.round(cast(risky * 100.0 / total, Numeric), 2),
+    }, synchronize_session=False)
+
+
+def rollup_series(session: Session, business_id: int, bucket: str,
+                  start: datetime, end: datetime) -> list[dict]:
+    """Rollup buckets in [start, end) ordered by time; empty buckets are omitted."""
+    rows = session.query(FraudRollup).filter(
+        FraudRollup.business_id  == business_id,
+        FraudRollup.bucket       == bucket,
+        FraudRollup.bucket_start >= bucket_start(start, bucket),
+        FraudRollup.bucket_start <  end,
+    ).order_by(FraudRollup.bucket_start).all()
+
+    series = []
+    for r in rows:
+        ts = r.bucket_start if r.bucket_start.tzinfo else r.bucket_start.replace(tzinfo=timezone.utc)
+        series.append({
+            "bucket_start":   ts.isoformat(),
+            "total":          r.txn_count,
+            "total_amount":   round(r.total_amount, 2),
+            "fraud_count":    r.fraud_count,
+            "fraud_amount":   round(r.fraud_amount, 2),
+            "risk_breakdown": {level: getattr(r, f"{level}_count") for level in RISK_LEVELS},
+            "review": {
+                "pending_review":  r.pending_count,
+                "confirmed_fraud": r.confirmed_count,
+                "false_positive":  r.false_positive_count,
+                "auto_cleared":    r.cleared_count,
+            },
+        })
+    return series
+
+
+def count_transactions(session: Session, business_id: int,
+                       suspicious: Optional[bool] = None,
+                       risk_level: Optional[str] = None,
+                       review_status: Optional[str] = None) -> int:
+    """Total transactions matching the given filters, summed from counters."""
+    q = session.query(func.coalesce(func.sum(BusinessStat.txn_count), 0)).filter(
+        BusinessStat.business_id == business_id)
+    if suspicious is not None:
+        q = q.filter(BusinessStat.suspicious_flag == suspicious)
+    if risk_level:
+        q = q.filter(BusinessStat.risk_level == risk_level)
+    if review_status:
+        q = q.filter(BusinessStat.review_status == review_status)
+    return int(q.scalar() or 0)
+
+
+def business_summary(session: Session, business_id: int) -> dict:
+    """Dashboard totals for one business from a single business_stats read."""
+    cells = session.query(BusinessStat).filter(
+        BusinessStat.business_id == business_id).all()
+
+    summary = {
+        "total_transactions": 0,
+        "fraud_count":        0,
+        "pending_review":     0,
+        "risk_breakdown":     {level: 0 for level in RISK_LEVELS},
+    }
+    for cell in cells:
+        summary["total_transactions"] += cell.txn_count
+        if cell.suspicious_flag:
+            summary["fraud_count"] += cell.txn_count
+        if cell.review_status == "pending_review":
+            summary["pending_review"] += cell.txn_count
+        breakdown = summary["risk_breakdown"]
+        breakdown[cell.risk_level] = breakdown.get(cell.risk_level, 0) + cell.txn_count
+    return summary
+
+
+def _actual_cells(session: Session, business_id: Optional[int] = None) -> dict:
+    """Counts per (business_id, suspicious_flag, risk_level, review_status) from transactions."""
+    suspicious = func.coalesce(Transaction.suspicious_flag, False)
+    risk_level = func.coalesce(Transaction.risk_level, "low")
+    status     = func.coalesce(Transaction.review_status, "auto_cleared")
+
+    q = session.query(Transaction.business_id, suspicious, risk_level, status,
+                      func.count(Transaction.id))
+    if business_id is not None:
+        q = q.filter(Transaction.business_id == business_id)
+    q = q.group_by(Transaction.business_id, suspicious, risk_level, status)
+    return {(biz_id, bool(flag), risk, review): n for biz_id, flag, risk, review, n in q}
+
+
+def rebuild_business_stats(session: Session, business_id: Optional[int] = None):
+    """Recompute counters from transactions (all businesses, or one). Caller commits."""
+    stale = session.query(BusinessStat)
+    if business_id is not None:
+        stale = stale.filter(BusinessStat.business_id == business_id)
+    stale.delete(synchronize_session=False)
+
+    session.add_all([
+        BusinessStat(business_id=biz_id, suspicious_flag=flag,
+                     risk_level=risk, review_status=review, txn_count=n)
+        for (biz_id, flag, risk, review), n in _actual_cells(session, business_id).items()
+    ])
+
+
+def rebuild_fraud_rollups(session: Session, business_id: Optional[int] = None):
+    """Recompute time-series rollups from transactions (all businesses, or one). Caller commits."""
+    stale = session.query(FraudRollup)
+    rows  = session.query(
+        Transaction.business_id, Transaction.event_time, Transaction.created_at,
+        Transaction.suspicious_flag, Transaction.risk_level,
+        Transaction.review_status, Transaction.amount,
+    )
+    if business_id is not None:
+        stale = stale.filter(FraudRollup.business_id == business_id)
+        rows  = rows.filter(Transaction.business_id == business_id)
+    stale.delete(synchronize_session=False)
+
+    deltas = defaultdict(RollupDelta)
+    for biz_id, ts, created, flag, risk, review, amount in rows.yield_per(5000):
+        when = parse_event_time(ts or created)
+        deltas[biz_id].add(when, bool(flag), risk or "low",
+                           review or "auto_cleared", amount or 0.0)
+    for biz_id, delta in deltas.items():
+        apply_rollup_delta(session, biz_id, delta)
+
+
+def reconcile_business_stats(session: Session, business_id: Optional[int] = None,
+                             fix: bool = True) -> list[dict]:
+    """
+    Compare materialized counters (business_stats and the Business totals)
+    against transactions. Returns one drift record per mismatch and, when
+    fix=True, rebuilds the drifted businesses. Caller commits.
+    """
+    actual = _actual_cells(session, business_id)
+
+    stored_q = session.query(BusinessStat)
+    if business_id is not None:
+        stored_q = stored_q.filter(BusinessStat.business_id == business_id)
+    stored = {
+        (c.business_id, c.suspicious_flag, c.risk_level, c.review_status): c.txn_count
+        for c in stored_q
+    }
+
+    drift = []
+    for key in sorted(set(actual) | set(stored), key=str):
+        have, want = stored.get(key, 0), actual.get(key, 0)
+        if have != want:
+            biz_id, flag, risk, review = key
+            drift.append({
+                "business_id": biz_id,
+                "counter":     f"cell(suspicious={flag}, risk_level={risk}, review_status={review})",
+                "stored":      have,
+                "actual":      want,
+            })
+
+    totals = defaultdict(lambda: [0, 0])       # business_id → [total, fraud]
+    for (biz_id, flag, _, _), n in actual.items():
+        totals[biz_id][0] += n
+        if flag:
+            totals[biz_id][1] += n
+
+    biz_q = session.query(Business)
+    if business_id is not None:
+        biz_q = biz_q.filter(Business.id == business_id)
+    for biz in biz_q:
+        total, fraud = totals.get(biz.id, (0, 0))
+        for counter, have, want in (("total_transactions", biz.total_transactions or 0, total),
+                                    ("risk_count",         biz.risk_count or 0,         fraud)):
+            if have != want:
+                drift.append({"business_id": biz.id, "counter": counter,
+                              "stored": have, "actual": want})
+        if fix and ((biz.total_transactions or 0) != total or (biz.risk_count or 0) != fraud):
+            biz.total_transactions = total
+            biz.risk_count         = fraud
+            biz.risk_score         = round(fraud / total * 100, 2) if total else 0.0
+
+    if fix:
+        for biz_id in sorted({d["business_id"] for d in drift if d["counter"].startswith("cell")}):
+            rebuild_business_stats(session, biz_id)
+
+    return drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile business_stats counters against transactions.")
+    parser.add_argument("--business-id", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it")
+    args = parser.parse_args()
+
+    from database import SessionLocal
+    session = SessionLocal()
+    try:
+        drift = reconcile_business_stats(session, args.business_id, fix=not args.dry_run)
+        for d in drift:
+            print(f"[Stats] business {d['business_id']}: {d['counter']} "
+                  f"stored={d['stored']} actual={d['actual']}")
+        if args.dry_run:
+            session.rollback()
+        else:
+            session.commit()
+        action = "reported" if args.dry_run else "fixed"
+        print(f"[Stats] {len(drift)} drifted counter(s) {action}.")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+FraudSense — Tenant Resolution
+Maps a verified Firebase token to its business_id for every route, through a
+per-process LRU (firebase_uid → business_id, TTL-bounded so other workers'
+/business/link changes are picked up). First-time users are provisioned
+from the token's own claims; any Firebase profile lookup runs in the
+background, never inside the request.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, Business
+
+logger = logging.getLogger("fraudsense.tenancy")
+
+TENANT_CACHE_SIZE = int(os.getenv("TENANT_CACHE_SIZE", "10000"))
+TENANT_CACHE_TTL  = float(os.getenv("TENANT_CACHE_TTL", "300"))
+
+
+class TenantCache:
+    """Bounded LRU of firebase_uid → (business_id, expires_at)."""
+
+    def __init__(self, maxsize: int = TENANT_CACHE_SIZE, ttl: float = TENANT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, uid: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return None
+            business_id, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[uid]
+                return None
+            self._entries.move_to_end(uid)
+            return business_id
+
+    def put(self, uid: str, business_id: int):
+        with self._lock:
+            self._entries[uid] = (business_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *uids: Optional[str]):
+        with self._lock:
+            for uid in uids:
+                if uid:
+                    self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_tenant_cache = TenantCache()
+_enricher     = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tenant-enrich")
+
+
+def get_tenant_cache() -> TenantCache:
+    return _tenant_cache
+
+
+def invalidate_tenant(*uids: Optional[str]):
+    """Drop cached mappings after a uid is (re)linked or its business edited."""
+    _tenant_cache.invalidate(*uids)
+
+
+def resolve_business_id(session: Session, decoded: dict) -> int:
+    """business_id for a verified token, auto-provisioning on first sight."""
+    uid = decoded["uid"]
+    business_id = _tenant_cache.get(uid)
+    if business_id is None:
+        row = session.query(Business.id).filter(Business.firebase_uid == uid).first()
+        business_id = row.id if row else _provision(session, decoded)
+        _tenant_cache.put(uid, business_id)
+    return business_id
+
+
+def _provision(session: Session, decoded: dict) -> int:
+    """Create a business from token claims alone (no Firebase round trip)."""
+    uid   = decoded["uid"]
+    email = decoded.get("email")
+    biz = Business(
+        firebase_uid  = uid,
+        business_name = decoded.get("name") or (email.split("@")[0] if email else "Demo Business"),
+        email         = email or f"{uid}@demo.com",
+        category      = "FinTech",
+    )
+    session.add(biz)
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent first request for the same uid got there first
+        session.rollback()
+        row = session.query(Business.id).filter(Business.firebase_uid == uid).first()
+        if row is None:
+            raise
+        return row.id
+
+    if not email:
+        _enricher.submit(_enrich_from_firebase, biz.id, uid)
+    return biz.id
+
+
+def _enrich_from_firebase(business_id: int, uid: str):
+    """Background: fill in email / name from the Firebase user record."""
+    session = SessionLocal()
+    try:
+        from firebase_admin import auth
+        user = auth.get_user(uid)
+        if not user.email:
+            return
+        biz = session.get(Business, business_id)
+        if biz is None:
+            return
+        biz.email         = user.email
+        biz.business_name = user.display_name or user.email.split("@")[0]
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.warning(f"Business {business_id} profile enrichment failed: {e}")
+    finally:
+        session.close()
@@ -1,7 +1,7 @@
 import React, { useCallback, useState } from 'react';
 import { useDropzone } from 'react-dropzone';
 import { Upload, File as LucideFile, AlertCircle, X, Loader2 } from 'lucide-react';
-import { api } from '../services/api';
+import { api, UPLOAD_CHUNK_BYTES } from '../services/api';
 
 interface CsvUploaderProps {
   onUploadSuccess: () => void;
@@ -12,6 +12,7 @@ const CsvUploader: React.FC<CsvUploaderProps> = ({ onUploadSuccess }) => {
   const [currentFile, setCurrentFile] = useState<File | null>(null);
   const [isUploading, setIsUploading] = useState(false);
   const [result, setResult] = useState<{ processed: number; errors: number } | null>(null);
+  const [progress, setProgress] = useState<number | null>(null);
 
   const onDrop = useCallback(async (acceptedFiles: File[]) => {
     const file = acceptedFiles[0];
@@ -22,20 +23,31 @@ const CsvUploader: React.FC<CsvUploaderProps> = ({ onUploadSuccess }) => {
       setIsUploading(true);
 
       try {
-        const response = await api.transactions.upload(file);
-        setResult({ processed: response.processed, errors: response.errors?.length || 0 });
+        if (file.name.toLowerCase().endsWith('.csv') && file.size > UPLOAD_CHUNK_BYTES) {
+          const { upload } = await api.transactions.uploadChunked(file, (sent, total) =>
+            setProgress(Math.round((sent / total) * 100)));
+          setResult({ processed: upload.rows_ingested, errors: 0 });
+        } else {
+          const response = await api.transactions.upload(file);
+          setResult({ processed: response.processed, errors: response.errors?.length || 0 });
+        }
         onUploadSuccess();
       } catch (err: any) {
         setError(err.message || 'Failed to upload CSV');
       } finally {
         setIsUploading(false);
+        setProgress(null);
       }
     }
   }, [onUploadSuccess]);
 
   const { getRootProps, getInputProps, isDragActive } = useDropzone({
     onDrop,
-    accept: { 'text/csv': ['.csv'] },
+    accept: {
+      'text/csv': ['.csv'],
+      'application/vnd.apache.parquet': ['.parquet'],
+      'application/vnd.apache.arrow.file': ['.arrow', '.feather'],
+    },
     multiple: false,
     disabled: isUploading
   });
@@ -98,13 +110,16 @@ const CsvUploader: React.FC<CsvUploaderProps> = ({ onUploadSuccess }) => {
           <span className="text-sm">{error}</span>
         </div>
       )}
+      {progress !== null && (
+        <div className="text-sm text-cyber-primary/80">Uploading… {progress}%</div>
+      )}
       {result && (
         <div className="text-sm text-green-400">
           Successfully processed {result.processed} transactions ({result.errors} errors).
         </div>
       )}
       <div className="text-sm text-cyber-primary/80">
-        Supported formats: .csv (Max 100MB)
+        Supported formats: .csv, .parquet, .arrow (Max 100MB)
       </div>
     </div>
   );
@@ -144,7 +144,7 @@ export default function Alerts() {
                     >
                         {filteredAlerts.map((alert) => {
                             const reasonStr = alert.fraud_reasons && alert.fraud_reasons.length > 0
-                                ? (typeof alert.fraud_reasons[0] === 'string' ? alert.fraud_reasons[0] : JSON.stringify(alert.fraud_reasons[0]))
+                                ? (typeof alert.fraud_reasons[0] === 'string' ? alert.fraud_reasons[0] : alert.fraud_reasons[0].message)
                                 : 'Anomalous deviation detected in network flow';
 
                             return (
@@ -357,7 +357,7 @@ const SectionHeader = ({ icon, title, subtitle, status }: {
 
 const AlertCard = ({ alert }: { alert: Alert }) => {
   const reasonStr = alert.fraud_reasons && alert.fraud_reasons.length > 0
-    ? (typeof alert.fraud_reasons[0] === 'string' ? alert.fraud_reasons[0] : JSON.stringify(alert.fraud_reasons[0]))
+    ? (typeof alert.fraud_reasons[0] === 'string' ? alert.fraud_reasons[0] : alert.fraud_reasons[0].message)
     : 'Anomalous deviation detected in network flow';
 
   // Format amount safely
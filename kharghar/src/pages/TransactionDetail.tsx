@@ -166,7 +166,7 @@ export default function TransactionDetail() {
                                     {rules.map((rule, idx) => (
                                         <div key={idx} className="p-4 bg-gray-900/50 rounded-xl border border-gray-800 flex flex-col sm:flex-row justify-between sm:items-center gap-2 hover:border-cyber-alert/30 transition-colors">
                                             <span className="text-gray-300 font-medium tracking-wide">
-                                                {rule.rule || (typeof rule === 'string' ? rule : JSON.stringify(rule))}
+                                                {rule.message || rule.rule || (typeof rule === 'string' ? rule : JSON.stringify(rule))}
                                             </span>
                                             {rule.score_delta > 0 && (
                                                 <span className="shrink-0 inline-flex items-center gap-1 text-[10px] font-bold tracking-wider text-cyber-alert bg-cyber-alert/10 px-2.5 py-1 rounded-full border border-cyber-alert/20 uppercase">
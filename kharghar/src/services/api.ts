@@ -17,6 +17,54 @@ async function getAuthHeaders(): Promise<HeadersInit> {
   };
 }
 
+export const UPLOAD_CHUNK_BYTES = 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 5;
+const UPLOAD_RESUME_PREFIX = 'fraudsense.upload:';
+
+// Upload sessions left open by a closed tab or a dropped connection are
+// remembered per file (name, size, mtime, slice size) so the next attempt
+// at the same file picks up at the server's next_chunk. Storage may be
+// unavailable (private mode, quota); resuming is then simply skipped.
+const resumeKey = (file: File, chunkBytes: number) =>
+  `${UPLOAD_RESUME_PREFIX}${file.name}:${file.size}:${file.lastModified}:${chunkBytes}`;
+
+const resumeStore = {
+  get: (key: string): string | null => {
+    try { return localStorage.getItem(key); } catch { return null; }
+  },
+  set: (key: string, uploadId: string) => {
+    try { localStorage.setItem(key, uploadId); } catch { /* resume unavailable */ }
+  },
+  clear: (key: string) => {
+    try { localStorage.removeItem(key); } catch { /* resume unavailable */ }
+  },
+};
+
+export interface UploadSession {
+  upload_id: string;
+  filename: string;
+  status: 'open' | 'finalized';
+  next_chunk: number;
+  bytes_received: number;
+  rows_received: number;
+  rows_ingested: number;
+  duplicates: number;
+  fraud_count: number;
+}
+
+export type VendorListType = 'blacklist' | 'allowlist';
+
+export interface VendorListEntry {
+  id: number;
+  list_type: VendorListType;
+  vendor_name: string;
+  reason: string;
+  active: boolean;
+  created_by: string | null;
+  created_at: string;
+  updated_at: string;
+}
+
 class ApiError extends Error {
   constructor(public message: string, public status?: number) {
     super(message);
@@ -74,14 +122,74 @@ export const api = {
       });
     },
 
-    list: (page = 1, limit = 50, risk_level?: string) => {
+    // Large CSVs: sent in fixed-size slices through a resumable upload session.
+    // A failed slice is retried from the server's committed next_chunk, and a
+    // session still open from an earlier attempt at the same file is resumed.
+    uploadChunked: async (
+      file: File,
+      onProgress?: (sent: number, total: number) => void,
+      chunkBytes = UPLOAD_CHUNK_BYTES,
+    ): Promise<{ upload: UploadSession }> => {
+      const key = resumeKey(file, chunkBytes);
+      let session: UploadSession | null = null;
+      const savedId = resumeStore.get(key);
+      if (savedId) {
+        // Gone (404) or already finalized: start a fresh session instead
+        session = await api.uploads.status(savedId).catch(() => null);
+        if (session?.status !== 'open') session = null;
+      }
+      if (!session) {
+        session = await api.uploads.create(file.name);
+        resumeStore.set(key, session.upload_id);
+      }
+      const uploadId = session.upload_id;
+      const count = Math.ceil(file.size / chunkBytes);
+      let n = session.next_chunk;
+      if (n > 0) onProgress?.(Math.min(n * chunkBytes, file.size), file.size);
+      let failures = 0;
+      while (n < count) {
+        try {
+          await api.uploads.putChunk(uploadId, n, file.slice(n * chunkBytes, (n + 1) * chunkBytes));
+          n += 1;
+          failures = 0;
+          onProgress?.(Math.min(n * chunkBytes, file.size), file.size);
+        } catch (err) {
+          if (++failures > UPLOAD_MAX_RETRIES) throw err;
+          await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** failures));
+          n = (await api.uploads.status(uploadId)).next_chunk;
+        }
+      }
+      const result = await api.uploads.finalize(uploadId);
+      resumeStore.clear(key);
+      return result;
+    },
+
+    list: (page = 1, limit = 50, risk_level?: string, cursor?: number) => {
       let query = `?page=${page}&limit=${limit}`;
       if (risk_level) query += `&risk_level=${risk_level}`;
-      return request<{ transactions: Transaction[]; total: number; page: number; pages: number }>(`/transactions${query}`);
+      if (cursor) query += `&cursor=${cursor}`;
+      return request<{ transactions: Transaction[]; total: number; page: number; pages: number; next_cursor: number | null }>(`/transactions${query}`);
     },
 
     get: (id: number) => request<Transaction>(`/transactions/${id}`),
 
+    // Streams the full filtered history; resolves to the downloaded file
+    export: async (
+      format: 'csv' | 'parquet' = 'csv',
+      filters: { from?: string; to?: string; risk_level?: string; review_status?: string } = {},
+    ): Promise<Blob> => {
+      const params = new URLSearchParams({ format });
+      Object.entries(filters).forEach(([k, v]) => { if (v) params.set(k, v); });
+      const response = await fetch(`${API_BASE}/transactions/export?${params}`, {
+        headers: await getAuthHeaders(),
+      });
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw new ApiError(data.error || 'Export failed', response.status);
+      }
+      return response.blob();
+    },
+
     explain: (id: number) => request<{ top_reasons: Array<{ feature: string; impact: string }> }>(`/transactions/${id}/explain`),
 
     review: (id: number, status: 'confirmed_fraud' | 'false_positive') =>
@@ -89,19 +197,75 @@ export const api = {
         method: 'PATCH',
         body: JSON.stringify({ review_status: status }),
       }),
+
+    reviewMany: (reviews: Array<{ id: number; status: 'confirmed_fraud' | 'false_positive' }>) =>
+      request<{
+        updated: number;
+        results: Array<{ id: number; outcome: 'updated' | 'unchanged' | 'not_found' | 'invalid'; previous_status?: string; review_status?: string }>;
+      }>('/transactions/review', {
+        method: 'PATCH',
+        body: JSON.stringify({ reviews }),
+      }),
+  },
+
+  uploads: {
+    create: (filename: string) =>
+      request<UploadSession>('/transactions/uploads', { method: 'POST', body: JSON.stringify({ filename }) }),
+
+    putChunk: (id: string, n: number, chunk: Blob) =>
+      request<{ upload: UploadSession; already_committed?: boolean }>(`/transactions/uploads/${id}/chunks/${n}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body: chunk,
+      }),
+
+    finalize: (id: string) =>
+      request<{ upload: UploadSession }>(`/transactions/uploads/${id}/finalize`, { method: 'POST' }),
+
+    status: (id: string) => request<UploadSession>(`/transactions/uploads/${id}`),
   },
 
   fraud: {
     stats: () => request<DashboardStats>('/fraud/stats'),
 
-    alerts: (page = 1, limit = 50, status?: string) => {
+    alerts: (page = 1, limit = 50, status?: string, cursor?: number | string, sort?: 'priority') => {
       let query = `?page=${page}&limit=${limit}`;
       if (status) query += `&status=${status}`;
-      return request<{ alerts: Alert[]; total: number; page: number; pages: number }>(`/fraud/alerts${query}`);
+      if (cursor) query += `&cursor=${cursor}`;
+      if (sort) query += `&sort=${sort}`;
+      return request<{ alerts: Alert[]; total: number; page: number; pages: number; next_cursor: number | string | null }>(`/fraud/alerts${query}`);
+    },
+
+    // Lease the n highest expected-loss pending alerts to this reviewer
+    queueNext: (n = 1) =>
+      request<{ alerts: Alert[]; claimed_until: string }>(`/fraud/queue/next?n=${n}`, { method: 'POST' }),
+
+    timeseries: (bucket: 'hour' | 'day' = 'day', from?: string, to?: string) => {
+      let query = `?bucket=${bucket}`;
+      if (from) query += `&from=${encodeURIComponent(from)}`;
+      if (to) query += `&to=${encodeURIComponent(to)}`;
+      return request<{ bucket: string; from: string; to: string; series: any[] }>(`/fraud/timeseries${query}`);
     },
 
     network: () => request<any>('/fraud/network'),
 
+    vendorList: (list: VendorListType, cursor?: number, q?: string) => {
+      let query = `?limit=50`;
+      if (cursor) query += `&cursor=${cursor}`;
+      if (q) query += `&q=${encodeURIComponent(q)}`;
+      return request<{ entries: VendorListEntry[]; next_cursor: number | null }>(`/fraud/vendors/${list}${query}`);
+    },
+
+    addVendors: (list: VendorListType, vendors: { vendor_name: string; reason?: string }[]) =>
+      request<{ created: number; updated: number; invalid_rows: number[]; entries: VendorListEntry[] }>(
+        `/fraud/vendors/${list}`, { method: 'POST', body: JSON.stringify({ vendors }) }),
+
+    removeVendor: (list: VendorListType, id: number) =>
+      request<VendorListEntry>(`/fraud/vendors/${list}/${id}`, { method: 'DELETE' }),
+
+    checkVendor: (vendorName: string) =>
+      request<{ vendor_name: string; match: any }>(`/fraud/vendors/check?vendor_name=${encodeURIComponent(vendorName)}`),
+
     health: () => request<any>('/fraud/model/health'),
   }
 };
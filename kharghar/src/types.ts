@@ -13,6 +13,13 @@ export interface FraudVerdict {
   verdict_source: string;
 }
 
+export interface RuleFlag {
+  rule_id: string | null;
+  severity: string | null;
+  message: string;
+  score_delta: number | null;
+}
+
 export interface Transaction {
   id: number;
   business_id: number;
@@ -21,8 +28,8 @@ export interface Transaction {
   risk_level: string;
   confidence_score: number;
   final_score: number;
-  fraud_reasons: string[]; // JSON array parsed
-  shap_reasons: string[];  // JSON array parsed
+  fraud_reasons: RuleFlag[];
+  shap_reasons: string[];
   review_status: 'auto_cleared' | 'needs_review' | 'confirmed_fraud' | 'false_positive';
   reviewed_by: string | null;
   created_at: string;
@@ -47,7 +54,8 @@ export interface Alert {
   business_id: number;
   amount: number;
   risk_level: string;
-  fraud_reasons: string[];
+  fraud_reasons: RuleFlag[];
+  expected_loss?: number; // final_score × amount, review-queue priority
   created_at: string;
   timestamp: string;
   status?: string; // from review_status